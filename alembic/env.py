@@ -16,6 +16,9 @@ from app.models.author import Author
 from app.models.borrowed_book import BorrowedBook
 from app.models.user import User
 from app.models.category import Category
+from app.models.borrow_stats import BookBorrowStats
+from app.models.fine import Fine
+from app.models.notification import Notification
 
 
 load_dotenv()
@@ -26,8 +29,9 @@ config = context.config
 config.set_main_option("sqlalchemy.url", os.environ.get("DATABASE_URL"))
 
 # Interpret the config file for Python logging.
-# This line sets up loggers basically.
-if config.config_file_name is not None:
+# This line sets up loggers basically. Skipped when the app runs migrations
+# in-process (app.db.migrations), so its own logging is left alone.
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
@@ -36,6 +40,18 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = SQLModel.metadata
 
+# Columns maintained by database triggers and intentionally left off the models
+UNMAPPED_COLUMNS = {("book", "search_vector")}
+UNMAPPED_INDEXES = {"ix_book_search_vector", "ix_book_title_trgm", "ix_author_name_trgm"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "column" and reflected and (object.table.name, name) in UNMAPPED_COLUMNS:
+        return False
+    if type_ == "index" and reflected and name in UNMAPPED_INDEXES:
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -60,6 +76,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -73,6 +90,11 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -80,12 +102,18 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
+        do_run_migrations(connection)
+
 
-        with context.begin_transaction():
-            context.run_migrations()
+def do_run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
 
 
 if context.is_offline_mode():
@@ -0,0 +1,38 @@
+"""Book available copies
+
+Revision ID: 1a7e4c9b3d25
+Revises: f8c3a6d1b054
+Create Date: 2026-10-18 15:20:09.614532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1a7e4c9b3d25'
+down_revision: Union[str, None] = 'f8c3a6d1b054'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('book', sa.Column('available', sa.Integer(), nullable=True))
+    # Loans recorded before inventory was enforced may exceed quantity
+    op.execute("""
+        UPDATE book SET available = greatest(0, book.quantity - coalesce((
+            SELECT count(*) FROM borrowedbook
+            WHERE borrowedbook.book_id = book.id AND borrowedbook.return_status <> 'returned'
+        ), 0))
+    """)
+    op.alter_column('book', 'available', nullable=False)
+    op.create_check_constraint('ck_book_available_nonnegative', 'book', 'available >= 0')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ck_book_available_nonnegative', 'book', type_='check')
+    op.drop_column('book', 'available')
@@ -0,0 +1,142 @@
+"""Book full-text search vector
+
+Revision ID: 44ae64960ae3
+Revises: 39d41e043b98
+Create Date: 2026-10-18 09:05:12.418211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '44ae64960ae3'
+down_revision: Union[str, None] = '39d41e043b98'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE book ADD COLUMN search_vector tsvector")
+
+    # Title weighs most, then author names, then category names
+    op.execute("""
+        CREATE FUNCTION book_search_document(p_book_id integer, p_title text)
+        RETURNS tsvector AS $$
+            SELECT setweight(to_tsvector('english', coalesce(p_title, '')), 'A')
+                || setweight(to_tsvector('english', coalesce((
+                    SELECT string_agg(a.first_name || ' ' || a.second_name, ' ')
+                    FROM book_author_link l JOIN author a ON a.id = l.author_id
+                    WHERE l.book_id = p_book_id
+                ), '')), 'B')
+                || setweight(to_tsvector('english', coalesce((
+                    SELECT string_agg(c.category_name, ' ')
+                    FROM book_category_link l JOIN category c ON c.id = l.category_id
+                    WHERE l.book_id = p_book_id
+                ), '')), 'C')
+        $$ LANGUAGE sql STABLE
+    """)
+
+    op.execute("""
+        CREATE FUNCTION book_search_vector_on_book() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := book_search_document(NEW.id, NEW.title);
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER book_search_vector_on_book
+        BEFORE INSERT OR UPDATE OF title ON book
+        FOR EACH ROW EXECUTE FUNCTION book_search_vector_on_book()
+    """)
+
+    # Link triggers are statement-level so bulk writes refresh each book once
+    op.execute("""
+        CREATE FUNCTION book_search_vector_on_link_insert() RETURNS trigger AS $$
+        BEGIN
+            UPDATE book SET search_vector = book_search_document(book.id, book.title)
+            WHERE book.id IN (SELECT DISTINCT book_id FROM new_links);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION book_search_vector_on_link_delete() RETURNS trigger AS $$
+        BEGIN
+            UPDATE book SET search_vector = book_search_document(book.id, book.title)
+            WHERE book.id IN (SELECT DISTINCT book_id FROM old_links);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for table in ("book_author_link", "book_category_link"):
+        op.execute(f"""
+            CREATE TRIGGER {table}_search_insert
+            AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS new_links
+            FOR EACH STATEMENT EXECUTE FUNCTION book_search_vector_on_link_insert()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_search_delete
+            AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS old_links
+            FOR EACH STATEMENT EXECUTE FUNCTION book_search_vector_on_link_delete()
+        """)
+
+    op.execute("""
+        CREATE FUNCTION book_search_vector_on_author() RETURNS trigger AS $$
+        BEGIN
+            UPDATE book SET search_vector = book_search_document(book.id, book.title)
+            WHERE book.id IN (SELECT book_id FROM book_author_link WHERE author_id = NEW.id);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER author_search_update
+        AFTER UPDATE OF first_name, second_name ON author
+        FOR EACH ROW EXECUTE FUNCTION book_search_vector_on_author()
+    """)
+
+    op.execute("""
+        CREATE FUNCTION book_search_vector_on_category() RETURNS trigger AS $$
+        BEGIN
+            UPDATE book SET search_vector = book_search_document(book.id, book.title)
+            WHERE book.id IN (SELECT book_id FROM book_category_link WHERE category_id = NEW.id);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER category_search_update
+        AFTER UPDATE OF category_name ON category
+        FOR EACH ROW EXECUTE FUNCTION book_search_vector_on_category()
+    """)
+
+    op.execute("UPDATE book SET search_vector = book_search_document(id, title)")
+    op.create_index(
+        'ix_book_search_vector', 'book', [sa.text('search_vector')],
+        unique=False, postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_book_search_vector', table_name='book')
+    op.execute("DROP TRIGGER category_search_update ON category")
+    op.execute("DROP TRIGGER author_search_update ON author")
+    for table in ("book_author_link", "book_category_link"):
+        op.execute(f"DROP TRIGGER {table}_search_delete ON {table}")
+        op.execute(f"DROP TRIGGER {table}_search_insert ON {table}")
+    op.execute("DROP TRIGGER book_search_vector_on_book ON book")
+    op.execute("DROP FUNCTION book_search_vector_on_category()")
+    op.execute("DROP FUNCTION book_search_vector_on_author()")
+    op.execute("DROP FUNCTION book_search_vector_on_link_delete()")
+    op.execute("DROP FUNCTION book_search_vector_on_link_insert()")
+    op.execute("DROP FUNCTION book_search_vector_on_book()")
+    op.execute("DROP FUNCTION book_search_document(integer, text)")
+    op.execute("ALTER TABLE book DROP COLUMN search_vector")
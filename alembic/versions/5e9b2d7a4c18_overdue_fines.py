@@ -0,0 +1,47 @@
+"""Overdue fines
+
+Revision ID: 5e9b2d7a4c18
+Revises: 1a7e4c9b3d25
+Create Date: 2026-10-18 16:02:41.337905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e9b2d7a4c18'
+down_revision: Union[str, None] = '1a7e4c9b3d25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('fine',
+    sa.Column('loan_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('due_date', sa.Date(), nullable=False),
+    sa.Column('overdue_days', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['book.id'], ),
+    sa.ForeignKeyConstraint(['loan_id'], ['borrowedbook.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('loan_id')
+    )
+    op.create_index('ix_fine_user_id_loan_id', 'fine', ['user_id', 'loan_id'], unique=False)
+    op.create_index(
+        'ix_borrowedbook_open_borrowing_time', 'borrowedbook', ['borrowing_time'],
+        unique=False, postgresql_where=sa.text("return_status <> 'returned'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_borrowedbook_open_borrowing_time', table_name='borrowedbook')
+    op.drop_index('ix_fine_user_id_loan_id', table_name='fine')
+    op.drop_table('fine')
@@ -0,0 +1,38 @@
+"""Trigram indexes for fuzzy title and author search
+
+Revision ID: 7c1e5a9d2f40
+Revises: 44ae64960ae3
+Create Date: 2026-10-18 10:12:47.093315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e5a9d2f40'
+down_revision: Union[str, None] = '44ae64960ae3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_book_title_trgm', 'book', ['title'],
+        unique=False, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}
+    )
+    # Must stay in sync with the author name expression in SearchService
+    op.create_index(
+        'ix_author_name_trgm', 'author', [sa.text("(first_name || ' ' || second_name) gin_trgm_ops")],
+        unique=False, postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_author_name_trgm', table_name='author')
+    op.drop_index('ix_book_title_trgm', table_name='book')
@@ -0,0 +1,43 @@
+"""Composite indexes for keyset pagination
+
+Revision ID: b52d0e7f3a91
+Revises: 7c1e5a9d2f40
+Create Date: 2026-10-18 11:26:03.551840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52d0e7f3a91'
+down_revision: Union[str, None] = '7c1e5a9d2f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_book_title_id', 'book', ['title', 'id']),
+    ('ix_book_publication_year_id', 'book', ['publication_year', 'id']),
+    ('ix_book_created_at_id', 'book', ['created_at', 'id']),
+    ('ix_author_created_at_id', 'author', ['created_at', 'id']),
+    ('ix_category_created_at_id', 'category', ['created_at', 'id']),
+    ('ix_user_registration_date_id', 'user', ['registration_date', 'id']),
+    ('ix_borrowedbook_user_id_id', 'borrowedbook', ['user_id', 'id']),
+    ('ix_borrowedbook_user_id_created_at_id', 'borrowedbook', ['user_id', 'created_at', 'id']),
+    ('ix_borrowedbook_book_id_id', 'borrowedbook', ['book_id', 'id']),
+    ('ix_borrowedbook_book_id_created_at_id', 'borrowedbook', ['book_id', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,196 @@
+"""Trigger-maintained borrow popularity counters
+
+Revision ID: d41f7b2c9e63
+Revises: b52d0e7f3a91
+Create Date: 2026-10-18 13:12:47.208314
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f7b2c9e63'
+down_revision: Union[str, None] = 'b52d0e7f3a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATS_TABLES = [
+    ('book_borrow_stats', 'book_id', 'book'),
+    ('author_borrow_stats', 'author_id', 'author'),
+    ('category_borrow_stats', 'category_id', 'category'),
+]
+
+LINK_TABLES = [
+    ('book_author_link', 'author_borrow_stats', 'author_id'),
+    ('book_category_link', 'category_borrow_stats', 'category_id'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, key, parent in STATS_TABLES:
+        op.create_table(
+            table,
+            sa.Column(key, sa.Integer(), nullable=False),
+            sa.Column('borrow_count', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint([key], [f'{parent}.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint(key)
+        )
+        op.create_index(f'ix_{table}_top', table, ['borrow_count', key], unique=False)
+
+    # Applies per-book borrow deltas to all three counters. Upserts run in
+    # key order so concurrent borrows lock counter rows in the same order.
+    op.execute("""
+        CREATE FUNCTION borrow_stats_apply(p_book_ids integer[], p_deltas bigint[])
+        RETURNS void AS $$
+            INSERT INTO book_borrow_stats (book_id, borrow_count)
+            SELECT d.book_id, d.n FROM unnest(p_book_ids, p_deltas) AS d(book_id, n)
+            WHERE d.n <> 0
+            ORDER BY d.book_id
+            ON CONFLICT (book_id) DO UPDATE
+            SET borrow_count = book_borrow_stats.borrow_count + EXCLUDED.borrow_count;
+
+            INSERT INTO author_borrow_stats (author_id, borrow_count)
+            SELECT l.author_id, sum(d.n)
+            FROM unnest(p_book_ids, p_deltas) AS d(book_id, n)
+            JOIN book_author_link l ON l.book_id = d.book_id
+            GROUP BY l.author_id
+            HAVING sum(d.n) <> 0
+            ORDER BY l.author_id
+            ON CONFLICT (author_id) DO UPDATE
+            SET borrow_count = author_borrow_stats.borrow_count + EXCLUDED.borrow_count;
+
+            INSERT INTO category_borrow_stats (category_id, borrow_count)
+            SELECT l.category_id, sum(d.n)
+            FROM unnest(p_book_ids, p_deltas) AS d(book_id, n)
+            JOIN book_category_link l ON l.book_id = d.book_id
+            GROUP BY l.category_id
+            HAVING sum(d.n) <> 0
+            ORDER BY l.category_id
+            ON CONFLICT (category_id) DO UPDATE
+            SET borrow_count = category_borrow_stats.borrow_count + EXCLUDED.borrow_count;
+        $$ LANGUAGE sql
+    """)
+
+    # Statement-level, so a bulk write folds into one delta per book
+    op.execute("""
+        CREATE FUNCTION borrow_stats_on_insert() RETURNS trigger AS $$
+        BEGIN
+            PERFORM borrow_stats_apply(array_agg(book_id ORDER BY book_id), array_agg(n ORDER BY book_id))
+            FROM (SELECT book_id, count(*) AS n FROM new_rows GROUP BY book_id) d;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION borrow_stats_on_delete() RETURNS trigger AS $$
+        BEGIN
+            PERFORM borrow_stats_apply(array_agg(book_id ORDER BY book_id), array_agg(n ORDER BY book_id))
+            FROM (SELECT book_id, -count(*) AS n FROM old_rows GROUP BY book_id) d;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION borrow_stats_on_update() RETURNS trigger AS $$
+        BEGIN
+            PERFORM borrow_stats_apply(array_agg(book_id ORDER BY book_id), array_agg(n ORDER BY book_id))
+            FROM (
+                SELECT book_id, sum(n) AS n FROM (
+                    SELECT book_id, 1 AS n FROM new_rows
+                    UNION ALL
+                    SELECT book_id, -1 AS n FROM old_rows
+                ) moves
+                GROUP BY book_id
+            ) d;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER borrowedbook_stats_insert
+        AFTER INSERT ON borrowedbook
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION borrow_stats_on_insert()
+    """)
+    op.execute("""
+        CREATE TRIGGER borrowedbook_stats_delete
+        AFTER DELETE ON borrowedbook
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION borrow_stats_on_delete()
+    """)
+    op.execute("""
+        CREATE TRIGGER borrowedbook_stats_update
+        AFTER UPDATE ON borrowedbook
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION borrow_stats_on_update()
+    """)
+
+    # Linking a book moves its whole borrow history onto the author/category.
+    # FOR SHARE waits for an in-flight borrow of the same book, so either the
+    # borrow sees the new link or this sees the borrow (a book's very first
+    # borrow has no counter row to lock yet).
+    for link_table, stats_table, key in LINK_TABLES:
+        for event, transition, sign in (('insert', 'new_links', '+'), ('delete', 'old_links', '-')):
+            op.execute(f"""
+                CREATE FUNCTION {stats_table}_on_link_{event}() RETURNS trigger AS $$
+                BEGIN
+                    INSERT INTO {stats_table} ({key}, borrow_count)
+                    SELECT l.{key}, {sign}sum(s.borrow_count)
+                    FROM {transition} l
+                    JOIN (
+                        SELECT book_id, borrow_count FROM book_borrow_stats
+                        WHERE book_id IN (SELECT book_id FROM {transition})
+                        ORDER BY book_id
+                        FOR SHARE
+                    ) s ON s.book_id = l.book_id
+                    GROUP BY l.{key}
+                    ORDER BY l.{key}
+                    ON CONFLICT ({key}) DO UPDATE
+                    SET borrow_count = {stats_table}.borrow_count + EXCLUDED.borrow_count;
+                    RETURN NULL;
+                END
+                $$ LANGUAGE plpgsql
+            """)
+            op.execute(f"""
+                CREATE TRIGGER {link_table}_stats_{event}
+                AFTER {event.upper()} ON {link_table}
+                REFERENCING {'NEW' if event == 'insert' else 'OLD'} TABLE AS {transition}
+                FOR EACH STATEMENT EXECUTE FUNCTION {stats_table}_on_link_{event}()
+            """)
+
+    # Backfill from the existing loan history
+    op.execute("""
+        INSERT INTO book_borrow_stats (book_id, borrow_count)
+        SELECT book_id, count(*) FROM borrowedbook GROUP BY book_id
+    """)
+    op.execute("""
+        INSERT INTO author_borrow_stats (author_id, borrow_count)
+        SELECT l.author_id, sum(s.borrow_count)
+        FROM book_author_link l JOIN book_borrow_stats s ON s.book_id = l.book_id
+        GROUP BY l.author_id
+    """)
+    op.execute("""
+        INSERT INTO category_borrow_stats (category_id, borrow_count)
+        SELECT l.category_id, sum(s.borrow_count)
+        FROM book_category_link l JOIN book_borrow_stats s ON s.book_id = l.book_id
+        GROUP BY l.category_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for link_table, stats_table, _ in reversed(LINK_TABLES):
+        for event in ('delete', 'insert'):
+            op.execute(f"DROP TRIGGER {link_table}_stats_{event} ON {link_table}")
+            op.execute(f"DROP FUNCTION {stats_table}_on_link_{event}()")
+    for event in ('update', 'delete', 'insert'):
+        op.execute(f"DROP TRIGGER borrowedbook_stats_{event} ON borrowedbook")
+        op.execute(f"DROP FUNCTION borrow_stats_on_{event}()")
+    op.execute("DROP FUNCTION borrow_stats_apply(integer[], bigint[])")
+    for table, _, _ in reversed(STATS_TABLES):
+        op.drop_index(f'ix_{table}_top', table_name=table)
+        op.drop_table(table)
@@ -0,0 +1,30 @@
+"""Book available within quantity
+
+Revision ID: e6b1d4a8c372
+Revises: 9c4f1e8b2a67
+Create Date: 2026-10-18 19:42:31.208715
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b1d4a8c372'
+down_revision: Union[str, None] = '9c4f1e8b2a67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Racing returns could push the shelf count past the number of copies owned
+    op.execute("UPDATE book SET available = quantity WHERE available > quantity")
+    op.create_check_constraint('ck_book_available_within_quantity', 'book', 'available <= quantity')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ck_book_available_within_quantity', 'book', type_='check')
@@ -0,0 +1,30 @@
+"""updated_at indexes for incremental exports
+
+Revision ID: f8c3a6d1b054
+Revises: d41f7b2c9e63
+Create Date: 2026-10-18 14:02:31.776105
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8c3a6d1b054'
+down_revision: Union[str, None] = 'd41f7b2c9e63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_book_updated_at_id', 'book', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_borrowedbook_updated_at_id', 'borrowedbook', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_borrowedbook_updated_at_id', table_name='borrowedbook')
+    op.drop_index('ix_book_updated_at_id', table_name='book')
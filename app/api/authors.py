@@ -1,71 +1,94 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
-from app.db.database import get_session
+from app.db.database import AnySession, get_db
+from app.db.routing import get_read_db
 from app.models.author import AuthorCreate, AuthorRead, AuthorUpdate
-from app.crud.authors import crud_authors
+from app.crud.authors import async_crud_authors, crud_authors
+from app.utils.etag import is_conditional, not_modified, not_modified_response, set_validators, validators, versions_of
+from app.utils.responses import render_rows
 
 router = APIRouter()
 
 
 @router.post("/", response_model=AuthorRead, status_code=status.HTTP_201_CREATED)
-def create_author(
+async def create_author(
         author: AuthorCreate,
-        db: Session = Depends(get_session)
+        db: AnySession = Depends(get_db)
 ):
-    return crud_authors.create(db=db, obj_in=author)
+    return await async_crud_authors.create(db=db, obj_in=author)
 
 
 @router.get("/", response_model=List[AuthorRead])
-def read_authors(
+async def read_authors(
         *,
-        db: Session = Depends(get_session),
+        request: Request,
+        response: Response,
+        db: AnySession = Depends(get_read_db),
         skip: int = 0,
-        limit: int = 100
+        limit: int = Query(default=100, ge=1, le=1000),
+        cursor: Optional[str] = None,
+        sort: str = "id"
 ):
-    return crud_authors.get_multi(db=db, skip=skip, limit=limit)
+    if is_conditional(request):
+        rows, has_more = await async_crud_authors.page_versions(db=db, cursor=cursor, sort=sort, skip=skip, limit=limit)
+        etag, last_modified = validators(rows, has_more=has_more, collection=True)
+        if not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+
+    authors, next_cursor = await async_crud_authors.get_page(db=db, cursor=cursor, sort=sort, skip=skip, limit=limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    authors = [crud_authors.to_read(row) for row in authors]
+    set_validators(response, *validators(versions_of(authors), has_more=next_cursor is not None, collection=True))
+    return render_rows(authors, response)
 
 
 @router.get("/{author_id}", response_model=AuthorRead)
-def read_author(
+async def read_author(
         *,
         author_id: int,
-        db: Session = Depends(get_session)
+        request: Request,
+        response: Response,
+        db: AnySession = Depends(get_read_db)
 ):
-    author = crud_authors.get(db=db, id=author_id)
+    author = await async_crud_authors.get_read(db=db, id=author_id)
     if not author:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Author with ID {author_id} not found"
         )
+    etag, last_modified = validators(versions_of([author]))
+    if not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    set_validators(response, etag, last_modified)
     return author
 
 
 @router.put("/{author_id}", response_model=AuthorRead)
-def update_author(
+async def update_author(
         *,
         author_id: int,
         author: AuthorUpdate,
-        db: Session = Depends(get_session)
+        db: AnySession = Depends(get_db)
 ):
-    db_author = crud_authors.get(db=db, id=author_id)
+    db_author = await async_crud_authors.get(db=db, id=author_id)
     if not db_author:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Author with ID {author_id} not found"
         )
 
-    return crud_authors.update(db=db, db_obj=db_author, obj_in=author)
+    return await async_crud_authors.update(db=db, db_obj=db_author, obj_in=author)
 
 
 @router.delete("/{author_id}", response_model=AuthorRead)
-def delete_author(
+async def delete_author(
         *,
         author_id: int,
-        db: Session = Depends(get_session)
+        db: AnySession = Depends(get_db)
 ):
-    author = crud_authors.get(db=db, id=author_id)
+    author = await async_crud_authors.get(db=db, id=author_id)
     if not author:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -73,12 +96,12 @@ def delete_author(
         )
 
     # Check if author has books
-    if author.books:
+    if await async_crud_authors.has_books(db, id=author_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Cannot delete author with ID {author_id} because they have associated books"
         )
 
-    crud_authors.remove(db=db, id=author_id)
+    await async_crud_authors.remove(db=db, id=author_id)
 
     return author
\ No newline at end of file
@@ -1,77 +1,201 @@
 # app/api/books.py
-from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+import io
+from typing import List, Optional, Set
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 
-from app.db.database import get_session
-from app.models.book import BookCreate, BookRead, BookUpdate
-from app.crud.books import crud_books
+from app.db.database import AnySession, get_db, get_session, run_db
+from app.db.routing import get_read_db
+from app.models.book import BookCreate, BookImportReport, BookRead, BookSearchRead, BookUpdate
+from app.models.book_expanded import BookReadExpanded
+from app.crud.books import async_crud_books, crud_books
+from app.services.import_service import import_service
+from app.services.search_service import search_service
+from app.utils.streams import AsyncStreamReader
+from app.utils.etag import (
+    is_conditional, not_modified, not_modified_response, relation_versions_of, set_validators, validators, versions_of
+)
+from app.utils.exceptions import LibraryException
+from app.utils.responses import render_rows
 # from app.services.book_service import BookService
 
 router = APIRouter()
 # book_service = BookService()
 
 
+def parse_include(include: Optional[str] = Query(
+        default=None, description="Comma-separated relations to embed: authors, categories"
+)) -> Set[str]:
+    names = {name.strip() for name in include.split(",") if name.strip()} if include else set()
+    unknown = names - set(crud_books.includes)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include: {', '.join(sorted(unknown))}"
+        )
+    return names
+
+
 @router.post("/", response_model=BookRead, status_code=status.HTTP_201_CREATED)
-def create_book(
+async def create_book(
         book: BookCreate,
-        db: Session = Depends(get_session)
+        db: AnySession = Depends(get_db)
 ):
     # Check if a book with the same ISBN already exists
-    existing_books = crud_books.search_books(db, title=None, author_id=None)
-    for existing_book in existing_books:
-        if existing_book.isbn == book.isbn:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Book with ISBN {book.isbn} already exists"
-            )
+    if await async_crud_books.isbn_exists(db, book.isbn):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Book with ISBN {book.isbn} already exists"
+        )
 
-    return crud_books.create_with_relations(db=db, obj_in=book)
+    try:
+        return await async_crud_books.create_with_relations(db=db, obj_in=book)
+    except LibraryException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
 
-@router.get("/", response_model=List[BookRead])
-def read_books(
+@router.post("/import", response_model=BookImportReport)
+async def import_books(
+        request: Request,
+        format: str = Query(default="csv", pattern="^(csv|jsonl)$"),
+        db: Session = Depends(get_session)
+):
+    # The body is parsed as it arrives, never buffered whole; COPY needs the
+    # sync psycopg2 connection, so the import runs in a worker thread
+    stream = io.TextIOWrapper(
+        io.BufferedReader(AsyncStreamReader(request.stream())), encoding="utf-8", newline=""
+    )
+    return await run_in_threadpool(import_service.import_books, db, stream, format=format)
+
+
+# Relations are left out of the payload unless requested via ?include=
+@router.get("/", response_model=List[BookReadExpanded], response_model_exclude_unset=True)
+async def read_books(
         *,
-        db: Session = Depends(get_session),
+        request: Request,
+        response: Response,
+        db: AnySession = Depends(get_read_db),
+        include: Set[str] = Depends(parse_include),
         skip: int = 0,
-        limit: int = 100,
+        limit: int = Query(default=100, ge=1, le=1000),
+        cursor: Optional[str] = None,
+        sort: str = "id",
         title: Optional[str] = None,
         author_id: Optional[int] = None,
-        category_id: Optional[int] = None
+        category_id: Optional[int] = None,
+        match: str = Query(default="substring", pattern="^(substring|fuzzy)$"),
+        similarity: Optional[float] = Query(default=None, ge=0, le=1)
 ):
-    return crud_books.search_books(
+    # Typo-tolerant mode: trigram similarity on title and author names
+    if match == "fuzzy" and title:
+        # Ranked by score and paged with skip only
+        if cursor is not None or sort != "id":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="cursor and sort are not supported with match=fuzzy"
+            )
+        results = await run_db(
+            db,
+            search_service.fuzzy_search,
+            query=title,
+            threshold=similarity,
+            author_id=author_id,
+            category_id=category_id,
+            skip=skip,
+            limit=limit,
+            include=include
+        )
+        books = [crud_books.to_read(book, include) for book, _ in results]
+        # Ranking is too costly to repeat for a pre-check; a match still skips the body
+        etag, last_modified = validators(
+            versions_of(books), relations=relation_versions_of(books, include), collection=True
+        )
+        if not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        set_validators(response, etag, last_modified)
+        return render_rows(books, response)
+
+    if is_conditional(request):
+        rows, has_more = await async_crud_books.search_versions(
+            db=db,
+            title=title,
+            author_id=author_id,
+            category_id=category_id,
+            cursor=cursor,
+            sort=sort,
+            skip=skip,
+            limit=limit
+        )
+        relations = await async_crud_books.relation_versions(db, [id for id, _ in rows], include) if include else None
+        etag, last_modified = validators(rows, has_more=has_more, relations=relations, collection=True)
+        if not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+
+    books, next_cursor = await async_crud_books.search_books_page(
         db=db,
         title=title,
         author_id=author_id,
         category_id=category_id,
+        cursor=cursor,
+        sort=sort,
         skip=skip,
-        limit=limit
+        limit=limit,
+        include=include
     )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    books = [crud_books.to_read(book, include) for book in books]
+    set_validators(response, *validators(
+        versions_of(books),
+        has_more=next_cursor is not None,
+        relations=relation_versions_of(books, include),
+        collection=True
+    ))
+    return render_rows(books, response)
 
 
-@router.get("/{book_id}", response_model=BookRead)
-def read_book(
+@router.get("/{book_id}", response_model=BookReadExpanded, response_model_exclude_unset=True)
+async def read_book(
         *,
         book_id: int,
-        db: Session = Depends(get_session)
+        request: Request,
+        response: Response,
+        db: AnySession = Depends(get_read_db),
+        include: Set[str] = Depends(parse_include)
 ):
-    book = crud_books.get(db=db, id=book_id)
+    if include and is_conditional(request):
+        rows = await async_crud_books.row_versions(db, [book_id])
+        if rows:
+            relations = await async_crud_books.relation_versions(db, [book_id], include)
+            etag, last_modified = validators(rows, relations=relations)
+            if not_modified(request, etag, last_modified):
+                return not_modified_response(etag, last_modified)
+
+    if include:
+        book = await async_crud_books.get_expanded(db=db, id=book_id, include=include)
+    else:
+        book = await async_crud_books.get_read(db=db, id=book_id)
     if not book:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Book with ID {book_id} not found"
         )
+    etag, last_modified = validators(versions_of([book]), relations=relation_versions_of([book], include))
+    if not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    set_validators(response, etag, last_modified)
     return book
 
 
 @router.put("/{book_id}", response_model=BookRead)
-def update_book(
+async def update_book(
         *,
         book_id: int,
         book: BookUpdate,
-        db: Session = Depends(get_session)
+        db: AnySession = Depends(get_db)
 ):
-    db_book = crud_books.get(db=db, id=book_id)
+    db_book = await async_crud_books.get(db=db, id=book_id)
     if not db_book:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -79,53 +203,71 @@ def update_book(
         )
 
     # Check ISBN uniqueness if it's being updated
-    if book.isbn and book.isbn != db_book.isbn:
-        existing_books = crud_books.search_books(db, title=None, author_id=None, category_id=None)
-        for existing_book in existing_books:
-            if existing_book.isbn == book.isbn:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Book with ISBN {book.isbn} already exists"
-                )
+    if book.isbn and book.isbn != db_book.isbn and await async_crud_books.isbn_exists(db, book.isbn):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Book with ISBN {book.isbn} already exists"
+        )
 
-    return crud_books.update_with_relations(db=db, db_obj=db_book, obj_in=book)
+    try:
+        return await async_crud_books.update_with_relations(db=db, db_obj=db_book, obj_in=book)
+    except LibraryException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
 
 @router.delete("/{book_id}", response_model=BookRead)
-def delete_book(
+async def delete_book(
         *,
         book_id: int,
-        db: Session = Depends(get_session)
+        db: AnySession = Depends(get_db)
 ):
-    book = crud_books.get(db=db, id=book_id)
+    book = await async_crud_books.get(db=db, id=book_id)
     if not book:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Book with ID {book_id} not found"
         )
 
-    crud_books.remove(db=db, id=book_id)
-
-    deleted_book = crud_books.get(db=db, id=book_id)
-    if deleted_book:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to delete the book with ID {book_id}"
-        )
+    try:
+        await async_crud_books.remove(db=db, id=book_id)
+    except LibraryException as e:
+        # Deleted concurrently since the lookup above
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.detail)
 
     return book
 
-@router.get("/search/", response_model=List[BookRead])
-def search_books(
+@router.get("/search/", response_model=List[BookSearchRead], response_model_exclude_none=True)
+async def search_books(
         *,
-        db: Session = Depends(get_session),
+        db: AnySession = Depends(get_read_db),
+        q: Optional[str] = None,
         title: Optional[str] = None,
         author_id: Optional[int] = None,
-        category_id: Optional[int] = None
+        category_id: Optional[int] = None,
+        skip: int = Query(default=0, ge=0),
+        limit: int = Query(default=100, ge=1, le=1000)
 ):
-    return crud_books.search_books(
+    # Full-text mode: ranked matches over title, author and category names
+    if q:
+        results = await run_db(
+            db,
+            search_service.search,
+            query=q,
+            author_id=author_id,
+            category_id=category_id,
+            skip=skip,
+            limit=limit
+        )
+        return [
+            BookSearchRead(**BookRead.model_validate(book).model_dump(), rank=rank, highlight=highlight)
+            for book, rank, highlight in results
+        ]
+
+    return await async_crud_books.search_books(
         db=db,
         title=title,
         author_id=author_id,
-        category_id=category_id
+        category_id=category_id,
+        skip=skip,
+        limit=limit
     )
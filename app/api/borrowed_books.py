@@ -1,10 +1,13 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 
-from app.db.database import get_session
+from app.db.database import AnySession, get_db, run_db
+from app.db.routing import get_read_db
+from app.models.borrow_stats import PopularAuthorRead, PopularBookRead, PopularCategoryRead
 from app.models.borrowed_book import BorrowedBookCreate, BorrowedBookRead, BorrowedBookUpdate
-from app.crud.borrowed_books import crud_borrowed_books
+from app.crud.borrowed_books import async_crud_borrowed_books
+from app.services.book_service import book_service
+from app.services.stats_service import stats_service
 from app.models.user import User
 from app.models.book import Book
 from app.utils.exceptions import LibraryException
@@ -13,27 +16,27 @@ router = APIRouter()
 
 
 @router.post("/", response_model=BorrowedBookRead, status_code=status.HTTP_201_CREATED)
-def borrow_book(
+async def borrow_book(
     *,
-    db: Session = Depends(get_session),
+    db: AnySession = Depends(get_db),
     borrowed_book: BorrowedBookCreate
 ):
     try:
-        borrowed_book = crud_borrowed_books.create(db=db, obj_in=borrowed_book)
+        borrowed_book = await run_db(db, book_service.borrow, obj_in=borrowed_book)
         return borrowed_book
     except LibraryException as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
 
 # Return a book (update borrowed book status)
 @router.put("/{borrowed_book_id}", response_model=BorrowedBookRead)
-def return_book(
+async def return_book(
     *,
     borrowed_book_id: int,
-    db: Session = Depends(get_session),
+    db: AnySession = Depends(get_db),
     borrowed_book: BorrowedBookUpdate
 ):
-    existing_borrowed_book = crud_borrowed_books.get(db=db, id=borrowed_book_id)
+    existing_borrowed_book = await async_crud_borrowed_books.get(db=db, id=borrowed_book_id)
     if not existing_borrowed_book:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -41,46 +44,64 @@ def return_book(
         )
 
     try:
-        updated_borrowed_book = crud_borrowed_books.update(db=db, db_obj=existing_borrowed_book, obj_in=borrowed_book)
+        updated_borrowed_book = await run_db(
+            db, book_service.update_loan, loan=existing_borrowed_book, obj_in=borrowed_book
+        )
         return updated_borrowed_book
     except LibraryException as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
 
 @router.get("/user/{user_id}", response_model=List[BorrowedBookRead])
-def get_borrowed_books_by_user(
+async def get_borrowed_books_by_user(
     *,
     user_id: int,
-    db: Session = Depends(get_session)
+    response: Response,
+    db: AnySession = Depends(get_read_db),
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    sort: str = "id"
 ):
     try:
-        borrowed_books = crud_borrowed_books.get_by_user(db=db, user_id=user_id)
+        borrowed_books, next_cursor = await async_crud_borrowed_books.get_by_user(
+            db=db, user_id=user_id, cursor=cursor, sort=sort, limit=limit
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return borrowed_books
     except LibraryException as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.get("/book/{book_id}", response_model=List[BorrowedBookRead])
-def get_borrowed_books_by_book(
+async def get_borrowed_books_by_book(
     *,
     book_id: int,
-    db: Session = Depends(get_session)
+    response: Response,
+    db: AnySession = Depends(get_read_db),
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    sort: str = "id"
 ):
     try:
-        borrowed_books = crud_borrowed_books.get_by_book(db=db, book_id=book_id)
+        borrowed_books, next_cursor = await async_crud_borrowed_books.get_by_book(
+            db=db, book_id=book_id, cursor=cursor, sort=sort, limit=limit
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return borrowed_books
     except LibraryException as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 
 @router.delete("/{borrowed_book_id}", response_model=BorrowedBookRead)
-def delete_borrowed_book(
+async def delete_borrowed_book(
     *,
     borrowed_book_id: int,
-    db: Session = Depends(get_session)
+    db: AnySession = Depends(get_db)
 ):
-    existing_borrowed_book = crud_borrowed_books.get(db=db, id=borrowed_book_id)
+    existing_borrowed_book = await async_crud_borrowed_books.get(db=db, id=borrowed_book_id)
     if not existing_borrowed_book:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -88,46 +109,34 @@ def delete_borrowed_book(
         )
 
     try:
-        deleted_borrowed_book = crud_borrowed_books.delete(db=db, db_obj=existing_borrowed_book)
+        deleted_borrowed_book = await run_db(db, book_service.delete_loan, loan=existing_borrowed_book)
         return deleted_borrowed_book
     except LibraryException as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
 # Get most popular books
-@router.get("/most-popular-books", response_model=List[dict])
-def get_most_popular_books(
+@router.get("/most-popular-books", response_model=List[PopularBookRead])
+async def get_most_popular_books(
     *,
-    db: Session = Depends(get_session),
-    top_n: int = 10
+    db: AnySession = Depends(get_read_db),
+    top_n: int = Query(default=10, ge=1, le=100)
 ):
-    try:
-        popular_books = crud_borrowed_books.get_most_popular_books(db=db, top_n=top_n)
-        return popular_books
-    except LibraryException as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return await run_db(db, stats_service.most_popular_books, top_n=top_n)
 
 # Get most popular authors
-@router.get("/most-popular-authors", response_model=List[dict])
-def get_most_popular_authors(
+@router.get("/most-popular-authors", response_model=List[PopularAuthorRead])
+async def get_most_popular_authors(
     *,
-    db: Session = Depends(get_session),
-    top_n: int = 10
+    db: AnySession = Depends(get_read_db),
+    top_n: int = Query(default=10, ge=1, le=100)
 ):
-    try:
-        popular_authors = crud_borrowed_books.get_most_popular_authors(db=db, top_n=top_n)
-        return popular_authors
-    except LibraryException as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return await run_db(db, stats_service.most_popular_authors, top_n=top_n)
 
 # Get most popular categories
-@router.get("/most-popular-categories", response_model=List[dict])
-def get_most_popular_categories(
+@router.get("/most-popular-categories", response_model=List[PopularCategoryRead])
+async def get_most_popular_categories(
     *,
-    db: Session = Depends(get_session),
-    top_n: int = 10
+    db: AnySession = Depends(get_read_db),
+    top_n: int = Query(default=10, ge=1, le=100)
 ):
-    try:
-        popular_categories = crud_borrowed_books.get_most_popular_categories(db=db, top_n=top_n)
-        return popular_categories
-    except LibraryException as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
\ No newline at end of file
+    return await run_db(db, stats_service.most_popular_categories, top_n=top_n)
@@ -1,65 +1,88 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
-from app.db.database import get_session
+from app.db.database import AnySession, get_db
+from app.db.routing import get_read_db
 from app.models.category import CategoryRead, CategoryCreate, CategoryUpdate
-from app.crud.categories import crud_categories
+from app.crud.categories import async_crud_categories, crud_categories
+from app.utils.etag import is_conditional, not_modified, not_modified_response, set_validators, validators, versions_of
+from app.utils.responses import render_rows
 
 router = APIRouter()
 
 
 @router.post("/", response_model=CategoryRead, status_code=status.HTTP_201_CREATED)
-def create_category(
+async def create_category(
         category: CategoryCreate,
-        db: Session = Depends(get_session)
+        db: AnySession = Depends(get_db)
 ):
-    return crud_categories.create(db=db, obj_in=category)
+    return await async_crud_categories.create(db=db, obj_in=category)
 
 @router.get("/", response_model=List[CategoryRead])
-def read_categories(
-        db: Session = Depends(get_session),
+async def read_categories(
+        request: Request,
+        response: Response,
+        db: AnySession = Depends(get_read_db),
         skip: int = 0,
-        limit: int = 100
+        limit: int = Query(default=100, ge=1, le=1000),
+        cursor: Optional[str] = None,
+        sort: str = "id"
 ):
-    return crud_categories.get_multi(db=db, skip=skip, limit=limit)
+    if is_conditional(request):
+        rows, has_more = await async_crud_categories.page_versions(db=db, cursor=cursor, sort=sort, skip=skip, limit=limit)
+        etag, last_modified = validators(rows, has_more=has_more, collection=True)
+        if not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+
+    categories, next_cursor = await async_crud_categories.get_page(db=db, cursor=cursor, sort=sort, skip=skip, limit=limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    categories = [crud_categories.to_read(row) for row in categories]
+    set_validators(response, *validators(versions_of(categories), has_more=next_cursor is not None, collection=True))
+    return render_rows(categories, response)
 
 @router.get("/{category_id}", response_model=CategoryRead)
-def read_category(
+async def read_category(
         category_id: int,
-        db: Session = Depends(get_session)
+        request: Request,
+        response: Response,
+        db: AnySession = Depends(get_read_db)
 ):
-    category = crud_categories.get(db=db, id=category_id)
+    category = await async_crud_categories.get_read(db=db, id=category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Category with ID {category_id} not found"
         )
+    etag, last_modified = validators(versions_of([category]))
+    if not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    set_validators(response, etag, last_modified)
     return category
 
 @router.put("/{category_id}", response_model=CategoryRead)
-def update_category(
+async def update_category(
         category_id: int,
         category: CategoryUpdate,
-        db: Session = Depends(get_session)
+        db: AnySession = Depends(get_db)
 ):
-    db_category = crud_categories.get(db=db, id=category_id)
+    db_category = await async_crud_categories.get(db=db, id=category_id)
     if not db_category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Category with ID {category_id} not found"
         )
-    return crud_categories.update(db=db, db_obj=db_category, obj_in=category)
+    return await async_crud_categories.update(db=db, db_obj=db_category, obj_in=category)
 
 @router.delete("/{category_id}", response_model=CategoryRead)
-def delete_category(
+async def delete_category(
         category_id: int,
-        db: Session = Depends(get_session)
+        db: AnySession = Depends(get_db)
 ):
-    category = crud_categories.get(db=db, id=category_id)
+    category = await async_crud_categories.get(db=db, id=category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Category with ID {category_id} not found"
         )
-    return crud_categories.remove(db=db, id=category_id)
+    return await async_crud_categories.remove(db=db, id=category_id)
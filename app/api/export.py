@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from app.models.book import BookRead
+from app.models.borrowed_book import BorrowedBookRead
+from app.services.export_service import export_service
+
+router = APIRouter()
+
+NDJSON = "application/x-ndjson"
+
+
+@router.get("/books.ndjson")
+async def export_books(
+        updated_since: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None
+):
+    statement = export_service.books_statement(updated_since=updated_since, updated_before=updated_before)
+    return StreamingResponse(export_service.stream_ndjson(statement, BookRead), media_type=NDJSON)
+
+
+@router.get("/loans.ndjson")
+async def export_loans(
+        updated_since: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None,
+        user_id: Optional[int] = None,
+        book_id: Optional[int] = None
+):
+    statement = export_service.loans_statement(
+        updated_since=updated_since, updated_before=updated_before, user_id=user_id, book_id=book_id
+    )
+    return StreamingResponse(export_service.stream_ndjson(statement, BorrowedBookRead), media_type=NDJSON)
@@ -0,0 +1,47 @@
+from anyio import to_thread
+from fastapi import APIRouter
+from starlette.concurrency import run_in_threadpool
+from sqlmodel import Session
+
+from app.config import get_settings
+from app.db.database import async_pool_stats, get_async_engine, get_engine, pool_stats
+from app.db.routing import get_replica_set
+from app.utils.cache import get_cache
+
+router = APIRouter()
+
+
+@router.get("/pool")
+async def read_pool_stats():
+    limiter = to_thread.current_default_thread_limiter()
+    stats = {
+        "sync": pool_stats.snapshot(get_engine().pool),
+        "threadpool": {
+            "size": limiter.total_tokens,
+            "busy": limiter.borrowed_tokens,
+            "waiting": limiter.statistics().tasks_waiting,
+        },
+    }
+    if get_settings().DB_ASYNC:
+        stats["async"] = async_pool_stats.snapshot(get_async_engine().sync_engine.pool)
+    replicas = get_replica_set().stats()
+    if replicas:
+        stats["replicas"] = replicas
+    return stats
+
+
+@router.get("/cache")
+async def read_cache_stats():
+    cache = get_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
+
+@router.get("/notifications")
+async def read_notification_stats():
+    from app.services.notification_service import notification_service, notification_worker
+
+    def queue_depth():
+        with Session(get_engine()) as db:
+            return notification_service.queue_depth(db)
+
+    return {"queue": await run_in_threadpool(queue_depth), "worker": notification_worker.stats()}
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.metrics import CONTENT_TYPE_LATEST, render
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def read_metrics():
+    # Multiprocess mode reads every worker's files, so keep it off the event loop
+    return Response(await run_in_threadpool(render), media_type=CONTENT_TYPE_LATEST)
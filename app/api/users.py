@@ -1,36 +1,45 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 
-from app.db.database import get_session
+from app.db.database import AnySession, get_db, run_db
+from app.db.routing import get_read_db
+from app.models.fine import UserFinesRead
 from app.models.user import UserRead, UserCreate, UserUpdate
-from app.crud.users import crud_users
+from app.crud.users import async_crud_users, crud_users
+from app.services.fine_service import fine_service
+from app.utils.responses import render_rows
 
 router = APIRouter()
 
 
 
 @router.post("/", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def create_user(
+async def create_user(
         user: UserCreate,
-        db: Session = Depends(get_session)
+        db: AnySession = Depends(get_db)
 ):
-    return crud_users.create(db=db, obj_in=user)
+    return await async_crud_users.create(db=db, obj_in=user)
 
 @router.get("/", response_model=List[UserRead])
-def read_users(
-        db: Session = Depends(get_session),
+async def read_users(
+        response: Response,
+        db: AnySession = Depends(get_read_db),
         skip: int = 0,
-        limit: int = 100
+        limit: int = Query(default=100, ge=1, le=1000),
+        cursor: Optional[str] = None,
+        sort: str = "id"
 ):
-    return crud_users.get_multi(db=db, skip=skip, limit=limit)
+    users, next_cursor = await async_crud_users.get_page(db=db, cursor=cursor, sort=sort, skip=skip, limit=limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return render_rows([crud_users.to_read(user) for user in users], response)
 
 @router.get("/{user_id}", response_model=UserRead)
-def read_user(
+async def read_user(
         user_id: int,
-        db: Session = Depends(get_session)
+        db: AnySession = Depends(get_read_db)
 ):
-    user = crud_users.get(db=db, id=user_id)
+    user = await async_crud_users.get_read(db=db, id=user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -38,29 +47,36 @@ def read_user(
         )
     return user
 
+@router.get("/{user_id}/fines", response_model=UserFinesRead)
+async def read_user_fines(
+        user_id: int,
+        db: AnySession = Depends(get_read_db)
+):
+    return await run_db(db, fine_service.user_fines, user_id)
+
 @router.put("/{user_id}", response_model=UserRead)
-def update_user(
+async def update_user(
         user_id: int,
         user: UserUpdate,
-        db: Session = Depends(get_session)
+        db: AnySession = Depends(get_db)
 ):
-    db_user = crud_users.get(db=db, id=user_id)
+    db_user = await async_crud_users.get(db=db, id=user_id)
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User with ID {user_id} not found"
         )
-    return crud_users.update(db=db, db_obj=db_user, obj_in=user)
+    return await async_crud_users.update(db=db, db_obj=db_user, obj_in=user)
 
 @router.delete("/{user_id}", response_model=UserRead)
-def delete_user(
+async def delete_user(
         user_id: int,
-        db: Session = Depends(get_session)
+        db: AnySession = Depends(get_db)
 ):
-    user = crud_users.get(db=db, id=user_id)
+    user = await async_crud_users.get(db=db, id=user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User with ID {user_id} not found"
         )
-    return crud_users.remove(db=db, id=user_id)
+    return await async_crud_users.remove(db=db, id=user_id)
@@ -1,36 +1,110 @@
 # app.config.py
-import os
 import logging
-from pydantic_settings import BaseSettings
+from typing import Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-
-logger.info(f"DATABASE_URL environment variable: {os.getenv('DATABASE_URL')}")
+# Handlers are attached by setup_logging() at startup, not on import
+logger = logging.getLogger("library_api")
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Serve requests through AsyncSession/asyncpg; False falls back to sync sessions
+    DB_ASYNC: bool = True
+
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Comma-separated replica URLs for read-only endpoints; empty keeps every query on the primary
+    DB_REPLICA_URLS: str = ""
+    # A replica that refused a connection is skipped for this long
+    DB_REPLICA_RETRY_SECONDS: float = 30
+    # After a write, the client's reads stay on the primary for this long (0 disables)
+    DB_READ_YOUR_WRITES_SECONDS: float = 5
+    # Upgrade the schema in-process at startup; turn off when deployments migrate separately
+    RUN_MIGRATIONS_ON_STARTUP: bool = True
+    # Worker threads for sync endpoints and sync sessions; defaults to the pool capacity
+    THREADPOOL_SIZE: Optional[int] = None
     ENVIRONMENT: str = "development"
     LOG_LEVEL: str = "info"
 
     MAX_BORROWS_PER_USER: int = 5
     BORROW_DURATION_DAYS: int = 14
     OVERDUE_FINE_RATE: float = 0.5
+    # Seconds between scheduled fine recomputes; 0 leaves it to the CLI/cron
+    FINES_RECOMPUTE_INTERVAL_SECONDS: float = 3600
 
     LOG_DIR: str = "logs"
+    # Emit JSON lines instead of plain text
+    LOG_JSON: bool = False
+    # Fraction of successful request logs kept; errors and slow requests are always logged
+    LOG_SAMPLE_RATE: float = 1.0
+    LOG_SLOW_REQUEST_MS: float = 1000
+    # Debug: report each request's SQL statement count and time as X-DB-Queries / X-DB-Time
+    DB_QUERY_HEADERS: bool = False
+    # Warn when one statement runs more than this many times in a request (likely N+1); 0 disables
+    DB_REPEATED_QUERY_THRESHOLD: int = 10
+
+    # Due-date and overdue reminder emails
+    NOTIFICATIONS_ENABLED: bool = False
+    NOTIFY_DUE_SOON_DAYS: int = 2
+    NOTIFY_ENQUEUE_INTERVAL_SECONDS: float = 3600
+    NOTIFY_WORKERS: int = 4
+    # Messages sent over one SMTP connection
+    NOTIFY_BATCH_SIZE: int = 50
+    NOTIFY_POLL_SECONDS: float = 5
+    # A claimed batch is retried after this long if its worker never reports back
+    NOTIFY_LEASE_SECONDS: float = 300
+    NOTIFY_MAX_ATTEMPTS: int = 5
+    # Retry n waits base * 2**(n-1) seconds, capped at the max
+    NOTIFY_RETRY_BASE_SECONDS: float = 30
+    NOTIFY_RETRY_MAX_SECONDS: float = 3600
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 25
+    SMTP_USERNAME: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    SMTP_STARTTLS: bool = False
+    SMTP_TIMEOUT: float = 10
+    MAIL_FROM: str = "library@example.com"
+
+    ISBN_FILTER_ENABLED: bool = True
+    ISBN_FILTER_CAPACITY: int = 5_000_000
+    ISBN_FILTER_ERROR_RATE: float = 0.01
+
+    FUZZY_SIMILARITY_THRESHOLD: float = 0.3
+
+    # Read-through cache for single-entity GETs, per worker process
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 10_000
+    CACHE_TTL_SECONDS: float = 30
+
+    # JSON encoder for API responses: "orjson", or "json" for the standard library
+    JSON_ENCODER: str = "orjson"
+    # Negotiated br/gzip for bodies of at least COMPRESSION_MINIMUM_SIZE bytes;
+    # br needs the optional brotli package
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Rows fetched per server-side cursor round trip by the NDJSON exports
+    EXPORT_BATCH_SIZE: int = 1000
+
+    IMPORT_BATCH_SIZE: int = 5000
+    # Only the first N row errors are listed in an import report; all are counted
+    IMPORT_MAX_REPORTED_ERRORS: int = 1000
 
-    class Config:
-        env_file = ".env"
-        extra = "ignore"
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 @lru_cache()
 def get_settings() -> BaseSettings:
     try:
         settings = Settings()
-        logger.info(f"Loaded settings: DATABASE_URL={settings.DATABASE_URL}, ENVIRONMENT={settings.ENVIRONMENT}")
+        logger.info(f"Loaded settings: ENVIRONMENT={settings.ENVIRONMENT}")
         return settings
     except Exception as e:
         logger.error(f"Error loading settings: {e}")
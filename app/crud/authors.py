@@ -1,14 +1,18 @@
 from typing import List, Optional
+from sqlalchemy import delete
 from sqlmodel import Session, select
 
 from app.utils.exceptions import LibraryException
-from app.models.author import Author, AuthorCreate, AuthorUpdate
+from app.models.author import Author, AuthorCreate, AuthorUpdate, AuthorRead
 from app.models.book import BookAuthorLink
-from app.crud.base import CRUDBase
-from datetime import datetime, timezone
+from app.crud.base import AsyncCRUD, CRUDBase
+from app.db.types import utcnow
 
 
 class CRUDAuthor(CRUDBase[Author, AuthorCreate, AuthorUpdate]):
+    sort_keys = {"id": "id", "created_at": "created_at"}
+    read_model = AuthorRead
+
     def create(self, db: Session, *, obj_in: AuthorCreate) -> Author:
 
         author = Author(
@@ -31,10 +35,9 @@ class CRUDAuthor(CRUDBase[Author, AuthorCreate, AuthorUpdate]):
             return None
         return db_obj
 
-    def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[Author]:
-        statement = select(Author).offset(skip).limit(limit)
-        results = db.exec(statement).all()
-        return results
+    def has_books(self, db: Session, *, id: int) -> bool:
+        statement = select(BookAuthorLink.book_id).where(BookAuthorLink.author_id == id).limit(1)
+        return db.exec(statement).first() is not None
 
     def update(self, db, *, db_obj, obj_in):
         update_data = obj_in.model_dump(exclude_unset=True)
@@ -42,9 +45,10 @@ class CRUDAuthor(CRUDBase[Author, AuthorCreate, AuthorUpdate]):
         for field in update_data:
             setattr(db_obj, field, update_data[field])
 
-        db_obj.updated_at = datetime.now(timezone.utc)
+        db_obj.updated_at = utcnow()
         db.add(db_obj)
         db.commit()
+        self.invalidate(db_obj.id)
         db.refresh(db_obj)
 
         return db_obj
@@ -54,14 +58,8 @@ class CRUDAuthor(CRUDBase[Author, AuthorCreate, AuthorUpdate]):
         if not db_obj:
             raise LibraryException(f"Author with ID {id} not found")
 
-        statement = select(BookAuthorLink).where(BookAuthorLink.author_id == id)
-        links = db.exec(statement).all()
-        for link in links:
-            db.delete(link)
-
-        db.flush()
-
-        db.delete(db_obj)
-        db.commit()
+        db.exec(delete(BookAuthorLink).where(BookAuthorLink.author_id == id))
+        self.remove(db, id=id)
 
-crud_authors = CRUDAuthor(Author)
\ No newline at end of file
+crud_authors = CRUDAuthor(Author)
+async_crud_authors = AsyncCRUD(crud_authors)
\ No newline at end of file
@@ -1,27 +1,135 @@
 # app/crud/base.py
-from typing import Generic, List, Optional, Type, TypeVar
+import time
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import delete
 from sqlmodel import Session, SQLModel, select
 
+from app.crud.pagination import page_statement, paginate
+from app.db.database import AnySession, run_db
+from app.utils.cache import get_cache
+from app.utils.exceptions import LibraryException
+from app.utils.metrics import CRUD_LATENCY
+
 ModelType = TypeVar("ModelType", bound=SQLModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Public sort key -> model attribute; each one is backed by an (attr, id) index
+    sort_keys: Dict[str, str] = {"id": "id"}
+    # Serialized form kept in the entity cache by get_read()
+    read_model: Optional[Type[BaseModel]] = None
+
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
     def get(self, db: Session, id: int) -> Optional[ModelType]:
         return db.get(self.model, id)
 
+    def cache_key(self, id: int) -> str:
+        return f"{self.model.__tablename__}:{id}"
+
+    def get_read(self, db: Session, id: int) -> Optional[Dict[str, Any]]:
+        """Read-through cached `read_model` dump of one row, or None if missing."""
+        cache = get_cache()
+        if cache is not None:
+            cached = cache.get(self.cache_key(id))
+            if cached is not None:
+                return cached
+            token = cache.token()
+
+        db_obj = self.get(db, id)
+        if db_obj is None:
+            return None
+        data = self.read_model.model_validate(db_obj).model_dump(mode="json")
+        # A lagging replica could put back a row that a write just invalidated
+        if cache is not None and "replica" not in db.info:
+            cache.set(self.cache_key(id), data, token=token)
+        return data
+
+    def to_read(self, obj: ModelType) -> Dict[str, Any]:
+        """`read_model` fields of a loaded row, read straight off its columns.
+
+        Same dict as read_model.model_validate(obj).model_dump() without
+        validating values the database already typed, which is most of the
+        cost of a large page.
+        """
+        return {name: getattr(obj, name) for name in self.read_model.model_fields}
+
+    def invalidate(self, id: int) -> None:
+        cache = get_cache()
+        if cache is not None:
+            cache.delete(self.cache_key(id))
+
+    def sort_column(self, sort: str):
+        name = sort.lstrip("-")
+        if name not in self.sort_keys:
+            raise LibraryException(
+                f"Unsupported sort key '{name}', expected one of: {', '.join(self.sort_keys)}"
+            )
+        return getattr(self.model, self.sort_keys[name])
+
+    def get_page(
+            self,
+            db: Session,
+            *,
+            cursor: Optional[str] = None,
+            sort: str = "id",
+            skip: int = 0,
+            limit: int = 100,
+            statement=None
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        if statement is None:
+            statement = select(self.model)
+        return paginate(
+            db,
+            statement,
+            sort=sort,
+            sort_column=self.sort_column(sort),
+            id_column=self.model.id,
+            cursor=cursor,
+            skip=skip,
+            limit=limit
+        )
+
+    def page_versions(
+            self,
+            db: Session,
+            *,
+            cursor: Optional[str] = None,
+            sort: str = "id",
+            skip: int = 0,
+            limit: int = 100,
+            statement=None
+    ) -> Tuple[List[Tuple[int, Any]], bool]:
+        """(id, updated_at) of the rows get_page() would return and whether
+        more follow, without loading the rows themselves."""
+        if statement is None:
+            statement = select(self.model.id, self.model.updated_at)
+        statement, _ = page_statement(
+            statement,
+            sort=sort,
+            sort_column=self.sort_column(sort),
+            id_column=self.model.id,
+            cursor=cursor,
+            skip=skip,
+            limit=limit
+        )
+        rows = [tuple(row) for row in db.exec(statement).all()]
+        return rows[:limit], len(rows) > limit
+
+    def row_versions(self, db: Session, ids: List[int]) -> List[Tuple[int, Any]]:
+        statement = select(self.model.id, self.model.updated_at).where(self.model.id.in_(ids)).order_by(self.model.id)
+        return [tuple(row) for row in db.exec(statement).all()]
+
     def get_multi(
             self, db: Session, *, skip: int = 0, limit: int = 100
     ) -> List[ModelType]:
-        statement = select(self.model).offset(skip).limit(limit)
-        results = db.exec(statement)
-        return [item for item in results]
+        results, _ = self.get_page(db, skip=skip, limit=limit)
+        return results
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
@@ -43,11 +151,52 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         db.add(db_obj)
         db.commit()
+        self.invalidate(db_obj.id)
         db.refresh(db_obj)
         return db_obj
 
     def remove(self, db: Session, *, id: int) -> ModelType:
         obj = db.get(self.model, id)
-        db.delete(obj)
+        # A bulk DELETE: session.delete() would first load every relationship
+        # collection (e.g. all of a category's books). The session forgets
+        # `obj`, which keeps its loaded fields for the response.
+        db.exec(delete(self.model).where(self.model.id == id))
         db.commit()
-        return obj
\ No newline at end of file
+        self.invalidate(id)
+        return obj
+
+
+class AsyncCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """Awaitable view of a CRUD object for the async routers.
+
+    Every method keeps its sync signature and runs on the request session via
+    `run_db`: on the async driver through AsyncSession.run_sync, or in the
+    threadpool when the sync path is configured. Each call is timed into the
+    crud_operation_duration_seconds histogram.
+    """
+
+    def __init__(self, crud: CRUDBase[ModelType, CreateSchemaType, UpdateSchemaType]):
+        self.crud = crud
+        # CRUDBorrowedBook is not a CRUDBase and has no `model`
+        model = getattr(crud, "model", None)
+        self._label = model.__name__ if model is not None else type(crud).__name__.removeprefix("CRUD")
+        self._timers: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.crud, name)
+        if not callable(attr):
+            return attr
+
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = CRUD_LATENCY.labels(self._label, name)
+
+        async def method(db: AnySession, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await run_db(db, attr, *args, **kwargs)
+            finally:
+                timer.observe(time.perf_counter() - start)
+
+        method.__name__ = name
+        return method
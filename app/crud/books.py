@@ -1,38 +1,149 @@
-from typing import List, Optional
+import threading
+from typing import Any, Collection, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import delete, func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import raiseload, selectinload
 from sqlmodel import Session, select
-from datetime import datetime
 
-from app.models.book import Book, BookCreate, BookUpdate
-from app.models.author import Author
-from app.models.category import Category
+from app.db.types import utcnow
+from app.models.book import Book, BookCreate, BookRead, BookUpdate
+from app.models.author import Author, AuthorRead
+from app.models.category import Category, CategoryRead
 from app.models.book import BookAuthorLink, BookCategoryLink
-from app.crud.base import CRUDBase
+from app.crud.base import AsyncCRUD, CRUDBase
+from app.utils.bloom_filter import BloomFilter
 from app.utils.exceptions import LibraryException
 
 
+def _is_isbn_conflict(exc: IntegrityError) -> bool:
+    return "ix_book_isbn" in str(exc.orig)
+
+
+def _is_available_violation(exc: IntegrityError) -> bool:
+    return "ck_book_available_nonnegative" in str(exc.orig)
+
+
 class CRUDBook(CRUDBase[Book, BookCreate, BookUpdate]):
+    sort_keys = {
+        "id": "id",
+        "title": "title",
+        "publication_year": "publication_year",
+        "created_at": "created_at",
+    }
+    read_model = BookRead
+    # Relations that ?include= may expand, with their read models
+    includes = {"authors": AuthorRead, "categories": CategoryRead}
+    relation_links = {
+        "authors": (Author, BookAuthorLink, BookAuthorLink.author_id),
+        "categories": (Category, BookCategoryLink, BookCategoryLink.category_id),
+    }
+
+    def __init__(self, model):
+        super().__init__(model)
+        # Optional in-process filter in front of the ix_book_isbn lookup.
+        # It is per worker, so a miss is only a hint: the unique index stays
+        # the source of truth and a racing insert surfaces as a conflict.
+        self.isbn_filter: Optional[BloomFilter] = None
+        # ISBNs written while a warm-up scan runs, merged in before it is published
+        self._isbns_during_warm_up: Dict[int, Set[str]] = {}
+        self._isbn_lock = threading.Lock()
+
+    def warm_isbn_filter(self, db: Session, *, capacity: int, error_rate: float) -> int:
+        written: Set[str] = set()
+        with self._isbn_lock:
+            self._isbns_during_warm_up[id(written)] = written
+        try:
+            isbn_filter = BloomFilter(capacity=capacity, error_rate=error_rate)
+            statement = select(Book.isbn).execution_options(yield_per=10000)
+            isbn_filter.update(db.exec(statement))
+        except Exception:
+            with self._isbn_lock:
+                del self._isbns_during_warm_up[id(written)]
+            raise
+        with self._isbn_lock:
+            del self._isbns_during_warm_up[id(written)]
+            isbn_filter.update(written)
+            self.isbn_filter = isbn_filter
+        return isbn_filter.count
+
+    def remember_isbn(self, isbn: str) -> None:
+        with self._isbn_lock:
+            for written in self._isbns_during_warm_up.values():
+                written.add(isbn)
+            if self.isbn_filter is not None:
+                self.isbn_filter.add(isbn)
+
+    def get_by_isbn(self, db: Session, isbn: str) -> Optional[Book]:
+        return db.exec(select(Book).where(Book.isbn == isbn)).first()
+
+    def get_existing_isbns(self, db: Session, isbns: Iterable[str]) -> Set[str]:
+        candidates = set(isbns)
+        if self.isbn_filter is not None:
+            candidates = {isbn for isbn in candidates if isbn in self.isbn_filter}
+        if not candidates:
+            return set()
+        statement = select(Book.isbn).where(Book.isbn.in_(candidates))
+        return set(db.exec(statement).all())
+
+    def isbn_exists(self, db: Session, isbn: str) -> bool:
+        if self.isbn_filter is not None and isbn not in self.isbn_filter:
+            return False
+        return db.exec(select(Book.id).where(Book.isbn == isbn)).first() is not None
+
+    def include_options(self, include: Collection[str]) -> list:
+        """Loader options for `include`: one SELECT ... IN per relation, any
+        other relation access raises instead of lazily querying per row."""
+        if not include:
+            return []
+        return [selectinload(getattr(Book, name)) for name in sorted(include)] + [raiseload("*")]
+
+    def to_read(self, book: Book, include: Collection[str] = ()) -> Dict[str, Any]:
+        data = super().to_read(book)
+        for name in include:
+            fields = self.includes[name].model_fields
+            data[name] = [{field: getattr(item, field) for field in fields} for item in getattr(book, name)]
+        return data
+
+    def get_expanded(self, db: Session, id: int, include: Collection[str]) -> Optional[Dict[str, Any]]:
+        statement = select(Book).where(Book.id == id).options(*self.include_options(include))
+        book = db.exec(statement).first()
+        return self.to_read(book, include) if book else None
+
     def create_with_relations(
             self, db: Session, *, obj_in: BookCreate
     ) -> Book:
-        # Create book instance
-        book = Book(
-            title=obj_in.title,
-            publication_year=obj_in.publication_year,
-            isbn=obj_in.isbn,
-            quantity=obj_in.quantity
-        )
-        db.add(book)
-        db.flush()  # Flush to get book ID without committing
+        try:
+            # Create book instance
+            book = Book(
+                title=obj_in.title,
+                publication_year=obj_in.publication_year,
+                isbn=obj_in.isbn,
+                quantity=obj_in.quantity,
+                available=obj_in.quantity
+            )
+            db.add(book)
+            db.flush()  # Flush to get book ID without committing
 
-        # Add author relationships
-        self._set_authors(db, book, obj_in.author_ids)
+            # A new book has no links yet, so there is nothing to diff against
+            self._set_authors(db, book, obj_in.author_ids, current=set())
 
-        # Add category relationships if category_ids exists in obj_in
-        if hasattr(obj_in, 'category_ids'):
-            self._set_categories(db, book, obj_in.category_ids)
+            # Add category relationships if category_ids exists in obj_in
+            if hasattr(obj_in, 'category_ids'):
+                self._set_categories(db, book, obj_in.category_ids, current=set())
+
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            if _is_isbn_conflict(e):
+                self.remember_isbn(obj_in.isbn)
+                raise LibraryException(f"Book with ISBN {obj_in.isbn} already exists") from e
+            raise
+        except LibraryException:
+            db.rollback()
+            raise
 
-        db.commit()
         db.refresh(book)
+        self.remember_isbn(book.isbn)
         return book
 
     def get(self, db: Session, id: int) -> Book:
@@ -47,61 +158,116 @@ class CRUDBook(CRUDBase[Book, BookCreate, BookUpdate]):
     ) -> Book:
         # Update simple fields
         update_data = obj_in.model_dump(exclude_unset=True)
+        if update_data.get("quantity") is not None and update_data["quantity"] != db_obj.quantity:
+            # Shift the shelf count in SQL so it composes with concurrent borrows;
+            # the CHECK constraint rejects dropping below the copies on loan
+            db_obj.available = Book.available + (update_data["quantity"] - db_obj.quantity)
+
         simple_fields = ["title", "publication_year", "isbn", "quantity"]
         for field in simple_fields:
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
 
-        db_obj.updated_at = datetime.utcnow()
+        db_obj.updated_at = utcnow()
 
-        # Update relationships if provided
-        if obj_in.author_ids is not None:
-            self._set_authors(db, db_obj, obj_in.author_ids)
+        try:
+            # Update relationships if provided
+            if obj_in.author_ids is not None:
+                self._set_authors(db, db_obj, obj_in.author_ids)
 
-        if hasattr(obj_in, 'category_ids') and obj_in.category_ids is not None:
-            self._set_categories(db, db_obj, obj_in.category_ids)
+            if hasattr(obj_in, 'category_ids') and obj_in.category_ids is not None:
+                self._set_categories(db, db_obj, obj_in.category_ids)
+
+            db.add(db_obj)
+            db.commit()
+            self.invalidate(db_obj.id)
+        except IntegrityError as e:
+            db.rollback()
+            if _is_isbn_conflict(e):
+                raise LibraryException(f"Book with ISBN {obj_in.isbn} already exists") from e
+            if _is_available_violation(e):
+                raise LibraryException("Quantity cannot be lower than the number of copies on loan") from e
+            raise
+        except LibraryException:
+            db.rollback()
+            raise
 
-        db.add(db_obj)
-        db.commit()
         db.refresh(db_obj)
+        self.remember_isbn(db_obj.isbn)
         return db_obj
 
-    def _set_authors(self, db: Session, book: Book, author_ids: List[int]) -> None:
-        # Clear existing relationships
-        statement = select(BookAuthorLink).where(BookAuthorLink.book_id == book.id)
-        existing_links = db.exec(statement).all()
-        for link in existing_links:
-            db.delete(link)
-        db.flush()
-
-        # Add new relationships
-        for author_id in author_ids:
-            # Check if author exists
-            author = db.get(Author, author_id)
-            if not author:
-                raise LibraryException(f"Author with ID {author_id} not found")
-
-            # Create new link
-            link = BookAuthorLink(book_id=book.id, author_id=author_id)
-            db.add(link)
-
-    def _set_categories(self, db: Session, book: Book, category_ids: List[int]) -> None:
-        statement = select(BookCategoryLink).where(BookCategoryLink.book_id == book.id)
-        existing_links = db.exec(statement).all()
-        for link in existing_links:
-            db.delete(link)
-        db.flush()
-
-        # Add new relationships
-        for category_id in category_ids:
-            category = db.get(Category, category_id)
-            if not category:
-                raise LibraryException(f"Category with ID {category_id} not found")
-
-            # Create new link
-            link = BookCategoryLink(book_id=book.id, category_id=category_id)
-            db.add(link)
-        pass
+    def _set_authors(
+            self, db: Session, book: Book, author_ids: List[int], *, current: Optional[Set[int]] = None
+    ) -> None:
+        self._sync_links(
+            db, book.id, author_ids,
+            link_model=BookAuthorLink, link_column=BookAuthorLink.author_id,
+            target_model=Author, label="Author", current=current
+        )
+
+    def _set_categories(
+            self, db: Session, book: Book, category_ids: List[int], *, current: Optional[Set[int]] = None
+    ) -> None:
+        self._sync_links(
+            db, book.id, category_ids,
+            link_model=BookCategoryLink, link_column=BookCategoryLink.category_id,
+            target_model=Category, label="Category", current=current
+        )
+
+    def _sync_links(
+            self,
+            db: Session,
+            book_id: int,
+            ids: Iterable[int],
+            *,
+            link_model,
+            link_column,
+            target_model,
+            label: str,
+            current: Optional[Set[int]] = None
+    ) -> None:
+        """Make the book's links equal to `ids` with at most four statements.
+
+        Only the difference is written, and ids are applied in sorted order
+        so concurrent updates of the same book lock rows in the same order.
+        """
+        self.invalidate(book_id)
+        wanted = set(ids)
+        if wanted:
+            found = set(db.exec(select(target_model.id).where(target_model.id.in_(wanted))).all())
+            missing = sorted(wanted - found)
+            if len(missing) == 1:
+                raise LibraryException(f"{label} with ID {missing[0]} not found")
+            if missing:
+                raise LibraryException(f"{label} IDs not found: {', '.join(map(str, missing))}")
+
+        if current is None:
+            current = set(db.exec(select(link_column).where(link_model.book_id == book_id)).all())
+
+        removed = sorted(current - wanted)
+        if removed:
+            db.exec(delete(link_model).where(link_model.book_id == book_id, link_column.in_(removed)))
+
+        added = sorted(wanted - current)
+        if added:
+            db.exec(insert(link_model).values([{"book_id": book_id, link_column.key: id} for id in added]))
+
+    def apply_relation_filters(
+            self,
+            query,
+            *,
+            author_id: Optional[int] = None,
+            category_id: Optional[int] = None
+    ):
+        if author_id:
+            query = query.join(BookAuthorLink,
+                               Book.id == BookAuthorLink.book_id).where(BookAuthorLink.author_id == author_id)
+
+        if category_id:
+            query = query.join(BookCategoryLink,
+                               Book.id == BookCategoryLink.book_id).where(BookCategoryLink.category_id == category_id)
+
+        return query
 
     def search_books(
             self,
@@ -113,40 +279,92 @@ class CRUDBook(CRUDBase[Book, BookCreate, BookUpdate]):
             skip: int = 0,
             limit: int = 100
     ) -> List[Book]:
-        query = select(Book)
+        results, _ = self.search_books_page(
+            db,
+            title=title,
+            author_id=author_id,
+            category_id=category_id,
+            skip=skip,
+            limit=limit
+        )
+        return results
 
-        if title:
-            query = query.where(Book.title.ilike(f"%{title}%"))
+    def search_books_page(
+            self,
+            db: Session,
+            *,
+            title: Optional[str] = None,
+            author_id: Optional[int] = None,
+            category_id: Optional[int] = None,
+            cursor: Optional[str] = None,
+            sort: str = "id",
+            skip: int = 0,
+            limit: int = 100,
+            include: Collection[str] = ()
+    ) -> Tuple[List[Book], Optional[str]]:
+        query = self.filter_books(
+            select(Book).options(*self.include_options(include)),
+            title=title, author_id=author_id, category_id=category_id
+        )
+        return self.get_page(db, cursor=cursor, sort=sort, skip=skip, limit=limit, statement=query)
 
-        if author_id:
-            query = query.join(BookAuthorLink,
-                               Book.id == BookAuthorLink.book_id).where(BookAuthorLink.author_id == author_id)
+    def search_versions(
+            self,
+            db: Session,
+            *,
+            title: Optional[str] = None,
+            author_id: Optional[int] = None,
+            category_id: Optional[int] = None,
+            cursor: Optional[str] = None,
+            sort: str = "id",
+            skip: int = 0,
+            limit: int = 100
+    ) -> Tuple[List[Tuple[int, Any]], bool]:
+        """page_versions() for the page search_books_page() would return."""
+        query = self.filter_books(
+            select(Book.id, Book.updated_at), title=title, author_id=author_id, category_id=category_id
+        )
+        return self.page_versions(db, cursor=cursor, sort=sort, skip=skip, limit=limit, statement=query)
 
-        if category_id:
-            query = query.join(BookCategoryLink).where(BookCategoryLink.category_id == category_id)
+    def filter_books(
+            self,
+            query,
+            *,
+            title: Optional[str] = None,
+            author_id: Optional[int] = None,
+            category_id: Optional[int] = None
+    ):
+        if title:
+            query = query.where(Book.title.ilike(f"%{title}%"))
+        return self.apply_relation_filters(query, author_id=author_id, category_id=category_id)
 
-        query = query.offset(skip).limit(limit)
-        results = db.exec(query).all()
-        return results
+    def relation_versions(
+            self, db: Session, ids: List[int], include: Collection[str]
+    ) -> Dict[str, Tuple[int, Any]]:
+        """Per included relation of these books: link count and newest updated_at."""
+        versions = {}
+        for name in include:
+            target, link_model, link_column = self.relation_links[name]
+            statement = (
+                select(func.count(), func.max(target.updated_at))
+                .select_from(link_model)
+                .join(target, target.id == link_column)
+                .where(link_model.book_id.in_(ids))
+            )
+            versions[name] = tuple(db.exec(statement).one())
+        return versions
 
     def remove(self, db: Session, *, id: int) -> None:
-        db_obj = db.get(Book, id)
-        if not db_obj:
+        # Three set-based statements; nothing is loaded into the session first
+        db.exec(delete(BookAuthorLink).where(BookAuthorLink.book_id == id))
+        db.exec(delete(BookCategoryLink).where(BookCategoryLink.book_id == id))
+        deleted = db.exec(delete(Book).where(Book.id == id)).rowcount
+        if not deleted:
+            db.rollback()
             raise LibraryException(f"Book with ID {id} not found")
-
-        statement = select(BookAuthorLink).where(BookAuthorLink.book_id == id)
-        author_links = db.exec(statement).all()
-        for link in author_links:
-            db.delete(link)
-
-        statement = select(BookCategoryLink).where(BookCategoryLink.book_id == id)
-        category_links = db.exec(statement).all()
-        for link in category_links:
-            db.delete(link)
-
-        db.delete(db_obj)
         db.commit()
+        self.invalidate(id)
 
 
-
-crud_books = CRUDBook(Book)
\ No newline at end of file
+crud_books = CRUDBook(Book)
+async_crud_books = AsyncCRUD(crud_books)
\ No newline at end of file
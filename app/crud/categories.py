@@ -1,13 +1,17 @@
 from typing import List, Optional
+from sqlalchemy import delete
 from sqlmodel import Session, select
-from datetime import datetime, timezone
-from app.models.category import Category, CategoryCreate, CategoryUpdate
+from app.db.types import utcnow
+from app.models.category import Category, CategoryCreate, CategoryUpdate, CategoryRead
 from app.models.book import BookCategoryLink
-from app.crud.base import CRUDBase
+from app.crud.base import AsyncCRUD, CRUDBase
 from app.utils.exceptions import LibraryException
 
 
 class CRUDCategory(CRUDBase[Category, CategoryCreate, CategoryUpdate]):
+    sort_keys = {"id": "id", "created_at": "created_at"}
+    read_model = CategoryRead
+
     def create(self, db: Session, *, obj_in: CategoryCreate) -> Category:
         category = Category(
             category_name=obj_in.category_name,
@@ -26,20 +30,16 @@ class CRUDCategory(CRUDBase[Category, CategoryCreate, CategoryUpdate]):
             return None
         return db_obj
 
-    def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[Category]:
-        statement = select(Category).offset(skip).limit(limit)
-        results = db.exec(statement).all()
-        return results
-
     def update(self, db: Session, *, db_obj: Category, obj_in: CategoryUpdate) -> Category:
         update_data = obj_in.model_dump(exclude_unset=True)
 
         for field in update_data:
             setattr(db_obj, field, update_data[field])
 
-        db_obj.updated_at = datetime.now(timezone.utc)
+        db_obj.updated_at = utcnow()
         db.add(db_obj)
         db.commit()
+        self.invalidate(db_obj.id)
         db.refresh(db_obj)
         return db_obj
 
@@ -48,15 +48,13 @@ class CRUDCategory(CRUDBase[Category, CategoryCreate, CategoryUpdate]):
         if not db_obj:
             raise LibraryException(f"Category with ID {id} not found")
 
-        statement = select(BookCategoryLink).where(BookCategoryLink.category_id == id)
-        links = db.exec(statement).all()
-        for link in links:
-            db.delete(link)
+        self.remove(db, id=id)
 
-        db.flush()
-
-        db.delete(db_obj)
-        db.commit()
+    def remove(self, db: Session, *, id: int) -> Category:
+        # Unlink its books in one statement before the row goes
+        db.exec(delete(BookCategoryLink).where(BookCategoryLink.category_id == id))
+        return super().remove(db, id=id)
 
 
-crud_categories = CRUDCategory(Category)
\ No newline at end of file
+crud_categories = CRUDCategory(Category)
+async_crud_categories = AsyncCRUD(crud_categories)
\ No newline at end of file
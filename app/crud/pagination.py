@@ -0,0 +1,110 @@
+# app/crud/pagination.py
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, literal, tuple_
+from sqlmodel import Session
+
+from app.utils.exceptions import LibraryException
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def coerce_datetime(column, value: datetime) -> datetime:
+    """Match `value` to the column's timezone handling; naive values mean UTC."""
+    column_type = getattr(column.type, "impl", column.type)
+    if column_type.timezone:
+        return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+    # Naive timestamp columns hold UTC; compare like with like
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def _decode_value(column, value: Any) -> Any:
+    column_type = getattr(column.type, "impl", column.type)
+    if value is not None and isinstance(column_type, DateTime):
+        value = coerce_datetime(column, datetime.fromisoformat(value))
+    # Bind with the column type so its bind processing applies inside tuple_()
+    return literal(value, type_=column.type)
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    payload = json.dumps({"s": sort, "v": list(values)}, default=_encode_value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> List[Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        sort_key, values = payload["s"], payload["v"]
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise LibraryException("Invalid cursor")
+    if sort_key != sort:
+        raise LibraryException("Cursor was issued for a different sort order")
+    return values
+
+
+def page_statement(
+        statement,
+        *,
+        sort: str,
+        sort_column,
+        id_column,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+):
+    """`statement` narrowed to one page plus a lookahead row; returns it and the keys."""
+    descending = sort.startswith("-")
+    keys = [id_column] if sort_column is id_column else [sort_column, id_column]
+
+    if cursor:
+        values = decode_cursor(cursor, sort)
+        if len(values) != len(keys):
+            raise LibraryException("Invalid cursor")
+        values = [_decode_value(column, value) for column, value in zip(keys, values)]
+        if len(keys) == 1:
+            bound, target = keys[0], values[0]
+        else:
+            bound, target = tuple_(*keys), tuple_(*values)
+        statement = statement.where(bound < target if descending else bound > target)
+    elif skip:
+        statement = statement.offset(skip)
+
+    statement = statement.order_by(*[key.desc() if descending else key for key in keys]).limit(limit + 1)
+    return statement, keys
+
+
+def paginate(
+        db: Session,
+        statement,
+        *,
+        sort: str,
+        sort_column,
+        id_column,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+) -> Tuple[List[Any], Optional[str]]:
+    """Keyset pagination over (sort_column, id).
+
+    With a cursor the page starts right after the last row of the previous one,
+    so it is served by the matching composite index at any depth. Without one
+    the legacy `skip` offset still works and the response carries a cursor.
+    """
+    statement, keys = page_statement(
+        statement, sort=sort, sort_column=sort_column, id_column=id_column, cursor=cursor, skip=skip, limit=limit
+    )
+    rows = list(db.exec(statement).all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, [getattr(rows[-1], key.key) for key in keys])
+    return rows, next_cursor
@@ -2,12 +2,15 @@ from typing import List, Optional
 from sqlmodel import Session, select
 from datetime import datetime
 
-from app.models.user import User, UserCreate, UserUpdate
-from app.crud.base import CRUDBase
+from app.models.user import User, UserCreate, UserUpdate, UserRead
+from app.crud.base import AsyncCRUD, CRUDBase
 from app.utils.exceptions import LibraryException
 
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
+    sort_keys = {"id": "id", "created_at": "registration_date"}
+    read_model = UserRead
+
     def create(self, db: Session, *, obj_in: UserCreate) -> User:
         user = User(
             first_name=obj_in.first_name,
@@ -27,11 +30,6 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             return None
         return db_obj
 
-    def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[User]:
-        statement = select(User).offset(skip).limit(limit)
-        results = db.exec(statement).all()
-        return results
-
     def update(self, db: Session, *, db_obj: User, obj_in: UserUpdate) -> User:
         update_data = obj_in.model_dump(exclude_unset=True)
 
@@ -40,6 +38,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
         db.add(db_obj)
         db.commit()
+        self.invalidate(db_obj.id)
         db.refresh(db_obj)
         return db_obj
 
@@ -50,5 +49,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
         db.delete(db_obj)
         db.commit()
+        self.invalidate(id)
 
 crud_users = CRUDUser(User)
+async_crud_users = AsyncCRUD(crud_users)
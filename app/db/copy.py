@@ -0,0 +1,39 @@
+# app/db/copy.py
+import io
+from datetime import date
+from typing import Any, Iterable, Sequence
+
+from sqlmodel import Session
+
+
+def _text_value(value: Any) -> str:
+    # COPY text format: \N is NULL, integer lists become array literals
+    if value is None:
+        return r"\N"
+    if isinstance(value, (int, float, date)):
+        # Nothing to escape; also covers datetime
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return "{" + ",".join(str(int(item)) for item in value) + "}"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_rows(db: Session, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> None:
+    """Load rows into `table` with COPY FROM STDIN on the session's connection."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_text_value(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+    finally:
+        cursor.close()
@@ -0,0 +1,84 @@
+# app/db/migrations.py
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+# alembic (with mako and pygments) costs ~0.2s to import, so it is only
+# loaded once a migration check actually runs
+if TYPE_CHECKING:
+    from alembic.config import Config
+
+logger = logging.getLogger("library_api")
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+# Arbitrary key for pg_advisory_lock; every worker/process uses the same one
+MIGRATION_LOCK_KEY = 4_127_063
+
+
+def alembic_config() -> "Config":
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    # Resolve the scripts relative to the ini, not the working directory
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    return config
+
+
+def _at_head(connection: Connection, heads: set) -> bool:
+    from alembic.runtime.migration import MigrationContext
+
+    current = set(MigrationContext.configure(connection).get_current_heads())
+    # Leave the connection outside a transaction for the next step
+    connection.rollback()
+    return current == heads
+
+
+def run_migrations(engine: Engine, config: Optional["Config"] = None) -> bool:
+    """Upgrade the schema to head in this process; returns False if it already was.
+
+    The common case (already at head) is one read of alembic_version. An
+    actual upgrade runs under a Postgres advisory lock, so when several
+    workers start together one migrates and the others wait, re-check and
+    find nothing left to do.
+    """
+    from alembic import command
+    from alembic.script import ScriptDirectory
+
+    config = config or alembic_config()
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+
+    with engine.connect() as connection:
+        if _at_head(connection, heads):
+            return False
+
+        locking = connection.dialect.name == "postgresql"
+        if locking:
+            # Session-level lock: it survives the commits made by the upgrade
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            connection.commit()
+        try:
+            if _at_head(connection, heads):
+                return False
+            config.attributes["connection"] = connection
+            command.upgrade(config, "head")
+            connection.commit()
+            return True
+        finally:
+            if locking:
+                connection.rollback()
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                connection.commit()
+
+
+def main() -> None:
+    from app.db.database import get_engine
+
+    upgraded = run_migrations(get_engine())
+    print("Schema upgraded to head" if upgraded else "Schema already at head")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# app/db/pool.py
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Type
+
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool
+
+from app.utils.metrics import POOL_CHECKED_OUT, POOL_TIMEOUTS, POOL_WAIT
+
+
+class PoolStats:
+    """Checkout wait times of one engine's pool, shared across pool re-creation."""
+
+    def __init__(self, name: str, window: int = 1024):
+        self.name = name
+        self._wait_metric = POOL_WAIT.labels(name)
+        self._timeout_metric = POOL_TIMEOUTS.labels(name)
+        self.checked_out_metric = POOL_CHECKED_OUT.labels(name)
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        if timed_out:
+            self._timeout_metric.inc()
+        else:
+            self._wait_metric.observe(wait)
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._recent.append(wait)
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._recent)
+            checkouts, timeouts = self.checkouts, self.timeouts
+            total_wait, max_wait = self.total_wait, self.max_wait
+
+        def percentile(p: float) -> float:
+            if not recent:
+                return 0.0
+            return recent[min(len(recent) - 1, int(p * len(recent)))] * 1000
+
+        size = pool.size() if hasattr(pool, "size") else None
+        checked_out = pool.checkedout() if hasattr(pool, "checkedout") else None
+        return {
+            "pool_class": type(pool).__mro__[1].__name__,
+            "size": size,
+            "max_overflow": getattr(pool, "_max_overflow", None),
+            "checked_out": checked_out,
+            "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            # Overflow connections currently open beyond `size`
+            "overflow_in_use": max(0, pool.overflow()) if hasattr(pool, "overflow") else None,
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_ms": {
+                "avg": total_wait / checkouts * 1000 if checkouts else 0.0,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": max_wait * 1000,
+            },
+        }
+
+
+def instrumented_pool(base: Type[Pool], stats: PoolStats) -> Type[Pool]:
+    """Subclass of `base` that times every checkout into `stats` and counts open checkouts.
+
+    `Pool.recreate()` (engine.dispose) instantiates `type(self)`, so the stats
+    survive it by living on the class.
+    """
+
+    class InstrumentedPool(base):
+        pool_stats = stats
+
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                self.pool_stats.record(time.perf_counter() - start, timed_out=True)
+                raise
+            self.pool_stats.record(time.perf_counter() - start)
+            self.pool_stats.checked_out_metric.inc()
+            return connection
+
+        def _do_return_conn(self, record):
+            self.pool_stats.checked_out_metric.dec()
+            super()._do_return_conn(record)
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
@@ -0,0 +1,77 @@
+# app/db/query_stats.py
+# Per-request SQL statement counts and DB time, collected from engine events.
+#
+# The request middleware makes a QueryStats the active one for the request;
+# the context variable follows the request into the threadpool and into
+# AsyncSession.run_sync, so both DB paths are counted. Statements run with
+# no active QueryStats (startup, scheduled jobs, CLIs) cost one lookup.
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_WHITESPACE = re.compile(r"\s+")
+
+query_stats_var: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+def fingerprint(statement: str, limit: int = 200) -> str:
+    """Statement text on one line, shortened for logs."""
+    text = _WHITESPACE.sub(" ", statement).strip()
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # Bound parameters are not part of the text, so an N+1 loop shows up
+        # as one statement with a high count
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements run more than `threshold` times, most frequent first."""
+        if threshold <= 0:
+            return []
+        return [(fingerprint(statement), n) for statement, n in self.statements.most_common() if n > threshold]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and query_stats_var.get() is not None:
+        context._query_stats_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = query_stats_var.get()
+    if stats is None:
+        return
+    start = getattr(context, "_query_stats_start", None)
+    stats.record(statement, time.perf_counter() - start if start is not None else 0.0)
+
+
+def instrument_engine(engine: Engine) -> Engine:
+    """Count every statement `engine` runs into the active QueryStats."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect the statements run inside the block, e.g. in a test or a CLI."""
+    stats = QueryStats()
+    token = query_stats_var.set(stats)
+    try:
+        yield stats
+    finally:
+        query_stats_var.reset(token)
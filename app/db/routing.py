@@ -0,0 +1,260 @@
+# app/db/routing.py
+# Read-replica routing for read-only endpoints.
+#
+# get_read_db() is get_db() for endpoints that never write: with
+# DB_REPLICA_URLS set it opens the session on the next replica in round-robin
+# order. The connection is taken up front, so a replica that refuses it is
+# skipped for DB_REPLICA_RETRY_SECONDS and the next one is tried; with none
+# left the read goes to the primary. Writes keep using get_db(). Streams
+# that outlive their handler open their own session with read_session() or
+# async_read_session(), under the same rules.
+#
+# A client that just wrote may not see its write on a lagging replica, so
+# ReadYourWritesMiddleware answers every successful write with a pin (cookie
+# and X-DB-Pin header) and reads carrying a live pin go to the primary.
+import itertools
+import logging
+import math
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from functools import cached_property
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, Iterator, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+from app.db.database import ECHO_SQL, AnySession, get_async_engine, get_db, get_engine, pool_options, to_async_url
+from app.db.pool import PoolStats, instrumented_pool
+from app.db.query_stats import instrument_engine
+
+logger = logging.getLogger("library_api")
+
+PIN_COOKIE = "db_pin"
+PIN_HEADER = "X-DB-Pin"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+primary_pinned_var: ContextVar[bool] = ContextVar("primary_pinned", default=False)
+
+
+class Replica:
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+        self.down_until = 0.0
+        self.pool_stats = PoolStats(name)
+        self.async_pool_stats = PoolStats(f"{name}-async")
+
+    @cached_property
+    def engine(self) -> Engine:
+        return instrument_engine(create_engine(
+            self.url,
+            echo=ECHO_SQL,
+            poolclass=instrumented_pool(QueuePool, self.pool_stats),
+            **pool_options()
+        ))
+
+    @cached_property
+    def async_engine(self) -> AsyncEngine:
+        engine = create_async_engine(
+            to_async_url(self.url),
+            echo=ECHO_SQL,
+            poolclass=instrumented_pool(AsyncAdaptedQueuePool, self.async_pool_stats),
+            **pool_options()
+        )
+        instrument_engine(engine.sync_engine)
+        return engine
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.down_until
+
+
+class ReplicaSet:
+    def __init__(self, urls: List[str], *, retry_seconds: float = 30):
+        self.replicas = [Replica(f"replica{i}", url) for i, url in enumerate(urls, 1)]
+        self.retry_seconds = retry_seconds
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    def candidates(self) -> List[Replica]:
+        """Healthy replicas, starting at the next one in round-robin order."""
+        if not self.replicas:
+            return []
+        with self._lock:
+            start = next(self._next) % len(self.replicas)
+        now = time.monotonic()
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.healthy(now)]
+
+    def mark_down(self, replica: Replica, exc: Exception) -> None:
+        replica.down_until = time.monotonic() + self.retry_seconds
+        logger.warning("Replica %s unavailable, skipping it for %ss: %s", replica.name, self.retry_seconds, exc)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        stats = {}
+        for replica in self.replicas:
+            entry = {"healthy": replica.healthy(now), "retry_in_s": round(max(0.0, replica.down_until - now), 1)}
+            if "engine" in replica.__dict__:
+                entry["sync"] = replica.pool_stats.snapshot(replica.engine.pool)
+            if "async_engine" in replica.__dict__:
+                entry["async"] = replica.async_pool_stats.snapshot(replica.async_engine.sync_engine.pool)
+            stats[replica.name] = entry
+        return stats
+
+    async def dispose_async(self) -> None:
+        # asyncpg connections are bound to the event loop that opened them
+        for replica in self.replicas:
+            if "async_engine" in replica.__dict__:
+                await replica.async_engine.dispose()
+
+
+_replica_set: Optional[ReplicaSet] = None
+
+
+def get_replica_set() -> ReplicaSet:
+    """The process-wide replica set from DB_REPLICA_URLS; empty when unset."""
+    global _replica_set
+    if _replica_set is None:
+        settings = get_settings()
+        urls = [url.strip() for url in settings.DB_REPLICA_URLS.split(",") if url.strip()]
+        _replica_set = ReplicaSet(urls, retry_seconds=settings.DB_REPLICA_RETRY_SECONDS)
+    return _replica_set
+
+
+def set_replica_set(replica_set: Optional[ReplicaSet]) -> None:
+    global _replica_set
+    _replica_set = replica_set
+
+
+def open_read_session(replica_set: ReplicaSet) -> Optional[Session]:
+    """Sync session already connected to a healthy replica, or None."""
+    for replica in replica_set.candidates():
+        session = Session(replica.engine, expire_on_commit=False, info={"replica": replica.name})
+        try:
+            session.connection()
+        except (DBAPIError, OSError) as exc:
+            session.close()
+            replica_set.mark_down(replica, exc)
+            continue
+        return session
+    return None
+
+
+async def open_async_read_session(replica_set: ReplicaSet) -> Optional[AsyncSession]:
+    for replica in replica_set.candidates():
+        session = AsyncSession(replica.async_engine, expire_on_commit=False, info={"replica": replica.name})
+        try:
+            await session.connection()
+        except (DBAPIError, OSError) as exc:
+            await session.close()
+            replica_set.mark_down(replica, exc)
+            continue
+        return session
+    return None
+
+
+def _use_replicas(replica_set: ReplicaSet) -> bool:
+    return bool(replica_set.replicas) and not primary_pinned_var.get()
+
+
+async def get_read_db() -> AsyncGenerator[AnySession, None]:
+    """get_db() for read-only endpoints, served by a replica when one is up."""
+    replica_set = get_replica_set()
+    session = None
+    if _use_replicas(replica_set):
+        if get_settings().DB_ASYNC:
+            session = await open_async_read_session(replica_set)
+        else:
+            session = await run_in_threadpool(open_read_session, replica_set)
+
+    if session is None:
+        async for session in get_db():
+            yield session
+        return
+
+    try:
+        yield session
+    finally:
+        if isinstance(session, AsyncSession):
+            await session.close()
+        else:
+            await run_in_threadpool(session.close)
+
+
+@contextmanager
+def read_session() -> Iterator[Session]:
+    """Session for reads outside a request dependency, routed like get_read_db()."""
+    replica_set = get_replica_set()
+    session = open_read_session(replica_set) if _use_replicas(replica_set) else None
+    if session is None:
+        session = Session(get_engine())
+    with session:
+        yield session
+
+
+@asynccontextmanager
+async def async_read_session() -> AsyncIterator[AsyncSession]:
+    replica_set = get_replica_set()
+    session = await open_async_read_session(replica_set) if _use_replicas(replica_set) else None
+    if session is None:
+        session = AsyncSession(get_async_engine())
+    async with session:
+        yield session
+
+
+def pinned_until(headers: Headers, now: float, window: float) -> float:
+    """Pin sent by the client, ignoring stale values and ones past the window."""
+    value = headers.get(PIN_HEADER) or cookie_parser(headers.get("cookie", "")).get(PIN_COOKIE)
+    try:
+        until = float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+    return until if now < until <= now + window else 0.0
+
+
+class ReadYourWritesMiddleware:
+    """Route a client's reads to the primary for DB_READ_YOUR_WRITES_SECONDS after it writes."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not get_replica_set().replicas:
+            await self.app(scope, receive, send)
+            return
+
+        window = get_settings().DB_READ_YOUR_WRITES_SECONDS
+        now = time.time()
+        token = primary_pinned_var.set(pinned_until(Headers(scope=scope), now, window) > 0)
+        if scope["method"] in SAFE_METHODS or window <= 0:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                primary_pinned_var.reset(token)
+            return
+
+        async def send_with_pin(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = f"{time.time() + window:.3f}"
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie", f"{PIN_COOKIE}={until}; Max-Age={math.ceil(window)}; Path=/; HttpOnly; SameSite=lax"
+                )
+                headers[PIN_HEADER] = until
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_pin)
+        finally:
+            primary_pinned_var.reset(token)
@@ -0,0 +1,339 @@
+# app/db/seed.py
+"""Deterministic synthetic dataset for performance environments.
+
+    python -m app.db.seed --preset 1m --seed 42
+
+The same preset, seed and starting tables always produce the same rows.
+Borrow popularity is Zipfian over a shuffled book ranking, books have one
+to three authors (drawn with a milder skew) and one to three categories,
+and loans follow the academic year: busy in autumn and winter, quiet in
+summer, lighter at weekends. Open loans never exceed a book's quantity or
+MAX_BORROWS_PER_USER, so the borrow engine's invariants hold afterwards.
+
+Rows are generated in chunks and loaded with COPY. Links are loaded
+before loans, so the statement-level triggers keep the popularity
+counters right.
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.config import get_settings
+from app.db.copy import copy_rows
+from app.models.author import Author
+from app.models.book import Book, BookAuthorLink, BookCategoryLink
+from app.models.borrowed_book import RETURNED_STATUS, BorrowedBook
+from app.models.category import Category
+from app.models.user import User
+
+PRESETS: Dict[str, Dict[str, int]] = {
+    "10k": {"loans": 10_000, "books": 2_000, "authors": 400, "categories": 20, "users": 1_000},
+    "1m": {"loans": 1_000_000, "books": 100_000, "authors": 15_000, "categories": 60, "users": 50_000},
+    "10m": {"loans": 10_000_000, "books": 1_000_000, "authors": 120_000, "categories": 120, "users": 400_000},
+}
+
+OPEN_STATUS = "not returned"
+LOAN_HISTORY_DAYS = 730
+# Relative loan volume per month, January first
+SEASON = (1.3, 1.2, 1.1, 1.0, 0.9, 0.6, 0.5, 0.6, 1.3, 1.4, 1.3, 1.0)
+WEEKEND_FACTOR = 0.6
+# Popularity exponents: books are strongly skewed, authors less so
+BOOK_ZIPF = 1.0
+AUTHOR_ZIPF = 0.8
+
+WORDS = (
+    "shadow", "river", "garden", "empire", "silent", "winter", "crimson", "glass", "mountain", "secret",
+    "ocean", "forgotten", "golden", "island", "midnight", "stone", "history", "journey", "kingdom", "letters",
+    "machine", "northern", "orchard", "promise", "quiet", "storm", "thunder", "valley", "wander", "yellow",
+    "harbor", "lantern", "autumn", "bridge", "copper", "desert", "echo", "feather", "glacier", "hollow",
+)
+FIRST_NAMES = (
+    "Olena", "Andrii", "Maria", "Taras", "Iryna", "Dmytro", "Sofia", "Mykola", "Anna", "Petro",
+    "Kateryna", "Ivan", "Yulia", "Oleh", "Natalia", "Serhii", "Daria", "Bohdan", "Oksana", "Yurii",
+)
+LAST_NAMES = (
+    "Kovalenko", "Bondarenko", "Tkachenko", "Shevchenko", "Kravchenko", "Melnyk", "Boiko", "Oliinyk",
+    "Lysenko", "Moroz", "Savchenko", "Rudenko", "Marchenko", "Petrenko", "Klymenko", "Pavlenko",
+)
+
+# Tables in load order: parents before links, links before loans
+TABLES = (Author, Category, User, Book, BookAuthorLink, BookCategoryLink, BorrowedBook)
+
+
+def zipf_cum_weights(n: int, exponent: float) -> List[float]:
+    return list(accumulate(rank ** -exponent for rank in range(1, n + 1)))
+
+
+def apportion(total: int, weights: Sequence[float]) -> List[int]:
+    """Split `total` across `weights` exactly, by largest remainder."""
+    scale = total / sum(weights)
+    shares = [weight * scale for weight in weights]
+    counts = [int(share) for share in shares]
+    by_remainder = sorted(range(len(shares)), key=lambda i: counts[i] - shares[i])
+    for i in by_remainder[:total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+class SyntheticDataset:
+    """Row generators for every table, each yielding tuples in `columns` order.
+
+    `first_ids` holds the first free id per table, so a dataset can be
+    appended to existing rows; ids are assigned here, not by the sequences.
+    """
+
+    columns: Dict[str, Tuple[str, ...]] = {
+        Author.__tablename__: ("id", "first_name", "second_name", "biography", "created_at", "updated_at"),
+        Category.__tablename__: ("id", "category_name", "description", "created_at", "updated_at"),
+        User.__tablename__: ("id", "first_name", "last_name", "email", "registration_date", "is_active"),
+        Book.__tablename__: (
+            "id", "title", "publication_year", "isbn", "quantity", "available", "created_at", "updated_at"
+        ),
+        BookAuthorLink.__tablename__: ("book_id", "author_id"),
+        BookCategoryLink.__tablename__: ("book_id", "category_id"),
+        BorrowedBook.__tablename__: (
+            "id", "borrowing_time", "return_status", "created_at", "updated_at", "user_id", "book_id"
+        ),
+    }
+
+    def __init__(
+            self,
+            scale: Dict[str, int],
+            *,
+            seed: int = 0,
+            first_ids: Optional[Dict[str, int]] = None,
+            now: Optional[datetime] = None,
+            max_open_per_user: Optional[int] = None
+    ):
+        self.scale = scale
+        self.seed = seed
+        self.first_ids = {table: 1 for table in self.columns}
+        self.first_ids.update(first_ids or {})
+        # Naive UTC, like every timestamp the app stores
+        self.now = (now or datetime.now(timezone.utc)).replace(tzinfo=None, microsecond=0)
+        self.history_start = (self.now - timedelta(days=LOAN_HISTORY_DAYS)).replace(hour=0, minute=0, second=0)
+        self.max_open_per_user = max_open_per_user or get_settings().MAX_BORROWS_PER_USER
+
+        # Shared by the book, link and loan generators; drawn from a separate
+        # stream so each table's rows do not depend on the others' draws
+        rng = self._rng("catalog")
+        self.quantities = [rng.choices((1, 2, 3, 4, 5), (40, 25, 15, 12, 8))[0] for _ in range(scale["books"])]
+        self.book_by_rank = list(range(scale["books"]))
+        rng.shuffle(self.book_by_rank)
+
+    def _rng(self, stream: str) -> random.Random:
+        return random.Random(f"{self.seed}:{stream}")
+
+    def _id(self, model, offset: int) -> int:
+        return self.first_ids[model.__tablename__] + offset
+
+    def tables(self) -> Iterator[Tuple[str, Tuple[str, ...], Iterator[Tuple[Any, ...]]]]:
+        generators = {
+            Author: self.authors, Category: self.categories, User: self.users, Book: self.books,
+            BookAuthorLink: self.book_authors, BookCategoryLink: self.book_categories, BorrowedBook: self.loans,
+        }
+        for model in TABLES:
+            yield model.__tablename__, self.columns[model.__tablename__], generators[model]()
+
+    def authors(self) -> Iterator[Tuple[Any, ...]]:
+        rng = self._rng("author")
+        for i in range(self.scale["authors"]):
+            created = self.history_start - timedelta(days=rng.randrange(365 * 5))
+            yield (
+                self._id(Author, i), rng.choice(FIRST_NAMES), f"{rng.choice(LAST_NAMES)}-{i}", None, created, created
+            )
+
+    def categories(self) -> Iterator[Tuple[Any, ...]]:
+        created = self.history_start - timedelta(days=365 * 5)
+        for i in range(self.scale["categories"]):
+            name = f"{WORDS[i % len(WORDS)].title()} {i // len(WORDS) + 1}"
+            yield self._id(Category, i), name, None, created, created
+
+    def users(self) -> Iterator[Tuple[Any, ...]]:
+        rng = self._rng("user")
+        for i in range(self.scale["users"]):
+            user_id = self._id(User, i)
+            registered = self.history_start - timedelta(days=rng.randrange(365 * 3), seconds=rng.randrange(86_400))
+            yield (
+                user_id, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), f"reader{user_id}@example.org",
+                registered, rng.random() < 0.97
+            )
+
+    def books(self) -> Iterator[Tuple[Any, ...]]:
+        rng = self._rng("book")
+        for i, quantity in enumerate(self.quantities):
+            book_id = self._id(Book, i)
+            words = rng.sample(WORDS, rng.randint(1, 4))
+            title = " ".join(words).capitalize()
+            created = self.history_start - timedelta(days=rng.randrange(365 * 5))
+            # available is corrected once the open loans are known
+            yield (
+                book_id, title, rng.randint(1900, self.now.year), f"978{book_id:010d}", quantity, quantity,
+                created, created
+            )
+
+    def book_authors(self) -> Iterator[Tuple[Any, ...]]:
+        rng = self._rng("book_author")
+        cum_weights = zipf_cum_weights(self.scale["authors"], AUTHOR_ZIPF)
+        authors = range(self.scale["authors"])
+        for i in range(self.scale["books"]):
+            count = rng.choices((1, 2, 3), (75, 20, 5))[0]
+            for author in sorted(set(rng.choices(authors, cum_weights=cum_weights, k=count))):
+                yield self._id(Book, i), self._id(Author, author)
+
+    def book_categories(self) -> Iterator[Tuple[Any, ...]]:
+        rng = self._rng("book_category")
+        categories = range(self.scale["categories"])
+        for i in range(self.scale["books"]):
+            count = min(rng.choices((1, 2, 3), (60, 30, 10))[0], self.scale["categories"])
+            for category in sorted(rng.sample(categories, count)):
+                yield self._id(Book, i), self._id(Category, category)
+
+    def loans(self) -> Iterator[Tuple[Any, ...]]:
+        """Loans in borrowing order, a day at a time."""
+        rng = self._rng("loan")
+        duration = get_settings().BORROW_DURATION_DAYS
+        days = [self.history_start + timedelta(days=d) for d in range(LOAN_HISTORY_DAYS)]
+        weights = [SEASON[day.month - 1] * (WEEKEND_FACTOR if day.weekday() >= 5 else 1.0) for day in days]
+        per_day = apportion(self.scale["loans"], weights)
+
+        cum_weights = zipf_cum_weights(self.scale["books"], BOOK_ZIPF)
+        ranks = range(self.scale["books"])
+        users = self.scale["users"]
+        open_by_book = [0] * self.scale["books"]
+        open_by_user = [0] * users
+        loan_id = self._id(BorrowedBook, 0)
+        # Hot loop: plain random() scaled to ints is several times cheaper than randrange()
+        random_ = rng.random
+        keep_seconds = 2 * duration * 86_400
+
+        for day, count in zip(days, per_day):
+            if not count:
+                continue
+            age = (self.now - day).days
+            # Most recent loans are still out; older ones were almost all returned
+            open_probability = 0.6 if age <= duration else 0.08 if age <= 4 * duration else 0.005
+            picks = rng.choices(ranks, cum_weights=cum_weights, k=count)
+            # Opening hours, in order, so ids follow borrowing_time
+            seconds = sorted(8 * 3600 + int(random_() * 13 * 3600) for _ in range(count))
+            for rank, second in zip(picks, seconds):
+                book = self.book_by_rank[rank]
+                user = int(random_() * users)
+                borrowed = day + timedelta(seconds=second)
+                if (
+                        random_() < open_probability
+                        and open_by_book[book] < self.quantities[book]
+                        and open_by_user[user] < self.max_open_per_user
+                ):
+                    open_by_book[book] += 1
+                    open_by_user[user] += 1
+                    status, updated = OPEN_STATUS, borrowed
+                else:
+                    returned = borrowed + timedelta(seconds=86_400 + int(random_() * keep_seconds))
+                    status, updated = RETURNED_STATUS, min(returned, self.now)
+                yield (
+                    loan_id, borrowed, status, borrowed, updated, self._id(User, user), self._id(Book, book)
+                )
+                loan_id += 1
+
+
+def _chunks(rows: Iterable[Tuple[Any, ...]], size: int) -> Iterator[List[Tuple[Any, ...]]]:
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+class SeedService:
+    def first_ids(self, db: Session) -> Dict[str, int]:
+        ids = {}
+        for model in (Author, Category, User, Book, BorrowedBook):
+            ids[model.__tablename__] = db.execute(
+                text(f'SELECT coalesce(max(id), 0) + 1 FROM "{model.__tablename__}"')
+            ).scalar_one()
+        return ids
+
+    def truncate(self, db: Session) -> None:
+        tables = ", ".join(f'"{model.__tablename__}"' for model in reversed(TABLES))
+        db.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+        db.commit()
+
+    def seed(
+            self,
+            db: Session,
+            scale: Dict[str, int],
+            *,
+            seed: int = 0,
+            chunk_size: int = 100_000,
+            truncate: bool = False
+    ) -> Dict[str, Any]:
+        """Generate and COPY a dataset; returns rows and seconds per table."""
+        if truncate:
+            self.truncate(db)
+        dataset = SyntheticDataset(scale, seed=seed, first_ids=self.first_ids(db))
+
+        report: Dict[str, Any] = {"scale": scale, "seed": seed, "tables": {}}
+        started = time.perf_counter()
+        for table, columns, rows in dataset.tables():
+            start = time.perf_counter()
+            count = 0
+            for chunk in _chunks(rows, chunk_size):
+                copy_rows(db, f'"{table}"', columns, chunk)
+                db.commit()
+                count += len(chunk)
+            report["tables"][table] = {"rows": count, "seconds": round(time.perf_counter() - start, 3)}
+
+        start = time.perf_counter()
+        db.execute(text(f"""
+            UPDATE book SET available = book.quantity - out.n
+            FROM (
+                SELECT book_id, count(*) AS n FROM borrowedbook
+                WHERE return_status <> '{RETURNED_STATUS}' GROUP BY book_id
+            ) out
+            WHERE book.id = out.book_id AND book.available <> book.quantity - out.n
+        """))
+        # Explicit ids bypass the sequences; move them past the new rows
+        for model in (Author, Category, User, Book, BorrowedBook):
+            db.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('\"{model.__tablename__}\"', 'id'), "
+                f"(SELECT coalesce(max(id), 0) + 1 FROM \"{model.__tablename__}\"), false)"
+            ))
+        db.commit()
+        for model in TABLES:
+            db.execute(text(f'ANALYZE "{model.__tablename__}"'))
+        db.commit()
+        report["finalize_seconds"] = round(time.perf_counter() - start, 3)
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        return report
+
+
+seed_service = SeedService()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.db.database import get_engine
+
+    parser = argparse.ArgumentParser(description="Seed the database with a synthetic dataset")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="10k")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--truncate", action="store_true", help="empty the catalog, users and loans first")
+    for name in PRESETS["10k"]:
+        parser.add_argument(f"--{name}", type=int, help=f"override the preset's {name} count")
+    args = parser.parse_args(argv)
+
+    scale = dict(PRESETS[args.preset])
+    scale.update({name: getattr(args, name) for name in scale if getattr(args, name) is not None})
+    with Session(get_engine()) as db:
+        result = seed_service.seed(db, scale, seed=args.seed, chunk_size=args.chunk_size, truncate=args.truncate)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
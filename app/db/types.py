@@ -0,0 +1,28 @@
+# app/db/types.py
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import DateTime
+from sqlalchemy.types import TypeDecorator
+
+
+def utcnow() -> datetime:
+    """Current UTC time as the naive value the timestamp columns hold."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class UTCDateTime(TypeDecorator):
+    """`timestamp without time zone` holding UTC.
+
+    Aware values (API input, query filters) are converted to naive UTC before
+    they are bound: asyncpg refuses to encode an aware datetime for a naive
+    column, and psycopg2 would silently drop the offset.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[datetime], dialect) -> Optional[datetime]:
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
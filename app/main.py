@@ -1,30 +1,91 @@
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-import time
-import subprocess
-
-from app.utils.logger import setup_logging
-from app.api import books, authors, categories, users, borrowed_books
-
-logger = setup_logging()
+import asyncio
+import logging
+
+from anyio import to_thread
+from starlette.concurrency import run_in_threadpool
+
+from sqlmodel import Session
+
+from app.config import get_settings
+from app.utils.logger import LOGGER_NAME, setup_logging
+from app.api import books, authors, categories, users, borrowed_books, export, internal, metrics
+from app.crud.books import crud_books
+from app.db.database import get_async_engine, get_engine, threadpool_size
+from app.db.migrations import run_migrations
+from app.db.routing import ReadYourWritesMiddleware, get_replica_set
+from app.services.fine_service import recompute_fines
+from app.utils.exceptions import LibraryException
+from app.utils.request_log import RequestLogMiddleware
+from app.utils.responses import CompressionMiddleware, FastJSONResponse
+from app.utils.scheduler import run_periodically
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+async def warm_isbn_filter(settings) -> None:
+    def load() -> int:
+        with Session(get_engine()) as db:
+            return crud_books.warm_isbn_filter(
+                db,
+                capacity=settings.ISBN_FILTER_CAPACITY,
+                error_rate=settings.ISBN_FILTER_ERROR_RATE
+            )
+
+    # A full scan of book.isbn: keep it off the event loop and out of startup
+    try:
+        loaded = await run_in_threadpool(load)
+        logger.info(f"ISBN filter warmed with {loaded} entries")
+    except Exception as e:
+        logger.warning(f"ISBN filter warm-up failed: {e}")
 
 
 # Define the lifespan context manager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    logger.info("Starting database migrations")
-
-    try:
-        subprocess.run(["alembic", "upgrade", "head"], check=True)
-        logger.info("Database migrations completed")
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Database migrations failed: {e}")
-        raise
+    setup_logging()
+    settings = get_settings()
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        try:
+            upgraded = await run_in_threadpool(run_migrations, get_engine())
+            logger.info("Database migrations completed" if upgraded else "Database schema already at head")
+        except Exception as e:
+            logger.error(f"Database migrations failed: {e}")
+            raise
+
+    # run_in_threadpool and sync endpoints share anyio's default limiter
+    to_thread.current_default_thread_limiter().total_tokens = threadpool_size()
+
+    jobs = []
+    if settings.ISBN_FILTER_ENABLED:
+        # Until the scan finishes every ISBN check simply goes to the index
+        jobs.append(asyncio.create_task(warm_isbn_filter(settings)))
+    if settings.FINES_RECOMPUTE_INTERVAL_SECONDS > 0:
+        # Every worker schedules it; the recompute lock lets only one run at a time
+        jobs.append(asyncio.create_task(
+            run_periodically("fines", settings.FINES_RECOMPUTE_INTERVAL_SECONDS, recompute_fines)
+        ))
+    if settings.NOTIFICATIONS_ENABLED:
+        # smtplib/email are only loaded when reminders are switched on
+        from app.services.notification_service import enqueue_reminders, notification_worker
+
+        jobs.append(asyncio.create_task(
+            run_periodically("reminders", settings.NOTIFY_ENQUEUE_INTERVAL_SECONDS, enqueue_reminders)
+        ))
+        jobs.append(asyncio.create_task(notification_worker.run()))
 
     logger.info("Application Started")
     yield
 
+    for job in jobs:
+        job.cancel()
+    if settings.DB_ASYNC:
+        # asyncpg connections are bound to this event loop
+        await get_async_engine().dispose()
+        await get_replica_set().dispose_async()
     logger.info("Application Shutdown")
 
 
@@ -33,7 +94,8 @@ app = FastAPI(
     title="Library Management System API",
     description="API for managing a library system with books, authors, etc.",
     version="0.0.1",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Add middleware
@@ -42,22 +104,18 @@ app.add_middleware(
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Request-ID", "X-DB-Queries", "X-DB-Time", "X-DB-Pin"]
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
+# Outermost: the id, timing and query counts cover everything inside
+app.add_middleware(RequestLogMiddleware)
 
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    logger.info(
-        f"Path: {request.url.path} | "
-        f"Method: {request.method} | "
-        f"Status: {response.status_code} | "
-        f"Duration: {process_time:.4f}s"
-    )
-    return response
+@app.exception_handler(LibraryException)
+async def library_exception_handler(request: Request, exc: LibraryException):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
 
 
 # Include routers
@@ -66,8 +124,11 @@ app.include_router(books.router, prefix="/api/books", tags=["books"])
 app.include_router(authors.router, prefix="/api/authors", tags=["authors"])
 app.include_router(categories.router, prefix="/api/categories", tags=["categories"])
 app.include_router(borrowed_books.router, prefix="/api/borrowed_books", tags=["borrowed_books"])
+app.include_router(export.router, prefix="/api/export", tags=["export"])
+app.include_router(internal.router, prefix="/internal", tags=["internal"], include_in_schema=False)
+app.include_router(metrics.router, tags=["metrics"], include_in_schema=False)
 
 
 @app.get("/")
-def root():
+async def root():
     return {"message": "Welcome to Library Management System API"}
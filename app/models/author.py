@@ -1,8 +1,11 @@
 
 from typing import List, Optional, TYPE_CHECKING
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
-from datetime import datetime, timezone
+from datetime import datetime
+from pydantic import ConfigDict
 from app.models.book import BookAuthorLink
+from app.db.types import UTCDateTime, utcnow
 
 
 if TYPE_CHECKING:
@@ -16,9 +19,11 @@ class AuthorBase(SQLModel):
 
 
 class Author(AuthorBase, table=True):
+    __table_args__ = (Index("ix_author_created_at_id", "created_at", "id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=utcnow, sa_type=UTCDateTime)
+    updated_at: datetime = Field(default_factory=utcnow, sa_type=UTCDateTime)
 
     # Relationships
     books: List["Book"] = Relationship(
@@ -42,5 +47,4 @@ class AuthorRead(AuthorBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
@@ -4,8 +4,11 @@ from typing import TYPE_CHECKING, List, Optional
 if TYPE_CHECKING:
     from app.models.author import Author
 
+from sqlalchemy import CheckConstraint, Index
 from sqlmodel import Field, SQLModel, Relationship
-from datetime import datetime, timezone
+from datetime import datetime
+from pydantic import ConfigDict
+from app.db.types import UTCDateTime, utcnow
 
 
 class BookAuthorLink(SQLModel, table=True):
@@ -39,9 +42,22 @@ class BookBase(SQLModel):
 
 
 class Book(BookBase, table=True):
+    # Keyset pagination indexes, one per public sort key
+    __table_args__ = (
+        Index("ix_book_title_id", "title", "id"),
+        Index("ix_book_publication_year_id", "publication_year", "id"),
+        Index("ix_book_created_at_id", "created_at", "id"),
+        # Incremental exports
+        Index("ix_book_updated_at_id", "updated_at", "id"),
+        CheckConstraint("available >= 0", name="ck_book_available_nonnegative"),
+        CheckConstraint("available <= quantity", name="ck_book_available_within_quantity"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Copies on the shelf: quantity minus open loans, kept by BookService
+    available: int = Field(default=0)
+    created_at: datetime = Field(default_factory=utcnow, sa_type=UTCDateTime)
+    updated_at: datetime = Field(default_factory=utcnow, sa_type=UTCDateTime)
 
     authors: List["Author"] = Relationship(
         back_populates="books",
@@ -72,8 +88,25 @@ class BookUpdate(SQLModel):
 
 class BookRead(BookBase):
     id: int
+    available: int
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BookSearchRead(BookRead):
+    rank: Optional[float] = None
+    highlight: Optional[str] = None
+
+
+class BookImportError(SQLModel):
+    row: int
+    isbn: Optional[str] = None
+    error: str
+
+
+class BookImportReport(SQLModel):
+    imported: int = 0
+    failed: int = 0
+    errors: List[BookImportError] = []
@@ -0,0 +1,12 @@
+# app/models/book_expanded.py
+from typing import List, Optional
+
+from app.models.author import AuthorRead
+from app.models.book import BookRead
+from app.models.category import CategoryRead
+
+
+# Lives apart from app.models.book, which author/category import for the link tables
+class BookReadExpanded(BookRead):
+    authors: Optional[List[AuthorRead]] = None
+    categories: Optional[List[CategoryRead]] = None
@@ -0,0 +1,52 @@
+# app/models/borrow_stats.py
+from typing import Optional
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+from app.models.author import AuthorRead
+from app.models.book import BookRead
+from app.models.category import CategoryRead
+
+
+# Borrow counters maintained by triggers on borrowedbook and the link tables.
+# Each table is read top-N through its (borrow_count DESC, id) index.
+class BookBorrowStats(SQLModel, table=True):
+    __tablename__ = "book_borrow_stats"
+    __table_args__ = (Index("ix_book_borrow_stats_top", "borrow_count", "book_id"),)
+
+    book_id: Optional[int] = Field(default=None, foreign_key="book.id", primary_key=True, ondelete="CASCADE")
+    borrow_count: int = Field(default=0)
+
+
+class AuthorBorrowStats(SQLModel, table=True):
+    __tablename__ = "author_borrow_stats"
+    __table_args__ = (Index("ix_author_borrow_stats_top", "borrow_count", "author_id"),)
+
+    author_id: Optional[int] = Field(default=None, foreign_key="author.id", primary_key=True, ondelete="CASCADE")
+    borrow_count: int = Field(default=0)
+
+
+class CategoryBorrowStats(SQLModel, table=True):
+    __tablename__ = "category_borrow_stats"
+    __table_args__ = (Index("ix_category_borrow_stats_top", "borrow_count", "category_id"),)
+
+    category_id: Optional[int] = Field(
+        default=None, foreign_key="category.id", primary_key=True, ondelete="CASCADE"
+    )
+    borrow_count: int = Field(default=0)
+
+
+class PopularBookRead(SQLModel):
+    book: BookRead
+    borrow_count: int
+
+
+class PopularAuthorRead(SQLModel):
+    author: AuthorRead
+    borrow_count: int
+
+
+class PopularCategoryRead(SQLModel):
+    category: CategoryRead
+    borrow_count: int
@@ -1,19 +1,40 @@
 from typing import Optional, TYPE_CHECKING
+from sqlalchemy import Index, text
 from sqlmodel import Field, SQLModel, Relationship
-from datetime import datetime, timezone
+from datetime import datetime
+from pydantic import ConfigDict
+from app.db.types import UTCDateTime, utcnow
 
 if TYPE_CHECKING:
     from app.models.user import User
     from app.models.book import Book
 
+# Any other return_status counts as an open loan holding a copy
+RETURNED_STATUS = "returned"
+
 class BorrowedBookBase(SQLModel):
-    borrowing_time: datetime
+    borrowing_time: datetime = Field(sa_type=UTCDateTime)
     return_status: str
 
 class BorrowedBook(BorrowedBookBase, table=True):
+    __table_args__ = (
+        Index("ix_borrowedbook_user_id_id", "user_id", "id"),
+        Index("ix_borrowedbook_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_borrowedbook_book_id_id", "book_id", "id"),
+        Index("ix_borrowedbook_book_id_created_at_id", "book_id", "created_at", "id"),
+        # Incremental exports
+        Index("ix_borrowedbook_updated_at_id", "updated_at", "id"),
+        # Open loans by age, for the overdue scans
+        Index(
+            "ix_borrowedbook_open_borrowing_time",
+            "borrowing_time",
+            postgresql_where=text(f"return_status <> '{RETURNED_STATUS}'")
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=utcnow, sa_type=UTCDateTime)
+    updated_at: datetime = Field(default_factory=utcnow, sa_type=UTCDateTime)
 
     user_id: int = Field(foreign_key="user.id")
 
@@ -40,5 +61,4 @@ class BorrowedBookRead(BorrowedBookBase):
     user_id: int
     book_id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
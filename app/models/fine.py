@@ -0,0 +1,48 @@
+# app/models/fine.py
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+from app.db.types import UTCDateTime, utcnow
+
+
+# One row per open, overdue loan; rewritten in bulk by fine_service.recompute
+class Fine(SQLModel, table=True):
+    __table_args__ = (Index("ix_fine_user_id_loan_id", "user_id", "loan_id"),)
+
+    loan_id: Optional[int] = Field(
+        default=None, foreign_key="borrowedbook.id", primary_key=True, ondelete="CASCADE"
+    )
+    user_id: int = Field(foreign_key="user.id")
+    book_id: int = Field(foreign_key="book.id")
+    due_date: date
+    overdue_days: int
+    amount: Decimal = Field(max_digits=10, decimal_places=2)
+    updated_at: datetime = Field(default_factory=utcnow, sa_type=UTCDateTime)
+
+
+class FineRead(SQLModel):
+    loan_id: int
+    book_id: int
+    due_date: date
+    overdue_days: int
+    amount: Decimal
+    updated_at: datetime
+
+
+class UserFinesRead(SQLModel):
+    user_id: int
+    total_amount: Decimal
+    fines: List[FineRead]
+
+
+class FineRecomputeReport(SQLModel):
+    today: date
+    # Fines inserted or changed; fines already up to date are not rewritten
+    updated: int = 0
+    cleared: int = 0
+    seconds: float = 0.0
+    # Another process held the recompute lock, so nothing was done
+    skipped: bool = False
@@ -0,0 +1,44 @@
+# app/models/notification.py
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Column, Index, Text, UniqueConstraint, text
+from sqlmodel import Field, SQLModel
+from app.db.types import UTCDateTime, utcnow
+
+NOTIFICATION_PENDING = "pending"
+NOTIFICATION_SENT = "sent"
+NOTIFICATION_FAILED = "failed"
+
+DUE_SOON = "due_soon"
+OVERDUE = "overdue"
+
+
+# Durable outbox for reminder emails. A loan gets at most one reminder of
+# each kind per due date; workers claim pending rows with a lease that is
+# pushed into next_attempt_at, so a crashed worker's rows come back later.
+class Notification(SQLModel, table=True):
+    __table_args__ = (
+        UniqueConstraint("loan_id", "kind", "due_date", name="uq_notification_loan_kind_due"),
+        Index(
+            "ix_notification_pending",
+            "next_attempt_at",
+            "id",
+            postgresql_where=text(f"status = '{NOTIFICATION_PENDING}'")
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    loan_id: int = Field(foreign_key="borrowedbook.id", ondelete="CASCADE")
+    user_id: int = Field(foreign_key="user.id")
+    kind: str
+    due_date: date
+    recipient: str
+    subject: str
+    body: str = Field(sa_column=Column(Text, nullable=False))
+    status: str = Field(default=NOTIFICATION_PENDING)
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=utcnow, sa_type=UTCDateTime)
+    last_error: Optional[str] = Field(default=None, sa_column=Column(Text))
+    created_at: datetime = Field(default_factory=utcnow, sa_type=UTCDateTime)
+    sent_at: Optional[datetime] = Field(default=None, sa_type=UTCDateTime)
@@ -1,6 +1,9 @@
 from typing import List, Optional
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
 from datetime import datetime
+from pydantic import ConfigDict
+from app.db.types import UTCDateTime, utcnow
 
 
 class UserBase(SQLModel):
@@ -11,9 +14,10 @@ class UserBase(SQLModel):
 
 class User(UserBase, table=True):
     __tablename__ = "user"
+    __table_args__ = (Index("ix_user_registration_date_id", "registration_date", "id"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    registration_date: datetime = Field(default_factory=datetime.utcnow)
+    registration_date: datetime = Field(default_factory=utcnow, sa_type=UTCDateTime)
     is_active: bool = Field(default=True)
 
     # Relationships
@@ -38,5 +42,4 @@ class UserRead(UserBase):
     registration_date: datetime
     is_active: bool
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,164 @@
+# app/services/book_service.py
+from typing import Dict, List
+
+from fastapi import status
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+
+from app.config import get_settings
+from app.crud.books import crud_books
+from app.db.types import utcnow
+from app.models.book import Book
+from app.models.borrowed_book import RETURNED_STATUS, BorrowedBook, BorrowedBookCreate, BorrowedBookUpdate
+from app.models.user import User
+from app.utils.exceptions import LibraryException
+
+
+class BookService:
+    """Loan lifecycle with inventory and per-user limits enforced atomically.
+
+    A borrow locks the user row (so the open-loan count cannot race) and then
+    takes a copy with a conditional UPDATE on the book row. Returns and deletes
+    re-read the loan under a row lock, so a copy goes back to the shelf once
+    however many requests race. Locks are always taken loan first, then user,
+    then books in id order.
+    """
+
+    def _lock_user(self, db: Session, user_id: int) -> User:
+        user = db.exec(select(User).where(User.id == user_id).with_for_update()).first()
+        if not user:
+            raise LibraryException(f"User with ID {user_id} not found.")
+        return user
+
+    def _lock_loan(self, db: Session, loan_id: int) -> BorrowedBook:
+        # The caller's copy may predate a concurrent return or delete
+        statement = (
+            select(BorrowedBook)
+            .where(BorrowedBook.id == loan_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        loan = db.exec(statement).first()
+        if not loan:
+            raise LibraryException(f"BorrowedBook with ID {loan_id} not found", status_code=status.HTTP_404_NOT_FOUND)
+        return loan
+
+    def _check_limit(self, db: Session, user_id: int) -> None:
+        limit = get_settings().MAX_BORROWS_PER_USER
+        statement = select(func.count()).select_from(BorrowedBook).where(
+            BorrowedBook.user_id == user_id,
+            BorrowedBook.return_status != RETURNED_STATUS
+        )
+        if db.exec(statement).one() >= limit:
+            raise LibraryException(
+                f"User with ID {user_id} already has {limit} borrowed books",
+                status_code=status.HTTP_409_CONFLICT
+            )
+
+    def _ensure_book(self, db: Session, book_id: int) -> None:
+        if db.exec(select(Book.id).where(Book.id == book_id)).first() is None:
+            raise LibraryException(f"Book with ID {book_id} not found.")
+
+    def _move_copies(self, db: Session, deltas: Dict[int, int]) -> None:
+        # `available` is part of the book's representation, so its ETag must change
+        now = utcnow()
+        for book_id in sorted(deltas):
+            delta = deltas[book_id]
+            if delta == 0:
+                continue
+            statement = (
+                update(Book)
+                .where(Book.id == book_id)
+                .values(available=Book.available + delta, updated_at=now)
+                .returning(Book.available)
+                .execution_options(synchronize_session=False)
+            )
+            if delta < 0:
+                # Only succeeds while enough copies are on the shelf
+                statement = statement.where(Book.available >= -delta)
+            if db.exec(statement).first() is None:
+                self._ensure_book(db, book_id)
+                raise LibraryException(
+                    f"No copies of book with ID {book_id} are available",
+                    status_code=status.HTTP_409_CONFLICT
+                )
+
+    def _commit(self, db: Session, book_ids: List[int]) -> None:
+        db.commit()
+        for book_id in book_ids:
+            crud_books.invalidate(book_id)
+
+    def borrow(self, db: Session, *, obj_in: BorrowedBookCreate) -> BorrowedBook:
+        try:
+            self._lock_user(db, obj_in.user_id)
+            if obj_in.return_status != RETURNED_STATUS:
+                self._check_limit(db, obj_in.user_id)
+                self._move_copies(db, {obj_in.book_id: -1})
+            else:
+                self._ensure_book(db, obj_in.book_id)
+
+            loan = BorrowedBook(
+                user_id=obj_in.user_id,
+                book_id=obj_in.book_id,
+                borrowing_time=obj_in.borrowing_time,
+                return_status=obj_in.return_status
+            )
+            db.add(loan)
+            self._commit(db, [obj_in.book_id])
+        except LibraryException:
+            db.rollback()
+            raise
+
+        db.refresh(loan)
+        return loan
+
+    def update_loan(self, db: Session, *, loan: BorrowedBook, obj_in: BorrowedBookUpdate) -> BorrowedBook:
+        update_data = obj_in.model_dump(exclude_unset=True)
+        try:
+            loan = self._lock_loan(db, loan.id)
+            was_open = loan.return_status != RETURNED_STATUS
+            is_open = update_data.get("return_status", loan.return_status) != RETURNED_STATUS
+            user_id = update_data.get("user_id", loan.user_id)
+            book_id = update_data.get("book_id", loan.book_id)
+
+            deltas: Dict[int, int] = {}
+            if was_open:
+                deltas[loan.book_id] = deltas.get(loan.book_id, 0) + 1
+            if is_open:
+                deltas[book_id] = deltas.get(book_id, 0) - 1
+
+            if user_id != loan.user_id or (is_open and not was_open):
+                self._lock_user(db, user_id)
+                if is_open:
+                    self._check_limit(db, user_id)
+            if book_id != loan.book_id:
+                self._ensure_book(db, book_id)
+            self._move_copies(db, deltas)
+
+            for field, value in update_data.items():
+                setattr(loan, field, value)
+            loan.updated_at = utcnow()
+            db.add(loan)
+            self._commit(db, list(deltas))
+        except LibraryException:
+            db.rollback()
+            raise
+
+        # Read under the lock and written by us: no refresh, which would fail
+        # if a racing delete removed the loan right after this commit
+        return loan
+
+    def delete_loan(self, db: Session, *, loan: BorrowedBook) -> BorrowedBook:
+        try:
+            loan = self._lock_loan(db, loan.id)
+            if loan.return_status != RETURNED_STATUS:
+                self._move_copies(db, {loan.book_id: 1})
+            db.delete(loan)
+            self._commit(db, [loan.book_id])
+        except LibraryException:
+            db.rollback()
+            raise
+        return loan
+
+
+book_service = BookService()
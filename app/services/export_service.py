@@ -0,0 +1,79 @@
+# app/services/export_service.py
+from datetime import datetime
+from typing import AsyncIterator, Iterator, Optional, Type
+
+from pydantic import BaseModel
+from sqlmodel import select
+from starlette.concurrency import iterate_in_threadpool
+
+from app.config import get_settings
+from app.crud.pagination import coerce_datetime
+from app.db.routing import async_read_session, read_session
+from app.models.book import Book
+from app.models.borrowed_book import BorrowedBook
+
+
+def _updated_range(statement, model, updated_since: Optional[datetime], updated_before: Optional[datetime]):
+    if updated_since is not None:
+        statement = statement.where(model.updated_at >= coerce_datetime(model.updated_at, updated_since))
+    if updated_before is not None:
+        statement = statement.where(model.updated_at < coerce_datetime(model.updated_at, updated_before))
+    # (updated_at, id) order is served by the matching index and lets an
+    # incremental pull resume from the last row it saw
+    return statement.order_by(model.updated_at, model.id)
+
+
+class ExportService:
+    def books_statement(
+            self,
+            *,
+            updated_since: Optional[datetime] = None,
+            updated_before: Optional[datetime] = None
+    ):
+        return _updated_range(select(Book), Book, updated_since, updated_before)
+
+    def loans_statement(
+            self,
+            *,
+            updated_since: Optional[datetime] = None,
+            updated_before: Optional[datetime] = None,
+            user_id: Optional[int] = None,
+            book_id: Optional[int] = None
+    ):
+        statement = select(BorrowedBook)
+        if user_id is not None:
+            statement = statement.where(BorrowedBook.user_id == user_id)
+        if book_id is not None:
+            statement = statement.where(BorrowedBook.book_id == book_id)
+        return _updated_range(statement, BorrowedBook, updated_since, updated_before)
+
+    def _encode(self, rows, read_model: Type[BaseModel]) -> bytes:
+        return b"".join(read_model.model_validate(row).model_dump_json().encode() + b"\n" for row in rows)
+
+    def _iter_sync(self, statement, read_model: Type[BaseModel]) -> Iterator[bytes]:
+        with read_session() as session:
+            result = session.exec(statement)
+            for rows in result.partitions():
+                yield self._encode(rows, read_model)
+
+    async def stream_ndjson(self, statement, read_model: Type[BaseModel]) -> AsyncIterator[bytes]:
+        """NDJSON chunks read through a server-side cursor, one per fetched batch.
+
+        Uses its own session, since the stream outlives the request handler;
+        like other reads it goes to a replica unless the client is pinned.
+        """
+        settings = get_settings()
+        statement = statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+
+        if not settings.DB_ASYNC:
+            async for chunk in iterate_in_threadpool(self._iter_sync(statement, read_model)):
+                yield chunk
+            return
+
+        async with async_read_session() as session:
+            result = await session.stream_scalars(statement)
+            async for rows in result.partitions():
+                yield self._encode(rows, read_model)
+
+
+export_service = ExportService()
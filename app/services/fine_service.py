@@ -0,0 +1,118 @@
+# app/services/fine_service.py
+import argparse
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List, Optional
+
+from fastapi import status
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from app.config import get_settings
+from app.models.borrowed_book import RETURNED_STATUS
+from app.models.fine import Fine, FineRead, FineRecomputeReport, UserFinesRead
+from app.models.user import User
+from app.utils.exceptions import LibraryException
+
+# Arbitrary key for pg_try_advisory_xact_lock, so only one recompute runs at a time
+RECOMPUTE_LOCK_KEY = 7_340_114
+
+# A loan is overdue from the day after borrowing date + BORROW_DURATION_DAYS.
+# `borrowing_time < :cutoff` is that same condition in a form the partial
+# open-loan index can serve. Unchanged fines are not rewritten.
+UPSERT_FINES = f"""
+    INSERT INTO fine (loan_id, user_id, book_id, due_date, overdue_days, amount, updated_at)
+    SELECT b.id, b.user_id, b.book_id, due.due_date, :today - due.due_date,
+           round((:today - due.due_date) * CAST(:rate AS numeric), 2), timezone('utc', now())
+    FROM borrowedbook b
+    CROSS JOIN LATERAL (SELECT CAST(b.borrowing_time AS date) + :duration AS due_date) due
+    WHERE b.return_status <> '{RETURNED_STATUS}' AND b.borrowing_time < :cutoff
+    ON CONFLICT (loan_id) DO UPDATE
+    SET user_id = EXCLUDED.user_id,
+        book_id = EXCLUDED.book_id,
+        due_date = EXCLUDED.due_date,
+        overdue_days = EXCLUDED.overdue_days,
+        amount = EXCLUDED.amount,
+        updated_at = EXCLUDED.updated_at
+    WHERE (fine.user_id, fine.book_id, fine.due_date, fine.overdue_days, fine.amount)
+        IS DISTINCT FROM
+        (EXCLUDED.user_id, EXCLUDED.book_id, EXCLUDED.due_date, EXCLUDED.overdue_days, EXCLUDED.amount)
+"""
+
+# Loans returned (or re-dated) since the last run
+CLEAR_FINES = f"""
+    DELETE FROM fine f
+    WHERE NOT EXISTS (
+        SELECT 1 FROM borrowedbook b
+        WHERE b.id = f.loan_id AND b.return_status <> '{RETURNED_STATUS}' AND b.borrowing_time < :cutoff
+    )
+"""
+
+
+class FineService:
+    """Overdue fines for open loans, computed in bulk by the database.
+
+    `recompute` rewrites the fine table with two set-based statements in one
+    transaction, so readers see either the previous run or the new one.
+    """
+
+    def recompute(self, db: Session, *, today: Optional[date] = None) -> FineRecomputeReport:
+        settings = get_settings()
+        today = today or datetime.now(timezone.utc).date()
+        duration = settings.BORROW_DURATION_DAYS
+        cutoff = datetime.combine(today - timedelta(days=duration), datetime.min.time())
+        report = FineRecomputeReport(today=today)
+
+        start = time.perf_counter()
+        locked = db.exec(
+            text("SELECT pg_try_advisory_xact_lock(:key)").bindparams(key=RECOMPUTE_LOCK_KEY)
+        ).scalar_one()
+        if not locked:
+            db.rollback()
+            report.skipped = True
+            return report
+
+        report.updated = db.exec(
+            text(UPSERT_FINES).bindparams(
+                today=today, duration=duration, rate=settings.OVERDUE_FINE_RATE, cutoff=cutoff
+            )
+        ).rowcount
+        report.cleared = db.exec(text(CLEAR_FINES).bindparams(cutoff=cutoff)).rowcount
+        db.commit()
+        report.seconds = round(time.perf_counter() - start, 3)
+        return report
+
+    def user_fines(self, db: Session, user_id: int) -> UserFinesRead:
+        if db.get(User, user_id) is None:
+            raise LibraryException(f"User with ID {user_id} not found", status_code=status.HTTP_404_NOT_FOUND)
+        statement = select(Fine).where(Fine.user_id == user_id).order_by(Fine.loan_id)
+        fines: List[Fine] = db.exec(statement).all()
+        return UserFinesRead(
+            user_id=user_id,
+            total_amount=sum((fine.amount for fine in fines), Decimal("0")),
+            fines=[FineRead.model_validate(fine, from_attributes=True) for fine in fines]
+        )
+
+
+fine_service = FineService()
+
+
+def recompute_fines(today: Optional[date] = None) -> FineRecomputeReport:
+    """Run a recompute on its own session, for the schedule and the CLI."""
+    from app.db.database import get_engine
+
+    with Session(get_engine()) as db:
+        return fine_service.recompute(db, today=today)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Recompute overdue fines for all open loans")
+    parser.add_argument("--today", type=date.fromisoformat, help="compute as of this date (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    print(recompute_fines(args.today).model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
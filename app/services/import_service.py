@@ -0,0 +1,251 @@
+# app/services/import_service.py
+import argparse
+import csv
+import json
+import re
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session
+
+from app.config import get_settings
+from app.crud.books import crud_books
+from app.db.copy import copy_rows
+from app.models.book import BookCreate, BookImportError, BookImportReport
+
+IMPORT_FORMATS = ("csv", "jsonl")
+STAGING_COLUMNS = ("row_no", "title", "publication_year", "isbn", "quantity", "author_ids", "category_ids")
+ID_SEPARATOR = re.compile(r"[;,|\s]+")
+
+# One staging table per batch transaction; every check below is a single
+# set-based statement over it, so the cost per batch does not depend on rows
+CREATE_STAGING = """
+    CREATE TEMP TABLE book_import (
+        row_no integer PRIMARY KEY,
+        title text,
+        publication_year integer,
+        isbn text,
+        quantity integer,
+        author_ids integer[],
+        category_ids integer[],
+        book_id integer,
+        error text
+    ) ON COMMIT DROP
+"""
+
+MARK_MISSING_AUTHORS = """
+    UPDATE book_import s SET error = 'Author with ID ' || missing.id || ' not found'
+    FROM (
+        SELECT s.row_no, min(a.id) AS id
+        FROM book_import s CROSS JOIN unnest(s.author_ids) AS a(id)
+        WHERE NOT EXISTS (SELECT 1 FROM author WHERE author.id = a.id)
+        GROUP BY s.row_no
+    ) missing
+    WHERE s.row_no = missing.row_no
+"""
+
+MARK_MISSING_CATEGORIES = """
+    UPDATE book_import s SET error = 'Category with ID ' || missing.id || ' not found'
+    FROM (
+        SELECT s.row_no, min(c.id) AS id
+        FROM book_import s CROSS JOIN unnest(s.category_ids) AS c(id)
+        WHERE NOT EXISTS (SELECT 1 FROM category WHERE category.id = c.id)
+        GROUP BY s.row_no
+    ) missing
+    WHERE s.row_no = missing.row_no AND s.error IS NULL
+"""
+
+MARK_DUPLICATES_IN_BATCH = """
+    UPDATE book_import s SET error = 'Duplicate ISBN ' || s.isbn || ' in import'
+    WHERE s.error IS NULL AND EXISTS (
+        SELECT 1 FROM book_import d
+        WHERE d.isbn = s.isbn AND d.row_no < s.row_no AND d.error IS NULL
+    )
+"""
+
+MARK_EXISTING = """
+    UPDATE book_import s SET error = 'Book with ISBN ' || s.isbn || ' already exists'
+    WHERE s.error IS NULL AND EXISTS (SELECT 1 FROM book WHERE book.isbn = s.isbn)
+"""
+
+INSERT_BOOKS = """
+    WITH inserted AS (
+        INSERT INTO book (title, publication_year, isbn, quantity, available, created_at, updated_at)
+        SELECT title, publication_year, isbn, quantity, quantity, timezone('utc', now()), timezone('utc', now())
+        FROM book_import
+        WHERE error IS NULL
+        ORDER BY row_no
+        ON CONFLICT (isbn) DO NOTHING
+        RETURNING id, isbn
+    )
+    UPDATE book_import s SET book_id = inserted.id
+    FROM inserted
+    WHERE s.isbn = inserted.isbn AND s.error IS NULL
+"""
+
+# Rows that lost a race with a concurrent insert of the same ISBN
+MARK_CONFLICTS = """
+    UPDATE book_import SET error = 'Book with ISBN ' || isbn || ' already exists'
+    WHERE error IS NULL AND book_id IS NULL
+"""
+
+INSERT_AUTHOR_LINKS = """
+    INSERT INTO book_author_link (book_id, author_id)
+    SELECT DISTINCT s.book_id, a.id
+    FROM book_import s CROSS JOIN unnest(s.author_ids) AS a(id)
+    WHERE s.book_id IS NOT NULL
+"""
+
+INSERT_CATEGORY_LINKS = """
+    INSERT INTO book_category_link (book_id, category_id)
+    SELECT DISTINCT s.book_id, c.id
+    FROM book_import s CROSS JOIN unnest(s.category_ids) AS c(id)
+    WHERE s.book_id IS NOT NULL
+"""
+
+SELECT_RESULTS = "SELECT row_no, isbn, book_id, error FROM book_import ORDER BY row_no"
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+
+class ImportService:
+    def read_rows(self, stream: TextIO, format: str) -> Iterator[Tuple[int, Any]]:
+        """Yield (row number, dict) pairs; undecodable rows yield an error string."""
+        if format == "csv":
+            for row_no, row in enumerate(csv.DictReader(stream), start=1):
+                record: Dict[str, Any] = {}
+                for key, value in row.items():
+                    if key is None or value is None or value.strip() == "":
+                        continue
+                    key = key.strip()
+                    if key in ("author_ids", "category_ids"):
+                        record[key] = [item for item in ID_SEPARATOR.split(value.strip()) if item]
+                    else:
+                        record[key] = value.strip()
+                yield row_no, record
+        elif format == "jsonl":
+            row_no = 0
+            for line in stream:
+                if not line.strip():
+                    continue
+                row_no += 1
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield row_no, f"Invalid JSON: {e}"
+                    continue
+                yield row_no, record if isinstance(record, dict) else "Expected a JSON object"
+        else:
+            raise ValueError(f"Unsupported import format '{format}'")
+
+    def _validate(self, rows: List[Tuple[int, Any]], report: BookImportReport) -> List[Tuple]:
+        staged = []
+        for row_no, record in rows:
+            if isinstance(record, str):
+                self._fail(report, row_no, None, record)
+                continue
+            try:
+                book = BookCreate.model_validate(record)
+            except ValidationError as e:
+                isbn = record.get("isbn")
+                self._fail(report, row_no, isbn if isinstance(isbn, str) else None, _format_validation_error(e))
+                continue
+            staged.append((
+                row_no, book.title, book.publication_year, book.isbn, book.quantity,
+                book.author_ids, book.category_ids
+            ))
+        return staged
+
+    def _fail(self, report: BookImportReport, row_no: int, isbn: Optional[str], error: str) -> None:
+        report.failed += 1
+        if len(report.errors) < get_settings().IMPORT_MAX_REPORTED_ERRORS:
+            report.errors.append(BookImportError(row=row_no, isbn=isbn, error=error))
+
+    def _merge_batch(self, db: Session, staged: List[Tuple], report: BookImportReport) -> None:
+        try:
+            db.exec(text(CREATE_STAGING))
+            copy_rows(db, "book_import", STAGING_COLUMNS, staged)
+            for statement in (
+                    MARK_MISSING_AUTHORS,
+                    MARK_MISSING_CATEGORIES,
+                    MARK_DUPLICATES_IN_BATCH,
+                    MARK_EXISTING,
+                    INSERT_BOOKS,
+                    MARK_CONFLICTS,
+                    INSERT_AUTHOR_LINKS,
+                    INSERT_CATEGORY_LINKS,
+            ):
+                db.exec(text(statement))
+            results = db.exec(text(SELECT_RESULTS)).all()
+            db.commit()
+        except DBAPIError as e:
+            # e.g. an author deleted mid-import; only this batch is lost
+            db.rollback()
+            for row in staged:
+                self._fail(report, row[0], row[3], f"Batch failed: {e.orig}")
+            return
+
+        for row_no, isbn, book_id, error in results:
+            if book_id is not None:
+                report.imported += 1
+                crud_books.remember_isbn(isbn)
+            else:
+                self._fail(report, row_no, isbn, error)
+
+    def import_books(
+            self,
+            db: Session,
+            stream: TextIO,
+            *,
+            format: str = "csv",
+            batch_size: Optional[int] = None
+    ) -> BookImportReport:
+        """Bulk-load books from a CSV or JSONL stream.
+
+        The stream is parsed incrementally and merged in batches of
+        `batch_size` rows, each committed on its own. Bad rows are reported
+        and skipped; they never abort the rest of the import.
+        """
+        batch_size = batch_size or get_settings().IMPORT_BATCH_SIZE
+        report = BookImportReport()
+        rows = self.read_rows(stream, format)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            staged = self._validate(batch, report)
+            if staged:
+                self._merge_batch(db, staged, report)
+        return report
+
+
+import_service = ImportService()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.db.database import get_engine
+
+    parser = argparse.ArgumentParser(description="Bulk import books from a CSV or JSONL file")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int)
+    args = parser.parse_args(argv)
+
+    format = args.format or args.path.rsplit(".", 1)[-1].lower()
+    if format not in IMPORT_FORMATS:
+        parser.error("cannot infer the format from the file name, pass --format")
+
+    with open(args.path, newline="", encoding="utf-8") as stream, Session(get_engine()) as db:
+        report = import_service.import_books(db, stream, format=format, batch_size=args.batch_size)
+    print(report.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
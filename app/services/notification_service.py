@@ -0,0 +1,301 @@
+# app/services/notification_service.py
+import argparse
+import asyncio
+import json
+import logging
+import smtplib
+import time
+from datetime import date, datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.models.borrowed_book import RETURNED_STATUS
+from app.models.notification import (
+    DUE_SOON,
+    NOTIFICATION_FAILED,
+    NOTIFICATION_PENDING,
+    NOTIFICATION_SENT,
+    OVERDUE,
+)
+from app.utils.logger import setup_logging
+
+logger = logging.getLogger("library_api")
+
+# Loans due within the window and loans already overdue come from one range
+# scan of the partial open-loan index: both are `borrowing_time < :horizon`.
+ENQUEUE_REMINDERS = f"""
+    INSERT INTO notification (
+        loan_id, user_id, kind, due_date, recipient, subject, body,
+        status, attempts, next_attempt_at, created_at
+    )
+    SELECT b.id, b.user_id,
+           CASE WHEN due.due_date < :today THEN '{OVERDUE}' ELSE '{DUE_SOON}' END,
+           due.due_date, u.email,
+           CASE WHEN due.due_date < :today
+                THEN format('Overdue: %s', bk.title)
+                ELSE format('Due soon: %s', bk.title) END,
+           CASE WHEN due.due_date < :today
+                THEN format(
+                    E'Hello %s,\\n\\n"%s" was due on %s. A fine of %s accrues for every day it is late.\\n',
+                    u.first_name, bk.title, due.due_date, :rate)
+                ELSE format(
+                    E'Hello %s,\\n\\n"%s" is due back on %s.\\n',
+                    u.first_name, bk.title, due.due_date) END,
+           '{NOTIFICATION_PENDING}', 0, timezone('utc', now()), timezone('utc', now())
+    FROM borrowedbook b
+    CROSS JOIN LATERAL (SELECT CAST(b.borrowing_time AS date) + :duration AS due_date) due
+    JOIN "user" u ON u.id = b.user_id AND u.is_active
+    JOIN book bk ON bk.id = b.book_id
+    WHERE b.return_status <> '{RETURNED_STATUS}' AND b.borrowing_time < :horizon
+    ORDER BY b.id
+    ON CONFLICT ON CONSTRAINT uq_notification_loan_kind_due DO NOTHING
+"""
+
+# SKIP LOCKED lets concurrent workers take disjoint batches
+CLAIM_BATCH = f"""
+    UPDATE notification n
+    SET attempts = n.attempts + 1,
+        next_attempt_at = timezone('utc', now()) + make_interval(secs => :lease)
+    FROM (
+        SELECT id FROM notification
+        WHERE status = '{NOTIFICATION_PENDING}' AND next_attempt_at <= timezone('utc', now())
+        ORDER BY next_attempt_at, id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    ) claimed
+    WHERE n.id = claimed.id
+    RETURNING n.id, n.recipient, n.subject, n.body, n.attempts
+"""
+
+MARK_SENT = f"""
+    UPDATE notification
+    SET status = '{NOTIFICATION_SENT}', sent_at = timezone('utc', now()), last_error = NULL
+    WHERE id = ANY(:ids)
+"""
+
+MARK_FAILED = f"""
+    UPDATE notification n
+    SET status = CASE WHEN n.attempts >= :max_attempts THEN '{NOTIFICATION_FAILED}' ELSE n.status END,
+        next_attempt_at = timezone('utc', now())
+            + make_interval(secs => least(:max_delay, :base_delay * power(2, n.attempts - 1))),
+        last_error = f.error
+    FROM unnest(CAST(:ids AS integer[]), CAST(:errors AS text[])) AS f(id, error)
+    WHERE n.id = f.id
+    RETURNING n.status
+"""
+
+QUEUE_DEPTH = f"""
+    SELECT count(*) FILTER (WHERE status = '{NOTIFICATION_PENDING}'),
+           count(*) FILTER (
+               WHERE status = '{NOTIFICATION_PENDING}' AND next_attempt_at <= timezone('utc', now())
+           ),
+           count(*) FILTER (WHERE status = '{NOTIFICATION_FAILED}')
+    FROM notification
+    WHERE status <> '{NOTIFICATION_SENT}'
+"""
+
+
+class SMTPSender:
+    """Sends a batch of messages over a single SMTP connection."""
+
+    def __init__(self, settings):
+        self.settings = settings
+
+    def _connect(self) -> smtplib.SMTP:
+        settings = self.settings
+        smtp = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT)
+        if settings.SMTP_STARTTLS:
+            smtp.starttls()
+        if settings.SMTP_USERNAME:
+            smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD or "")
+        return smtp
+
+    def _build(self, message) -> EmailMessage:
+        email = EmailMessage()
+        email["From"] = self.settings.MAIL_FROM
+        email["To"] = message.recipient
+        email["Subject"] = message.subject
+        email.set_content(message.body)
+        return email
+
+    def send_batch(self, messages: Sequence[Any]) -> Dict[int, str]:
+        """Return {notification id: error} for every message that was not accepted."""
+        errors: Dict[int, str] = {}
+        sent = set()
+        try:
+            with self._connect() as smtp:
+                for message in messages:
+                    try:
+                        smtp.send_message(self._build(message))
+                        sent.add(message.id)
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+                        # Rejected by the server; the connection is still usable
+                        errors[message.id] = str(e)
+        except (OSError, smtplib.SMTPException) as e:
+            for message in messages:
+                if message.id not in sent:
+                    errors.setdefault(message.id, f"SMTP connection failed: {e}")
+        return errors
+
+
+class NotificationService:
+    """Durable reminder queue: enqueue in bulk, claim in batches, record outcomes."""
+
+    def enqueue_reminders(self, db: Session, *, today: Optional[date] = None) -> int:
+        settings = get_settings()
+        today = today or datetime.now(timezone.utc).date()
+        duration = settings.BORROW_DURATION_DAYS
+        horizon = datetime.combine(
+            today + timedelta(days=settings.NOTIFY_DUE_SOON_DAYS - duration + 1), datetime.min.time()
+        )
+        result = db.exec(text(ENQUEUE_REMINDERS).bindparams(
+            today=today, duration=duration, horizon=horizon, rate=str(settings.OVERDUE_FINE_RATE)
+        ))
+        db.commit()
+        return result.rowcount
+
+    def claim(self, db: Session, limit: int) -> List[Any]:
+        rows = db.exec(text(CLAIM_BATCH).bindparams(
+            limit=limit, lease=get_settings().NOTIFY_LEASE_SECONDS
+        )).all()
+        db.commit()
+        return rows
+
+    def complete(self, db: Session, batch: Sequence[Any], errors: Dict[int, str]) -> Tuple[int, int, int]:
+        """Record a sent batch; returns (sent, retrying, failed for good)."""
+        settings = get_settings()
+        sent_ids = [message.id for message in batch if message.id not in errors]
+        if sent_ids:
+            db.exec(text(MARK_SENT).bindparams(ids=sent_ids))
+        statuses = []
+        if errors:
+            ids = sorted(errors)
+            statuses = db.exec(text(MARK_FAILED).bindparams(
+                ids=ids,
+                errors=[errors[id] for id in ids],
+                max_attempts=settings.NOTIFY_MAX_ATTEMPTS,
+                base_delay=settings.NOTIFY_RETRY_BASE_SECONDS,
+                max_delay=settings.NOTIFY_RETRY_MAX_SECONDS
+            )).scalars().all()
+        db.commit()
+        failed = sum(1 for status in statuses if status == NOTIFICATION_FAILED)
+        return len(sent_ids), len(statuses) - failed, failed
+
+    def queue_depth(self, db: Session) -> Dict[str, int]:
+        pending, ready, failed = db.exec(text(QUEUE_DEPTH)).one()
+        return {"pending": pending, "ready": ready, "failed": failed}
+
+
+notification_service = NotificationService()
+
+
+def _with_session(fn: Callable, *args, **kwargs):
+    from app.db.database import get_engine
+
+    with Session(get_engine()) as db:
+        return fn(db, *args, **kwargs)
+
+
+def enqueue_reminders(today: Optional[date] = None) -> int:
+    """Enqueue on its own session, for the schedule and the CLI."""
+    return _with_session(notification_service.enqueue_reminders, today=today)
+
+
+class NotificationWorker:
+    """Bounded pool of async workers draining the notification queue.
+
+    Each worker claims up to NOTIFY_BATCH_SIZE messages, sends them over one
+    SMTP connection and records the outcome; blocking SMTP and database calls
+    run in the threadpool, so at most NOTIFY_WORKERS of them are in flight.
+    """
+
+    def __init__(self):
+        self.sent = 0
+        self.retrying = 0
+        self.failed = 0
+        self.batches = 0
+        self.active = 0
+        self.started_at: Optional[float] = None
+
+    async def run(self, *, until_empty: bool = False) -> None:
+        settings = get_settings()
+        sender = SMTPSender(settings)
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        await asyncio.gather(*(
+            self._work(sender, settings, until_empty) for _ in range(settings.NOTIFY_WORKERS)
+        ))
+
+    async def drain(self) -> Dict[str, Any]:
+        """Send everything that is due now, then return the worker stats."""
+        await self.run(until_empty=True)
+        return self.stats()
+
+    async def _work(self, sender: SMTPSender, settings, until_empty: bool) -> None:
+        while True:
+            try:
+                batch = await run_in_threadpool(_with_session, notification_service.claim, settings.NOTIFY_BATCH_SIZE)
+                if not batch:
+                    if until_empty:
+                        return
+                    await asyncio.sleep(settings.NOTIFY_POLL_SECONDS)
+                    continue
+
+                self.active += 1
+                try:
+                    errors = await run_in_threadpool(sender.send_batch, batch)
+                    sent, retrying, failed = await run_in_threadpool(
+                        _with_session, notification_service.complete, batch, errors
+                    )
+                finally:
+                    self.active -= 1
+                self.batches += 1
+                self.sent += sent
+                self.retrying += retrying
+                self.failed += failed
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if until_empty:
+                    raise
+                # Claimed rows come back once their lease runs out
+                logger.error(f"Notification worker error: {e}")
+                await asyncio.sleep(settings.NOTIFY_POLL_SECONDS)
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started_at if self.started_at is not None else 0.0
+        return {
+            "workers": get_settings().NOTIFY_WORKERS,
+            "active": self.active,
+            "batches": self.batches,
+            "sent": self.sent,
+            "retrying": self.retrying,
+            "failed": self.failed,
+            "sent_per_second": round(self.sent / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+notification_worker = NotificationWorker()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Enqueue due-date reminders and send pending notifications")
+    parser.add_argument("--today", type=date.fromisoformat, help="enqueue as of this date (YYYY-MM-DD)")
+    parser.add_argument("--no-send", action="store_true", help="only enqueue")
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    result: Dict[str, Any] = {"enqueued": enqueue_reminders(args.today)}
+    if not args.no_send:
+        result["worker"] = asyncio.run(notification_worker.drain())
+    result["queue"] = _with_session(notification_service.queue_depth)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# app/services/search_service.py
+import html
+from typing import Collection, List, Optional, Tuple
+
+from sqlalchemy import func, literal_column, union
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlmodel import Session, select
+
+from app.config import get_settings
+from app.crud.books import crud_books
+from app.models.author import Author
+from app.models.book import Book, BookAuthorLink
+
+# Must match the configuration used by book_search_document() in the migration
+TEXT_SEARCH_CONFIG = "english"
+# ts_headline brackets matches with STX/ETX control characters (stripped from the
+# title first); the text around them is HTML-escaped before they become <mark>
+MARK_START, MARK_STOP = "\x02", "\x03"
+HEADLINE_OPTIONS = f"StartSel={MARK_START}, StopSel={MARK_STOP}, HighlightAll=true"
+
+# Maintained by database triggers, deliberately not mapped on the Book model
+search_vector = literal_column("book.search_vector", type_=TSVECTOR)
+
+# Same expression as the ix_author_name_trgm index, so the planner can use it
+author_name = Author.first_name + literal_column("' '") + Author.second_name
+
+
+def render_highlight(headline: str) -> str:
+    return html.escape(headline).replace(MARK_START, "<mark>").replace(MARK_STOP, "</mark>")
+
+
+def similar_to(expression, query: str):
+    # pg_trgm's % binds tighter than ||, so the name concatenation needs parentheses
+    return expression.bool_op("%", precedence=8)(query)
+
+
+class SearchService:
+    def search(
+            self,
+            db: Session,
+            *,
+            query: str,
+            author_id: Optional[int] = None,
+            category_id: Optional[int] = None,
+            skip: int = 0,
+            limit: int = 100
+    ) -> List[Tuple[Book, float, str]]:
+        ts_query = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, query)
+        rank = func.ts_rank(search_vector, ts_query).label("rank")
+
+        # Rank and page on ids first so ts_headline only runs for the returned page
+        ranked = select(Book.id, rank).where(search_vector.op("@@")(ts_query))
+        ranked = crud_books.apply_relation_filters(ranked, author_id=author_id, category_id=category_id)
+        ranked = ranked.order_by(rank.desc(), Book.id).offset(skip).limit(limit).subquery()
+
+        title = func.translate(Book.title, MARK_START + MARK_STOP, "")
+        headline = func.ts_headline(TEXT_SEARCH_CONFIG, title, ts_query, HEADLINE_OPTIONS)
+        statement = (
+            select(Book, ranked.c.rank, headline)
+            .join(ranked, ranked.c.id == Book.id)
+            .order_by(ranked.c.rank.desc(), Book.id)
+        )
+        return [
+            (book, rank_value, render_highlight(highlight))
+            for book, rank_value, highlight in db.exec(statement).all()
+        ]
+
+    def fuzzy_search(
+            self,
+            db: Session,
+            *,
+            query: str,
+            threshold: Optional[float] = None,
+            author_id: Optional[int] = None,
+            category_id: Optional[int] = None,
+            skip: int = 0,
+            limit: int = 100,
+            include: Collection[str] = ()
+    ) -> List[Tuple[Book, float]]:
+        if threshold is None:
+            threshold = get_settings().FUZZY_SIMILARITY_THRESHOLD
+
+        # The % operator is what the trigram GIN indexes serve; it reads its
+        # cut-off from this setting, scoped to the current transaction
+        db.exec(select(func.set_config("pg_trgm.similarity_threshold", str(threshold), True)))
+
+        candidates = union(
+            select(Book.id.label("id")).where(similar_to(Book.title, query)),
+            select(BookAuthorLink.book_id.label("id"))
+            .join(Author, Author.id == BookAuthorLink.author_id)
+            .where(similar_to(author_name, query))
+        ).subquery()
+
+        author_score = (
+            select(func.max(func.similarity(author_name, query)))
+            .join(BookAuthorLink, BookAuthorLink.author_id == Author.id)
+            .where(BookAuthorLink.book_id == Book.id)
+            .scalar_subquery()
+        )
+        score = func.greatest(func.similarity(Book.title, query), func.coalesce(author_score, 0)).label("score")
+
+        statement = (
+            select(Book, score)
+            .join(candidates, candidates.c.id == Book.id)
+            .options(*crud_books.include_options(include))
+        )
+        statement = crud_books.apply_relation_filters(statement, author_id=author_id, category_id=category_id)
+        statement = statement.order_by(score.desc(), Book.id).offset(skip).limit(limit)
+        return [(book, score_value) for book, score_value in db.exec(statement).all()]
+
+
+search_service = SearchService()
@@ -0,0 +1,63 @@
+# app/services/stats_service.py
+from typing import List
+
+from fastapi import status
+from sqlmodel import Session, select
+
+from app.models.author import Author
+from app.models.book import Book
+from app.models.borrow_stats import (
+    AuthorBorrowStats,
+    BookBorrowStats,
+    CategoryBorrowStats,
+    PopularAuthorRead,
+    PopularBookRead,
+    PopularCategoryRead,
+)
+from app.models.category import Category
+from app.utils.exceptions import LibraryException
+
+
+class StatsService:
+    """Popularity rankings read from the trigger-maintained counter tables.
+
+    Each ranking walks the (borrow_count, id) index backwards and stops after
+    `top_n` rows, so its cost does not grow with the loan history.
+    """
+
+    def _top(self, db: Session, model, stats, key, top_n: int):
+        statement = (
+            select(model, stats.borrow_count)
+            .join(stats, key == model.id)
+            .where(stats.borrow_count > 0)
+            .order_by(stats.borrow_count.desc(), key.desc())
+            .limit(top_n)
+        )
+        result = db.exec(statement).all()
+        if not result:
+            raise LibraryException("No borrowed books found for statistics.", status_code=status.HTTP_404_NOT_FOUND)
+        return result
+
+    def most_popular_books(self, db: Session, top_n: int = 10) -> List[PopularBookRead]:
+        result = self._top(db, Book, BookBorrowStats, BookBorrowStats.book_id, top_n)
+        return [
+            PopularBookRead(book=book, borrow_count=borrow_count)
+            for book, borrow_count in result
+        ]
+
+    def most_popular_authors(self, db: Session, top_n: int = 10) -> List[PopularAuthorRead]:
+        result = self._top(db, Author, AuthorBorrowStats, AuthorBorrowStats.author_id, top_n)
+        return [
+            PopularAuthorRead(author=author, borrow_count=borrow_count)
+            for author, borrow_count in result
+        ]
+
+    def most_popular_categories(self, db: Session, top_n: int = 10) -> List[PopularCategoryRead]:
+        result = self._top(db, Category, CategoryBorrowStats, CategoryBorrowStats.category_id, top_n)
+        return [
+            PopularCategoryRead(category=category, borrow_count=borrow_count)
+            for category, borrow_count in result
+        ]
+
+
+stats_service = StatsService()
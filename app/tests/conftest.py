@@ -23,3 +23,43 @@ def run_migrations():
 def client():
     with TestClient(app) as c:
         yield c
+
+
+@pytest.fixture
+def query_counter():
+    from sqlalchemy import event
+    from app.config import get_settings
+    from app.db.database import get_async_engine, get_engine
+
+    engines = [get_engine()]
+    if get_settings().DB_ASYNC:
+        engines.append(get_async_engine().sync_engine)
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for target in engines:
+        event.listen(target, "before_cursor_execute", count)
+    yield statements
+    for target in engines:
+        event.remove(target, "before_cursor_execute", count)
+
+
+@pytest.fixture
+def query_budget():
+    """Turns on X-DB-Queries and returns check(response, budget)."""
+    from app.config import get_settings
+
+    settings = get_settings()
+    previous = settings.DB_QUERY_HEADERS
+    settings.DB_QUERY_HEADERS = True
+
+    def check(response, budget):
+        count = int(response.headers["X-DB-Queries"])
+        assert count <= budget, f"{response.request.method} {response.request.url.path}: {count} queries > {budget}"
+        return count
+
+    yield check
+    settings.DB_QUERY_HEADERS = previous
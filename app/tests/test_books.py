@@ -180,4 +180,272 @@ def test_get_all_books(client):
     assert response.status_code == 200
     books = response.json()
     assert isinstance(books, list)
-    assert len(books) > 0
\ No newline at end of file
+    assert len(books) > 0
+
+def test_update_book_with_duplicate_isbn(client):
+    client.post("/api/books/", json={
+        "title": "Existing ISBN Owner",
+        "publication_year": 2019,
+        "isbn": "5550001112",
+        "quantity": 1,
+        "author_ids": [],
+        "category_ids": []
+    })
+    create = client.post("/api/books/", json={
+        "title": "ISBN Thief",
+        "publication_year": 2019,
+        "isbn": "5550001113",
+        "quantity": 1,
+        "author_ids": [],
+        "category_ids": []
+    })
+    book_id = create.json()["id"]
+
+    # Спроба змінити ISBN на вже зайнятий
+    response = client.put(f"/api/books/{book_id}", json={"isbn": "5550001112"})
+    assert response.status_code == 400
+    assert "ISBN" in response.json()["detail"]
+
+
+def test_full_text_search_books(client):
+    author = client.post("/api/authors/", json={
+        "first_name": "Ursula",
+        "second_name": "Leguin",
+        "biography": None
+    }).json()
+    client.post("/api/books/", json={
+        "title": "Wizard of Earthsea",
+        "publication_year": 1968,
+        "isbn": "8880001112",
+        "quantity": 1,
+        "author_ids": [author["id"]],
+        "category_ids": []
+    })
+
+    # Пошук за назвою та іменем автора одночасно
+    response = client.get("/api/books/search/", params={"q": "earthsea leguin"})
+    assert response.status_code == 200
+    results = response.json()
+    assert results[0]["title"] == "Wizard of Earthsea"
+    assert results[0]["rank"] > 0
+    assert "<mark>" in results[0]["highlight"]
+
+
+# Назва в підсвічуванні екранується, розмітка лише від <mark>
+def test_full_text_search_highlight_is_escaped(client):
+    client.post("/api/books/", json={
+        "title": "Dragons <script>alert(1)</script> & Knights",
+        "publication_year": 2001,
+        "isbn": "8880001114",
+        "quantity": 1,
+        "author_ids": [],
+        "category_ids": []
+    })
+
+    results = client.get("/api/books/search/", params={"q": "dragons"}).json()
+    assert results[0]["highlight"] == "<mark>Dragons</mark> &lt;script&gt;alert(1)&lt;/script&gt; &amp; Knights"
+    assert results[0]["title"] == "Dragons <script>alert(1)</script> & Knights"
+
+
+# Від'ємні skip і limit відхиляються до запиту в БД
+def test_search_books_rejects_negative_paging(client):
+    for params in ({"q": "earthsea", "limit": 0}, {"q": "earthsea", "limit": -1}, {"q": "earthsea", "skip": -1}):
+        assert client.get("/api/books/search/", params=params).status_code == 422
+
+
+def test_fuzzy_search_books_tolerates_typos(client):
+    client.post("/api/books/", json={
+        "title": "Chronicles of Narnia",
+        "publication_year": 1950,
+        "isbn": "8880001113",
+        "quantity": 1,
+        "author_ids": [],
+        "category_ids": []
+    })
+
+    # Назва з помилкою все одно знаходить книгу
+    response = client.get("/api/books/", params={"title": "Cronicles of Narnya", "match": "fuzzy"})
+    assert response.status_code == 200
+    assert response.json()[0]["title"] == "Chronicles of Narnia"
+
+    # Курсор і сортування не поєднуються з ранжуванням за схожістю
+    for extra in ({"cursor": "abc"}, {"sort": "-title"}):
+        response = client.get("/api/books/", params={"title": "Narnia", "match": "fuzzy", **extra})
+        assert response.status_code == 400
+
+
+def test_read_books_cursor_pagination(client):
+    for i in range(5):
+        client.post("/api/books/", json={
+            "title": f"Cursor Book {i}",
+            "publication_year": 2000 + i,
+            "isbn": f"66600011{i}",
+            "quantity": 1,
+            "author_ids": [],
+            "category_ids": []
+        })
+
+    # Проходимо всі сторінки за курсором і перевіряємо, що немає дублікатів
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, "sort": "-publication_year"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/books/", params=params)
+        assert response.status_code == 200
+        seen.extend(book["id"] for book in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen))
+    assert len(seen) == len(client.get("/api/books/", params={"limit": 1000}).json())
+
+
+def test_read_books_invalid_cursor(client):
+    response = client.get("/api/books/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+# Масовий імпорт книг з CSV
+def test_import_books_csv(client):
+    author_id = client.post("/api/authors/", json={
+        "first_name": "Import",
+        "second_name": "Author"
+    }).json()["id"]
+    client.post("/api/books/", json={
+        "title": "Existing Import Book",
+        "publication_year": 2001,
+        "isbn": "777000001",
+        "quantity": 1,
+        "author_ids": [],
+        "category_ids": []
+    })
+
+    body = (
+        "title,publication_year,isbn,quantity,author_ids,category_ids\n"
+        f"Imported One,2010,777000002,3,{author_id},\n"
+        "Imported Two,2011,777000003,1,,\n"
+        "Duplicate,2012,777000001,1,,\n"
+        "Bad Author,2013,777000004,1,999999,\n"
+        "Bad Year,not-a-year,777000005,1,,\n"
+    )
+    response = client.post("/api/books/import", params={"format": "csv"}, content=body)
+    assert response.status_code == 200
+    report = response.json()
+    assert report["imported"] == 2
+    assert report["failed"] == 3
+    assert sorted(error["row"] for error in report["errors"]) == [3, 4, 5]
+
+    # Зв'язок з автором створено
+    books = client.get("/api/books/", params={"author_id": author_id}).json()
+    assert [book["isbn"] for book in books] == ["777000002"]
+
+
+# Оновлення зв'язків: усі відсутні ID повідомляються одразу
+def test_update_book_relations_diff(client):
+    author_ids = [
+        client.post("/api/authors/", json={"first_name": "Diff", "second_name": f"Author {i}"}).json()["id"]
+        for i in range(3)
+    ]
+    book_id = client.post("/api/books/", json={
+        "title": "Relations Diff",
+        "publication_year": 2020,
+        "isbn": "888000001",
+        "quantity": 1,
+        "author_ids": author_ids[:2],
+        "category_ids": []
+    }).json()["id"]
+
+    response = client.put(f"/api/books/{book_id}", json={"author_ids": author_ids[1:]})
+    assert response.status_code == 200
+    books = client.get("/api/books/", params={"author_id": author_ids[0]}).json()
+    assert book_id not in [book["id"] for book in books]
+    books = client.get("/api/books/", params={"author_id": author_ids[2]}).json()
+    assert book_id in [book["id"] for book in books]
+
+    response = client.put(f"/api/books/{book_id}", json={"author_ids": [author_ids[0], 999998, 999999]})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Author IDs not found: 999998, 999999"
+
+
+# Кеш читання скидається після оновлення книги
+def test_read_book_cache_invalidated_on_update(client):
+    book_id = client.post("/api/books/", json={
+        "title": "Cached Title",
+        "publication_year": 2015,
+        "isbn": "999000111",
+        "quantity": 1,
+        "author_ids": [],
+        "category_ids": []
+    }).json()["id"]
+
+    assert client.get(f"/api/books/{book_id}").json()["title"] == "Cached Title"
+    assert client.get(f"/api/books/{book_id}").json()["title"] == "Cached Title"
+
+    client.put(f"/api/books/{book_id}", json={"title": "Fresh Title"})
+    assert client.get(f"/api/books/{book_id}").json()["title"] == "Fresh Title"
+
+    client.delete(f"/api/books/{book_id}")
+    assert client.get(f"/api/books/{book_id}").status_code == 404
+
+
+# Розгорнуті автори та категорії без N+1 запитів
+def test_read_books_include_relations_query_count(client, query_counter):
+    author_ids = [
+        client.post("/api/authors/", json={"first_name": "Include", "second_name": f"Author {i}"}).json()["id"]
+        for i in range(2)
+    ]
+    category_id = client.post("/api/categories/", json={"category_name": "Include Genre"}).json()["id"]
+    for i in range(5):
+        client.post("/api/books/", json={
+            "title": f"Include Book {i}",
+            "publication_year": 2000 + i,
+            "isbn": f"55500012{i}",
+            "quantity": 1,
+            "author_ids": author_ids,
+            "category_ids": [category_id]
+        })
+
+    params = {"category_id": category_id, "include": "authors,categories"}
+    counts = {}
+    for limit in (2, 5):
+        query_counter.clear()
+        response = client.get("/api/books/", params={**params, "limit": limit})
+        assert response.status_code == 200
+        counts[limit] = len(query_counter)
+        for book in response.json():
+            assert sorted(author["id"] for author in book["authors"]) == sorted(author_ids)
+            assert [category["id"] for category in book["categories"]] == [category_id]
+
+    # Одна вибірка книг + по одному запиту на кожен зв'язок, незалежно від розміру сторінки
+    assert counts[2] == counts[5] == 3
+
+    plain = client.get("/api/books/", params={"category_id": category_id}).json()
+    assert "authors" not in plain[0]
+
+    response = client.get("/api/books/", params={"include": "reviews"})
+    assert response.status_code == 400
+
+
+# ISBN, доданий під час прогріву фільтра, не губиться
+def test_isbn_filter_keeps_isbns_added_during_warm_up(client):
+    from sqlmodel import Session
+    from app.crud.books import CRUDBook
+    from app.db.database import get_engine
+    from app.models.book import Book
+
+    crud = CRUDBook(Book)
+    with Session(get_engine()) as db:
+        scan = db.exec
+
+        def exec_during_create(statement):
+            # Книгу створено, поки сканування ще триває
+            crud.remember_isbn("9990001112223")
+            return scan(statement)
+
+        db.exec = exec_during_create
+        crud.warm_isbn_filter(db, capacity=1000, error_rate=0.01)
+
+    assert "9990001112223" in crud.isbn_filter
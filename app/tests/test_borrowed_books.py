@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 import pytest
 
@@ -138,3 +139,154 @@ def test_delete_borrowed_book(client):
     response = client.delete(f"/api/borrowed_books/{borrow['id']}")
     assert response.status_code == 200
     assert response.json()["id"] == borrow["id"]
+
+
+# Популярні автори та категорії рахуються через таблиці зв'язків
+def test_most_popular_authors_and_categories(client):
+    user = client.post("/api/users/", json={
+        "first_name": "Stats", "last_name": "Reader", "email": "stats@example.com"
+    }).json()
+    author = client.post("/api/authors/", json={"first_name": "Popular", "second_name": "Writer"}).json()
+    category = client.post("/api/categories/", json={"category_name": "Popular Genre"}).json()
+    book = client.post("/api/books/", json={
+        "title": "Popular Book",
+        "publication_year": 2023,
+        "isbn": "990011223344",
+        "quantity": 5,
+        "author_ids": [author["id"]],
+        "category_ids": [category["id"]]
+    }).json()
+    for _ in range(3):
+        client.post("/api/borrowed_books/", json={
+            "user_id": user["id"],
+            "book_id": book["id"],
+            "borrowing_time": datetime.now(timezone.utc).isoformat(),
+            "return_status": "not returned"
+        })
+
+    books = client.get("/api/borrowed_books/most-popular-books", params={"top_n": 100}).json()
+    assert {"id": book["id"], "borrow_count": 3} in [
+        {"id": item["book"]["id"], "borrow_count": item["borrow_count"]} for item in books
+    ]
+
+    authors = client.get("/api/borrowed_books/most-popular-authors", params={"top_n": 100})
+    assert authors.status_code == 200
+    counts = {item["author"]["id"]: item["borrow_count"] for item in authors.json()}
+    assert counts[author["id"]] == 3
+
+    categories = client.get("/api/borrowed_books/most-popular-categories", params={"top_n": 100})
+    assert categories.status_code == 200
+    counts = {item["category"]["id"]: item["borrow_count"] for item in categories.json()}
+    assert counts[category["id"]] == 3
+
+
+# Останній примірник можна позичити лише один раз
+def test_borrow_last_copy_and_return(client):
+    users = [
+        client.post("/api/users/", json={
+            "first_name": "Last", "last_name": f"Copy {i}", "email": f"lastcopy{i}@example.com"
+        }).json()
+        for i in range(2)
+    ]
+    book = client.post("/api/books/", json={
+        "title": "Single Copy",
+        "publication_year": 2024,
+        "isbn": "123000999",
+        "quantity": 1,
+        "author_ids": [],
+        "category_ids": []
+    }).json()
+    assert book["available"] == 1
+
+    def borrow(user):
+        return client.post("/api/borrowed_books/", json={
+            "user_id": user["id"],
+            "book_id": book["id"],
+            "borrowing_time": datetime.now(timezone.utc).isoformat(),
+            "return_status": "not returned"
+        })
+
+    first = borrow(users[0])
+    assert first.status_code == 201
+    assert borrow(users[1]).status_code == 409
+    assert client.get(f"/api/books/{book['id']}").json()["available"] == 0
+
+    # Кількість не можна зменшити нижче виданих примірників
+    assert client.put(f"/api/books/{book['id']}", json={"quantity": 0}).status_code == 400
+
+    client.put(f"/api/borrowed_books/{first.json()['id']}", json={"return_status": "returned"})
+    assert client.get(f"/api/books/{book['id']}").json()["available"] == 1
+    assert borrow(users[1]).status_code == 201
+
+
+# Час зі зміщенням зберігається як UTC без часового поясу
+def test_borrowing_time_stored_as_utc(client):
+    user = client.post("/api/users/", json={
+        "first_name": "Ostap", "last_name": "Vyshnia", "email": "ostap@example.com"
+    }).json()
+    book = client.post("/api/books/", json={
+        "title": "Offset Book",
+        "publication_year": 1930,
+        "isbn": "7770001112223",
+        "quantity": 1,
+        "author_ids": [],
+        "category_ids": []
+    }).json()
+    response = client.post("/api/borrowed_books/", json={
+        "user_id": user["id"],
+        "book_id": book["id"],
+        "borrowing_time": "2024-05-01T12:00:00+03:00",
+        "return_status": "not returned"
+    })
+    assert response.status_code == 201
+    loan = client.get(f"/api/borrowed_books/user/{user['id']}").json()[0]
+    assert loan["borrowing_time"].startswith("2024-05-01T09:00:00")
+
+    response = client.put(f"/api/borrowed_books/{loan['id']}", json={"return_status": "returned"})
+    assert response.status_code == 200
+    assert datetime.fromisoformat(response.json()["updated_at"]).tzinfo is None
+
+
+# Одночасні повернення й видалення повертають примірник на полицю лише раз
+def test_concurrent_returns_restore_one_copy(client):
+    user = client.post("/api/users/", json={
+        "first_name": "Lesia", "last_name": "Ukrainka", "email": "lesia@example.com"
+    }).json()
+    book = client.post("/api/books/", json={
+        "title": "Racing Returns",
+        "publication_year": 1911,
+        "isbn": "7770001112230",
+        "quantity": 2,
+        "author_ids": [],
+        "category_ids": []
+    }).json()
+
+    def borrow():
+        return client.post("/api/borrowed_books/", json={
+            "user_id": user["id"],
+            "book_id": book["id"],
+            "borrowing_time": datetime.now(timezone.utc).isoformat(),
+            "return_status": "not returned"
+        }).json()
+
+    def give_back(loan_id):
+        return client.put(f"/api/borrowed_books/{loan_id}", json={"return_status": "returned"}).status_code
+
+    first, second = borrow(), borrow()
+    assert client.get(f"/api/books/{book['id']}").json()["available"] == 0
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        returns = list(pool.map(give_back, [first["id"]] * 4))
+    assert returns == [200] * 4
+    assert client.get(f"/api/books/{book['id']}").json()["available"] == 1
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        statuses = [
+            future.result() for future in [
+                pool.submit(give_back, second["id"]),
+                pool.submit(lambda: client.delete(f"/api/borrowed_books/{second['id']}").status_code),
+                pool.submit(give_back, second["id"]),
+            ]
+        ]
+    assert 200 in statuses and set(statuses) <= {200, 404}
+    assert client.get(f"/api/books/{book['id']}").json()["available"] == 2
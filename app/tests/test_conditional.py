@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+
+def create_book(client, isbn, **extra):
+    author = client.post("/api/authors/", json={"first_name": "Ivan", "second_name": "Franko"}).json()
+    response = client.post("/api/books/", json={
+        "title": f"Conditional {isbn}",
+        "publication_year": 2020,
+        "isbn": isbn,
+        "quantity": 2,
+        "author_ids": [author["id"]],
+        "category_ids": [],
+        **extra
+    })
+    return response.json(), author
+
+
+# Повторний запит з If-None-Match повертає 304 без тіла
+def test_book_not_modified(client):
+    book, _ = create_book(client, "7700000000001")
+    first = client.get(f"/api/books/{book['id']}")
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    assert "last-modified" in first.headers
+
+    second = client.get(f"/api/books/{book['id']}", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+    since = client.get(f"/api/books/{book['id']}", headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert since.status_code == 304
+
+
+# Позичання змінює available, отже і ETag книги та списку
+def test_borrow_changes_etag(client):
+    book, _ = create_book(client, "7700000000002")
+    user = client.post("/api/users/", json={
+        "first_name": "Olha", "last_name": "Kobylianska", "email": "olha.etag@example.com"
+    }).json()
+    etag = client.get(f"/api/books/{book['id']}").headers["etag"]
+    list_etag = client.get("/api/books/", params={"title": "Conditional"}).headers["etag"]
+
+    client.post("/api/borrowed_books/", json={
+        "user_id": user["id"],
+        "book_id": book["id"],
+        "borrowing_time": datetime.now(timezone.utc).isoformat(),
+        "return_status": "not returned"
+    })
+    response = client.get(f"/api/books/{book['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["available"] == 1
+    response = client.get("/api/books/", params={"title": "Conditional"}, headers={"If-None-Match": list_etag})
+    assert response.status_code == 200
+
+
+# Перевірка до завантаження дає той самий ETag, що і повна відповідь
+def test_list_and_expanded_validators_match(client):
+    book, author = create_book(client, "7700000000003")
+    for url, params in [
+        ("/api/books/", {"include": "authors,categories", "limit": 5}),
+        (f"/api/books/{book['id']}", {"include": "authors"}),
+        ("/api/authors/", {"limit": 5}),
+        ("/api/categories/", {}),
+    ]:
+        etag = client.get(url, params=params).headers["etag"]
+        assert client.get(url, params=params, headers={"If-None-Match": etag}).status_code == 304
+
+    # Зміна пов'язаного автора змінює ETag розгорнутої книги
+    url = f"/api/books/{book['id']}"
+    etag = client.get(url, params={"include": "authors"}).headers["etag"]
+    client.put(f"/api/authors/{author['id']}", json={"first_name": "Lesya"})
+    response = client.get(url, params={"include": "authors"}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["authors"][0]["first_name"] == "Lesya"
+
+
+# Список не має Last-Modified: після видалення рядка If-Modified-Since не дає 304
+def test_list_ignores_if_modified_since_after_delete(client):
+    ids = [create_book(client, f"770000000001{i}")[0]["id"] for i in range(3)]
+    params = {"title": "Conditional 770000000001", "limit": 2}
+    first = client.get("/api/books/", params=params)
+    assert [book["id"] for book in first.json()] == ids[:2]
+    assert "last-modified" not in first.headers
+
+    client.delete(f"/api/books/{ids[1]}")
+    since = format_datetime(datetime.now(timezone.utc), usegmt=True)
+    response = client.get("/api/books/", params=params, headers={"If-Modified-Since": since})
+    assert response.status_code == 200
+    assert [book["id"] for book in response.json()] == [ids[0], ids[2]]
@@ -0,0 +1,37 @@
+import json
+from datetime import datetime, timezone
+
+
+# Експорт книг у форматі NDJSON
+def test_export_books_ndjson(client):
+    client.post("/api/books/", json={
+        "title": "Exported Book",
+        "publication_year": 2019,
+        "isbn": "444000111",
+        "quantity": 1,
+        "author_ids": [],
+        "category_ids": []
+    })
+
+    response = client.get("/api/export/books.ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    books = [json.loads(line) for line in response.text.splitlines()]
+    assert "444000111" in [book["isbn"] for book in books]
+
+
+# Інкрементальний експорт за updated_at
+def test_export_books_updated_since(client):
+    since = datetime.now(timezone.utc).isoformat()
+    client.post("/api/books/", json={
+        "title": "Incremental Book",
+        "publication_year": 2020,
+        "isbn": "444000222",
+        "quantity": 1,
+        "author_ids": [],
+        "category_ids": []
+    })
+
+    response = client.get("/api/export/books.ndjson", params={"updated_since": since})
+    assert response.status_code == 200
+    assert [json.loads(line)["isbn"] for line in response.text.splitlines()] == ["444000222"]
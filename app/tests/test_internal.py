@@ -0,0 +1,10 @@
+# Статистика пулу з'єднань
+def test_read_pool_stats(client):
+    client.get("/api/books/")
+    response = client.get("/internal/pool")
+    assert response.status_code == 200
+    stats = response.json()
+    pool = stats["async"] if "async" in stats else stats["sync"]
+    assert pool["checkouts"] >= 1
+    assert pool["timeouts"] == 0
+    assert stats["threadpool"]["size"] >= 1
@@ -0,0 +1,24 @@
+import json
+import logging
+
+from app.utils.logger import JsonFormatter
+
+
+# Ідентифікатор запиту повертається в заголовку
+def test_request_id_header(client):
+    response = client.get("/api/books/", headers={"X-Request-ID": "test-request-1"})
+    assert response.headers["X-Request-ID"] == "test-request-1"
+    assert client.get("/api/books/").headers["X-Request-ID"]
+
+
+# JSON-формат містить структуровані поля запиту
+def test_json_formatter():
+    record = logging.LogRecord("library_api", logging.INFO, __file__, 1, "Status: %s", (200,), None)
+    record.request_id = "abc"
+    record.route = "/api/books/{book_id}"
+    record.duration_ms = 1.5
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Status: 200"
+    assert entry["request_id"] == "abc"
+    assert entry["route"] == "/api/books/{book_id}"
+    assert entry["duration_ms"] == 1.5
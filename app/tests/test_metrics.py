@@ -0,0 +1,14 @@
+# Метрики запитів і CRUD-операцій у форматі Prometheus
+def test_metrics_endpoint(client):
+    client.get("/api/books/999999")
+    client.get("/no/such/route")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/api/books/{book_id}",status="404"}' in body
+    assert 'route="unmatched"' in body
+    assert 'crud_operation_duration_seconds_count{crud="Book",operation="get_read"}' in body
+    assert "db_pool_checkout_wait_seconds_count" in body
+    assert "http_requests_in_progress" in body
@@ -0,0 +1,7 @@
+from app.db.database import get_engine
+from app.db.migrations import run_migrations
+
+
+# Схема вже на head: повторний запуск нічого не робить
+def test_run_migrations_at_head():
+    assert run_migrations(get_engine()) is False
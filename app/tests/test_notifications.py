@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlmodel import Session, select
+
+from app.config import get_settings
+from app.db.database import get_engine
+from app.models.notification import Notification
+from app.services.notification_service import NotificationWorker, enqueue_reminders
+
+
+class Inbox:
+    def __init__(self):
+        self.envelopes = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.envelopes.append(envelope)
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    inbox = Inbox()
+    controller = Controller(inbox, hostname="127.0.0.1", port=8025)
+    controller.start()
+    settings = get_settings()
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", 8025)
+    monkeypatch.setattr(settings, "NOTIFY_BATCH_SIZE", 2)
+    yield inbox
+    controller.stop()
+
+
+def create_loan(client, email, isbn, days_ago):
+    user_id = client.post("/api/users/", json={
+        "first_name": "Reminder", "last_name": "Reader", "email": email
+    }).json()["id"]
+    book_id = client.post("/api/books/", json={
+        "title": f"Reminder Book {isbn}", "publication_year": 2020, "isbn": isbn,
+        "quantity": 1, "author_ids": [], "category_ids": []
+    }).json()["id"]
+    borrowed = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    return client.post("/api/borrowed_books/", json={
+        "user_id": user_id, "book_id": book_id,
+        "borrowing_time": borrowed.isoformat(), "return_status": "not returned"
+    }).json()["id"]
+
+
+# Нагадування ставляться в чергу один раз і надсилаються через SMTP
+def test_reminders_sent(client, smtp_server):
+    overdue_loan = create_loan(client, "overdue.reader@example.com", "7778889990001", days_ago=20)
+    due_soon_loan = create_loan(client, "soon.reader@example.com", "7778889990002", days_ago=13)
+    create_loan(client, "fresh.reader@example.com", "7778889990003", days_ago=0)
+
+    assert enqueue_reminders() >= 2
+    # Повторний запуск не дублює повідомлення
+    assert enqueue_reminders() == 0
+
+    stats = asyncio.run(NotificationWorker().drain())
+    assert stats["sent"] >= 2
+
+    recipients = {rcpt for envelope in smtp_server.envelopes for rcpt in envelope.rcpt_tos}
+    assert {"overdue.reader@example.com", "soon.reader@example.com"} <= recipients
+    assert "fresh.reader@example.com" not in recipients
+
+    with Session(get_engine()) as db:
+        kinds = {
+            n.loan_id: n.kind
+            for n in db.exec(select(Notification).where(Notification.loan_id.in_([overdue_loan, due_soon_loan])))
+        }
+    assert kinds == {overdue_loan: "overdue", due_soon_loan: "due_soon"}
+
+    queue = client.get("/internal/notifications").json()["queue"]
+    assert queue["ready"] == 0
+
+
+# Якщо SMTP недоступний, повідомлення лишається в черзі з відкладеною спробою
+def test_reminder_retried_when_smtp_down(client, monkeypatch):
+    loan_id = create_loan(client, "retry.reader@example.com", "7778889990004", days_ago=20)
+    settings = get_settings()
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", 8026)
+
+    enqueue_reminders()
+    stats = asyncio.run(NotificationWorker().drain())
+    assert stats["sent"] == 0 and stats["retrying"] >= 1
+
+    with Session(get_engine()) as db:
+        notification = db.exec(select(Notification).where(Notification.loan_id == loan_id)).one()
+    assert notification.status == "pending"
+    assert notification.attempts == 1
+    assert notification.last_error.startswith("SMTP connection failed")
+    assert notification.next_attempt_at > datetime.now(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,53 @@
+from sqlalchemy import create_engine, text
+
+from app.db.query_stats import instrument_engine, track_queries
+
+
+# Повторювані запити рахуються за текстом, без параметрів
+def test_track_queries_counts_repeats():
+    engine = instrument_engine(create_engine("sqlite://"))
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with track_queries() as stats:
+            for i in range(4):
+                conn.execute(text("SELECT :n"), {"n": i})
+            conn.execute(text("SELECT 2"))
+        conn.execute(text("SELECT 3"))
+
+    assert stats.count == 5
+    assert stats.seconds >= 0
+    assert stats.repeated(3) == [("SELECT ?", 4)]
+    assert stats.repeated(4) == []
+    assert stats.repeated(0) == []
+
+
+# Бюджет запитів на ендпоінт видно в заголовках
+def test_endpoint_query_budgets(client, query_budget):
+    author_id = client.post("/api/authors/", json={"first_name": "Budget", "second_name": "Author"}).json()["id"]
+    spare_id = client.post("/api/authors/", json={"first_name": "Budget", "second_name": "Spare"}).json()["id"]
+    category_id = client.post("/api/categories/", json={"category_name": "Budget Genre"}).json()["id"]
+    book_ids = [
+        client.post("/api/books/", json={
+            "title": f"Budget Book {i}",
+            "publication_year": 2001,
+            "isbn": f"77700031{i}",
+            "quantity": 1,
+            "author_ids": [author_id],
+            "category_ids": [category_id]
+        }).json()["id"]
+        for i in range(5)
+    ]
+
+    response = client.get(f"/api/books/{book_ids[0]}")
+    assert response.status_code == 200
+    query_budget(response, 1)
+    assert float(response.headers["X-DB-Time"]) >= 0
+
+    query_budget(client.get("/api/books/", params={"category_id": category_id, "include": "authors,categories"}), 3)
+    # Перевірка наявності книг — один LIMIT 1, без завантаження author.books
+    query_budget(client.delete(f"/api/authors/{author_id}"), 2)
+    query_budget(client.delete(f"/api/authors/{spare_id}"), 3)
+    # Зв'язки видаляються одним запитом на таблицю, не по рядку
+    query_budget(client.delete(f"/api/books/{book_ids[0]}"), 4)
+    query_budget(client.delete(f"/api/categories/{category_id}"), 3)
+    assert client.get(f"/api/books/{book_ids[1]}", params={"include": "categories"}).json()["categories"] == []
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+from starlette.datastructures import Headers
+
+from app.db.database import get_engine
+from app.db.routing import PIN_COOKIE, PIN_HEADER, ReplicaSet, pinned_until, set_replica_set
+
+
+@pytest.fixture
+def replicas():
+    # Та сама тестова БД під другою URL-адресою та репліка, що не відповідає
+    url = get_engine().url.render_as_string(hide_password=False)
+    down = get_engine().url.set(host="127.0.0.1", port=1).render_as_string(hide_password=False)
+    replica_set = ReplicaSet([url, down], retry_seconds=60)
+    set_replica_set(replica_set)
+    yield replica_set
+    set_replica_set(None)
+
+
+def replica_checkouts(client):
+    stats = client.get("/internal/pool").json()["replicas"]["replica1"]
+    # Рушій репліки створюється лише під час першого читання
+    pool = stats.get("async") or stats.get("sync")
+    return pool["checkouts"] if pool else 0
+
+
+# Читання йде на репліку, недоступна репліка пропускається
+def test_reads_use_replica_with_failover(client, replicas):
+    for _ in range(4):
+        assert client.get("/api/books/").status_code == 200
+    stats = client.get("/internal/pool").json()["replicas"]
+    assert stats["replica2"]["healthy"] is False
+    assert replica_checkouts(client) >= 3
+
+
+# Після запису читання клієнта закріплені за основною БД
+def test_read_your_writes(client, replicas):
+    client.get("/api/authors/")
+    response = client.post("/api/authors/", json={"first_name": "Marko", "second_name": "Vovchok"})
+    assert response.status_code == 201
+    assert PIN_HEADER in response.headers
+    assert PIN_COOKIE in client.cookies
+
+    before = replica_checkouts(client)
+    assert client.get(f"/api/authors/{response.json()['id']}").status_code == 200
+    assert replica_checkouts(client) == before
+
+
+# Експорт NDJSON читає з репліки, а після запису — з основної БД
+def test_export_uses_replica(client, replicas):
+    client.post("/api/authors/", json={"first_name": "Hryhorii", "second_name": "Skovoroda"})
+    client.cookies.clear()
+    for path in ("/api/export/books.ndjson", "/api/export/loans.ndjson"):
+        before = replica_checkouts(client)
+        assert client.get(path).status_code == 200
+        assert replica_checkouts(client) == before + 1
+
+    client.post("/api/authors/", json={"first_name": "Taras", "second_name": "Shevchenko"})
+    before = replica_checkouts(client)
+    assert client.get("/api/export/books.ndjson").status_code == 200
+    assert replica_checkouts(client) == before
+
+
+def test_pin_validation():
+    now = time.time()
+    assert pinned_until(Headers({PIN_HEADER: str(now + 2)}), now, 5) == now + 2
+    assert pinned_until(Headers({"cookie": f"{PIN_COOKIE}={now + 2}"}), now, 5) == now + 2
+    # Прострочені, завеликі й зіпсовані значення ігноруються
+    assert pinned_until(Headers({PIN_HEADER: str(now - 1)}), now, 5) == 0
+    assert pinned_until(Headers({PIN_HEADER: str(now + 3600)}), now, 5) == 0
+    assert pinned_until(Headers({PIN_HEADER: "soon"}), now, 5) == 0
@@ -0,0 +1,47 @@
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.models.book_expanded import BookReadExpanded
+from app.utils.responses import accepted_encodings
+
+
+def create_books(client, count):
+    author = client.post("/api/authors/", json={"first_name": "Panteleimon", "second_name": "Kulish"}).json()
+    for i in range(count):
+        client.post("/api/books/", json={
+            "title": f"Wire book {i}",
+            "publication_year": 1857,
+            "isbn": f"88000000{i:05d}",
+            "quantity": 1,
+            "author_ids": [author["id"]],
+            "category_ids": []
+        })
+
+
+# Список без повторної валідації дає те саме тіло, що й response_model
+def test_list_body_matches_response_model(client):
+    create_books(client, 3)
+    adapter = TypeAdapter(List[BookReadExpanded])
+    for params in [{"title": "Wire book"}, {"title": "Wire book", "include": "authors"}]:
+        body = client.get("/api/books/", params=params).content
+        assert adapter.dump_json(adapter.validate_json(body), exclude_unset=True) == body
+
+
+# Великі відповіді стискаються gzip, малі — ні
+def test_gzip_negotiation(client):
+    create_books(client, 20)
+    response = client.get("/api/books/", params={"title": "Wire book"}, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()) >= 20
+
+    response = client.get("/api/books/", params={"title": "Wire book"}, headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in response.headers
+
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, br;q=0.5, deflate;q=0") == {"gzip", "br"}
@@ -0,0 +1,35 @@
+from collections import Counter
+from datetime import datetime
+
+from app.db.seed import PRESETS, OPEN_STATUS, SyntheticDataset, apportion
+
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+
+def rows(dataset):
+    return {table: list(generated) for table, _, generated in dataset.tables()}
+
+
+# Той самий seed дає ті самі рядки, інший — інші
+def test_seed_is_deterministic():
+    first = rows(SyntheticDataset(PRESETS["10k"], seed=7, now=NOW))
+    assert first == rows(SyntheticDataset(PRESETS["10k"], seed=7, now=NOW))
+    assert first["borrowedbook"] != rows(SyntheticDataset(PRESETS["10k"], seed=8, now=NOW))["borrowedbook"]
+
+
+# Відкриті позики не перевищують кількість примірників і ліміт читача
+def test_open_loans_respect_limits():
+    dataset = SyntheticDataset(PRESETS["10k"], seed=1, now=NOW, first_ids={"book": 101}, max_open_per_user=5)
+    loans = list(dataset.loans())
+    assert len(loans) == PRESETS["10k"]["loans"]
+    assert [loan[1] for loan in loans] == sorted(loan[1] for loan in loans)
+
+    open_loans = [loan for loan in loans if loan[2] == OPEN_STATUS]
+    by_book = Counter(loan[6] for loan in open_loans)
+    assert all(count <= dataset.quantities[book_id - 101] for book_id, count in by_book.items())
+    assert max(Counter(loan[5] for loan in open_loans).values()) <= 5
+
+
+def test_apportion():
+    assert apportion(10, [1, 1, 1]) == [4, 3, 3]
+    assert sum(apportion(1_000_003, [0.5, 1.3, 0.7])) == 1_000_003
@@ -0,0 +1,35 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+PROBE = """
+import json, logging, sys, time
+start = time.perf_counter()
+import app.main
+seconds = time.perf_counter() - start
+from app.db.database import get_engine
+print(json.dumps({
+    "seconds": seconds,
+    "engines": get_engine.cache_info().currsize,
+    "handlers": len(logging.getLogger().handlers) + len(logging.getLogger("library_api").handlers),
+    "deferred": [m for m in ("alembic", "smtplib") if m in sys.modules],
+}))
+"""
+
+
+# Імпорт застосунку вкладається в бюджет і нічого не ініціалізує
+def test_import_budget():
+    budget = float(os.getenv("STARTUP_IMPORT_BUDGET_SECONDS", "1.5"))
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", PROBE],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    assert probe["seconds"] < budget
+    assert probe["engines"] == 0
+    assert probe["handlers"] == 0
+    assert probe["deferred"] == []
@@ -1,4 +1,6 @@
 import pytest
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
 
 # Створення користувача
 def test_create_user(client):
@@ -60,4 +62,34 @@ def test_delete_user(client):
     assert delete_response.status_code == 200
 
     get_response = client.get(f"/api/users/{user_id}")
-    assert get_response.status_code == 404
\ No newline at end of file
+    assert get_response.status_code == 404
+# Штрафи за прострочені позики рахуються пакетно
+def test_user_fines(client):
+    from app.services.fine_service import recompute_fines
+
+    user_id = client.post("/api/users/", json={
+        "first_name": "Late", "last_name": "Reader", "email": "late.reader@example.com"
+    }).json()["id"]
+    book_id = client.post("/api/books/", json={
+        "title": "Overdue Book", "publication_year": 2020, "isbn": "5556667778881",
+        "quantity": 2, "author_ids": [], "category_ids": []
+    }).json()["id"]
+    borrowed = datetime.now(timezone.utc)
+    loan_id = client.post("/api/borrowed_books/", json={
+        "user_id": user_id, "book_id": book_id,
+        "borrowing_time": borrowed.isoformat(), "return_status": "not returned"
+    }).json()["id"]
+
+    # 14 днів позики + 6 днів прострочки по 0.5
+    report = recompute_fines(borrowed.date() + timedelta(days=20))
+    assert not report.skipped
+    fines = client.get(f"/api/users/{user_id}/fines").json()
+    assert [fine["loan_id"] for fine in fines["fines"]] == [loan_id]
+    assert fines["fines"][0]["overdue_days"] == 6
+    assert Decimal(fines["total_amount"]) == Decimal("3.00")
+
+    # Після повернення штраф зникає з наступним перерахунком
+    client.put(f"/api/borrowed_books/{loan_id}", json={"return_status": "returned"})
+    recompute_fines(borrowed.date() + timedelta(days=20))
+    assert client.get(f"/api/users/{user_id}/fines").json()["fines"] == []
+    assert client.get("/api/users/999999/fines").status_code == 404
@@ -0,0 +1,38 @@
+import hashlib
+import math
+import threading
+from typing import Iterable
+
+
+class BloomFilter:
+    """Probabilistic set: no false negatives, false positives at roughly `error_rate`."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, item: str) -> list[int]:
+        # Double hashing over a single 128-bit digest (Kirsch-Mitzenmacher)
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str) -> None:
+        positions = self._positions(item)
+        with self._lock:
+            for pos in positions:
+                self._bits[pos >> 3] |= 1 << (pos & 7)
+            self.count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
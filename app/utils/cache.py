@@ -0,0 +1,123 @@
+# app/utils/cache.py
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.config import get_settings
+
+
+class CacheBackend(ABC):
+    """Interface for the entity cache; swap in a shared backend with `set_cache`."""
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, *, token: Optional[int] = None) -> None:
+        """Store `value`, unless something was invalidated since `token()` returned `token`."""
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        ...
+
+    @abstractmethod
+    def token(self) -> int:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+
+class LRUCache(CacheBackend):
+    """In-process LRU with a per-entry TTL.
+
+    Each worker has its own copy, so writes served by another worker are only
+    seen once the entry expires; keep the TTL short.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every delete; a load that raced with one is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, *, token: Optional[int] = None) -> None:
+        with self._lock:
+            if token is not None and token != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def token(self) -> int:
+        return self._generation
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self).__name__,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+_cache: Optional[CacheBackend] = None
+
+
+def get_cache() -> Optional[CacheBackend]:
+    """The process-wide entity cache, or None when CACHE_ENABLED is off."""
+    global _cache
+    settings = get_settings()
+    if not settings.CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = LRUCache(max_entries=settings.CACHE_MAX_ENTRIES, ttl=settings.CACHE_TTL_SECONDS)
+    return _cache
+
+
+def set_cache(backend: Optional[CacheBackend]) -> None:
+    global _cache
+    _cache = backend
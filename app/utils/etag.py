@@ -0,0 +1,115 @@
+# app/utils/etag.py
+# Weak ETag / Last-Modified validators and conditional GET evaluation.
+#
+# A body is described by the (id, updated_at) of the rows it is built from,
+# whether another page follows, and for expanded relations the link count
+# and newest updated_at of the related rows. The same description can be
+# read with a narrow query before anything is loaded (so a match is a 304
+# without touching the full rows), or taken from the data about to be sent.
+#
+# Collections get no Last-Modified: when a row leaves a page and an older
+# one takes its place, the newest updated_at stays the same and
+# If-Modified-Since would answer 304 for a changed list. Their ETag covers
+# the page's ids, so it stays the only validator.
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Collection, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+RowVersion = Tuple[int, Any]
+RelationVersion = Tuple[int, Any]
+
+
+def as_utc(value: Any) -> datetime:
+    """Naive UTC datetime from a stored timestamp or its JSON form."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def validators(
+        rows: Iterable[RowVersion],
+        *,
+        has_more: bool = False,
+        relations: Optional[Dict[str, RelationVersion]] = None,
+        collection: bool = False
+) -> Tuple[str, Optional[datetime]]:
+    """Weak ETag and Last-Modified for a body built from `rows`; lists get no Last-Modified."""
+    ids: List[int] = []
+    stamps: List[datetime] = []
+    for id, stamp in rows:
+        ids.append(id)
+        stamps.append(as_utc(stamp))
+    parts: List[Any] = [ids, has_more]
+    for name in sorted(relations or {}):
+        count, stamp = relations[name]
+        if stamp is not None:
+            stamp = as_utc(stamp)
+            stamps.append(stamp)
+        parts.append((name, count, stamp.isoformat() if stamp else None))
+    last_modified = max(stamps, default=None)
+    parts.append(last_modified.isoformat() if last_modified else None)
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"', None if collection else last_modified
+
+
+def _field(item: Any, name: str) -> Any:
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+def versions_of(items: Iterable[Any]) -> List[RowVersion]:
+    """(id, updated_at) of serialized rows or ORM objects."""
+    return [(_field(item, "id"), _field(item, "updated_at")) for item in items]
+
+
+def relation_versions_of(items: Iterable[Any], include: Collection[str]) -> Dict[str, RelationVersion]:
+    """Per expanded relation: total related rows and their newest updated_at."""
+    items = list(items)
+    versions = {}
+    for name in include:
+        related = [entry for item in items for entry in _field(item, name)]
+        versions[name] = (len(related), max((as_utc(_field(entry, "updated_at")) for entry in related), default=None))
+    return versions
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    # If-None-Match wins when both are sent; weak comparison, as GET allows
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have whole seconds
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def _headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime]) -> None:
+    response.headers.update(_headers(etag, last_modified))
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime]) -> Response:
+    return Response(status_code=304, headers=_headers(etag, last_modified))
@@ -1,53 +1,113 @@
+import atexit
+import json
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
 from app.config import get_settings
 
-settings = get_settings()
+LOGGER_NAME = "library_api"
 
+# Set by the request middleware; stamped on every record logged while serving it
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
 
-def setup_logging(log_level_str="INFO"):
-    log_level = getattr(logging, log_level_str.upper(), logging.INFO)
+# Structured fields passed through `extra=` and emitted by JsonFormatter
+EXTRA_FIELDS = ("request_id", "method", "route", "path", "status", "duration_ms", "db_queries", "db_time_ms")
 
-    # Create logs directory if it doesn't exist
-    log_dir = os.environ.get("LOG_DIR", "logs")
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+_listener: Optional[QueueListener] = None
 
-    # Configure logger
-    logger = logging.getLogger("library_api")
 
-    # Clear any existing handlers to prevent duplicates on reloads
-    if logger.handlers:
-        logger.handlers = []
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        return True
 
-    logger.setLevel(log_level)
-    logger.propagate = False  # Prevent duplicate logs
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(log_level_str: Optional[str] = None) -> logging.Logger:
+    """Configure the `library_api` logger once per process and return it.
+
+    Records are put on an in-memory queue by the calling thread; a single
+    QueueListener thread formats them and does the console/file I/O.
+    """
+    global _listener
+    logger = logging.getLogger(LOGGER_NAME)
+    if _listener is not None:
+        return logger
+
+    settings = get_settings()
+    log_level = getattr(logging, (log_level_str or settings.LOG_LEVEL).upper(), logging.INFO)
+
+    # Create logs directory if it doesn't exist
+    log_dir = os.environ.get("LOG_DIR", settings.LOG_DIR)
+    os.makedirs(log_dir, exist_ok=True)
+
+    if settings.LOG_JSON:
+        console_formatter = file_formatter = JsonFormatter()
+    else:
+        console_formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        file_formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
+        )
 
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(log_level)
-    console_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
     console_handler.setFormatter(console_formatter)
 
     # File handler
-    log_file_path = os.path.join(log_dir, "app.log")
     file_handler = RotatingFileHandler(
-        log_file_path,
+        os.path.join(log_dir, "app.log"),
         maxBytes=10485760,  # 10MB
         backupCount=10
     )
-    file_handler.setLevel(log_level)
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
-    )
     file_handler.setFormatter(file_formatter)
 
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = QueueHandler(records)
+    queue_handler.addFilter(RequestIdFilter())
+
+    # Clear any existing handlers to prevent duplicates on reloads
+    logger.handlers = [queue_handler]
+    logger.setLevel(log_level)
+    logger.propagate = False  # Prevent duplicate logs
+
+    _listener = QueueListener(records, console_handler, file_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return logger
+
 
-    return logger
\ No newline at end of file
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
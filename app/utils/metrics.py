@@ -0,0 +1,83 @@
+# app/utils/metrics.py
+# Prometheus metrics for requests, CRUD operations and the DB pools.
+#
+# With several worker processes, set PROMETHEUS_MULTIPROC_DIR to an empty
+# directory shared by all of them (and cleared before they start): every
+# process then writes its samples to mmap'ed files there and /metrics
+# aggregates them, whichever worker serves the scrape.
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+# Requests that matched no route share one label value, so scanners probing
+# random paths cannot blow up the series count
+UNMATCHED_ROUTE = "unmatched"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled", ["method", "route", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+IN_FLIGHT = Gauge(
+    "http_requests_in_progress", "HTTP requests being served", multiprocess_mode="livesum"
+)
+CRUD_LATENCY = Histogram(
+    "crud_operation_duration_seconds", "CRUD operation latency, including the wait for a worker thread",
+    ["crud", "operation"], buckets=LATENCY_BUCKETS
+)
+POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection", ["pool"],
+    buckets=POOL_WAIT_BUCKETS
+)
+POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total", "Pool checkouts that gave up after DB_POOL_TIMEOUT", ["pool"]
+)
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "DB connections currently checked out", ["pool"], multiprocess_mode="livesum"
+)
+
+
+# (method, route, status) -> bound children; skips labels() validation and
+# its lock on the hot path. A lost race just binds the same children twice.
+_request_children: Dict[Tuple[str, Optional[str], int], Tuple[Any, Any]] = {}
+
+
+def observe_request(method: str, route: Optional[str], status: int, duration: float) -> None:
+    key = (method, route, status)
+    children = _request_children.get(key)
+    if children is None:
+        labels = (method, route or UNMATCHED_ROUTE, str(status))
+        children = _request_children[key] = (REQUESTS.labels(*labels), REQUEST_LATENCY.labels(*labels))
+    children[0].inc()
+    children[1].observe(duration)
+
+
+def render() -> bytes:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop a dead worker's live gauges; call from the process manager's child-exit hook."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid)
+
@@ -0,0 +1,101 @@
+# app/utils/request_log.py
+# Per-request id, SQL statistics, metrics and access logging.
+import logging
+import random
+import time
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+from app.db.query_stats import QueryStats, query_stats_var
+from app.utils.logger import LOGGER_NAME, request_id_var
+from app.utils.metrics import IN_FLIGHT, observe_request
+from app.utils.routes import route_template
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class RequestLogMiddleware:
+    """Tag each request with an id, count its queries, record metrics and log it.
+
+    Pure ASGI, so streamed bodies pass through untouched and the request's
+    context variables stay visible to the endpoint. Settings are read per
+    request: DB_QUERY_HEADERS may be switched at runtime.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        request_id = Headers(scope=scope).get("x-request-id") or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        queries = QueryStats()
+        queries_token = query_stats_var.set(queries)
+        status_code = 500
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                if settings.DB_QUERY_HEADERS:
+                    # Streamed bodies query after this point, so only the handler's part is counted
+                    headers["X-DB-Queries"] = str(queries.count)
+                    headers["X-DB-Time"] = f"{queries.seconds * 1000:.3f}"
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            IN_FLIGHT.dec()
+            duration = time.perf_counter() - start_time
+            try:
+                self.record(scope, settings, request_id, status_code, duration, queries)
+            finally:
+                query_stats_var.reset(queries_token)
+                request_id_var.reset(token)
+
+    def record(
+            self, scope: Scope, settings, request_id: str, status_code: int, duration: float, queries: QueryStats
+    ) -> None:
+        method = scope["method"]
+        route = route_template(scope)
+        observe_request(method, route, status_code, duration)
+        for statement, count in queries.repeated(settings.DB_REPEATED_QUERY_THRESHOLD):
+            logger.warning(
+                "Possible N+1: statement ran %d times in %s %s: %s", count, method, route, statement,
+                extra={"request_id": request_id, "route": route}
+            )
+
+        duration_ms = duration * 1000
+        if (
+                status_code < 400
+                and duration_ms < settings.LOG_SLOW_REQUEST_MS
+                and random.random() >= settings.LOG_SAMPLE_RATE
+        ):
+            return
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Path: %s | Method: %s | Status: %s | Duration: %.4fs",
+                scope["path"], method, status_code, duration,
+                extra={
+                    "request_id": request_id,
+                    "method": method,
+                    "route": route,
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round(duration_ms, 3),
+                    "db_queries": queries.count,
+                    "db_time_ms": round(queries.seconds * 1000, 3),
+                }
+            )
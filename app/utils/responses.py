@@ -0,0 +1,138 @@
+# app/utils/responses.py
+# JSON rendering for the API and negotiated br/gzip compression.
+from typing import Any, Optional, Set
+
+import anyio.to_thread
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import get_settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z if orjson is not None else 0
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, unless JSON_ENCODER=json or it is not installed."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None or get_settings().JSON_ENCODER != "orjson":
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content, default=jsonable_encoder, option=_ORJSON_OPTIONS)
+
+
+def render_rows(content: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """Send rows that are already in their read-model shape as they are.
+
+    FastAPI would otherwise validate every row against the response_model a
+    second time before encoding it. Headers set on the endpoint's `response`
+    are carried over.
+    """
+    rendered = FastJSONResponse(content)
+    if response is not None:
+        rendered.raw_headers.extend(response.raw_headers)
+    return rendered
+
+
+def accepted_encodings(accept_encoding: str) -> Set[str]:
+    """Codings the client accepts, ignoring those with q=0."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip())
+    return accepted
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int, *, thread_minimum_size: int, **kwargs):
+        super().__init__(app, minimum_size, **kwargs)
+        self.quality = quality
+        self.thread_minimum_size = thread_minimum_size
+        self.compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if len(body) >= self.thread_minimum_size:
+            # Same as gzip: large chunks would block the event loop
+            return await anyio.to_thread.run_sync(self._compress_body, body, more_body)
+        return self._compress_body(body, more_body)
+
+    def _compress_body(self, body: bytes, more_body: bool) -> bytes:
+        if self.compressor is None:
+            self.compressor = brotli.Compressor(quality=self.quality)
+        if more_body:
+            return self.compressor.process(body) + self.compressor.flush()
+        return self.compressor.process(body) + self.compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZipMiddleware that prefers br when the client and the install allow it.
+
+    Settings are read on the first request, so adding the middleware does not
+    load them at import time.
+    """
+
+    def __init__(self, app: ASGIApp):
+        super().__init__(app)
+        self.configured = False
+
+    def configure(self) -> None:
+        settings = get_settings()
+        self.enabled = settings.COMPRESSION_ENABLED
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE
+        self.compresslevel = settings.COMPRESSION_GZIP_LEVEL
+        self.brotli_quality = settings.COMPRESSION_BROTLI_QUALITY
+        self.configured = True
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if not self.configured:
+            self.configure()
+        if not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            responder = BrotliResponder(
+                self.app,
+                self.minimum_size,
+                self.brotli_quality,
+                thread_minimum_size=self.thread_minimum_size,
+                exclude_content_types=self.exclude_content_types,
+            )
+        elif "gzip" in accepted:
+            responder = GZipResponder(
+                self.app,
+                self.minimum_size,
+                compresslevel=self.compresslevel,
+                thread_minimum_size=self.thread_minimum_size,
+                exclude_content_types=self.exclude_content_types,
+            )
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size, exclude_content_types=self.exclude_content_types)
+        await responder(scope, receive, send)
@@ -0,0 +1,17 @@
+# app/utils/routes.py
+from typing import Optional
+
+from starlette.types import Scope
+
+
+def route_template(scope: Scope) -> Optional[str]:
+    """The matched route's full path template, e.g. /api/books/{book_id}.
+
+    Recent FastAPI keeps included routers nested, so `scope["route"].path`
+    lacks the router prefix; the effective route context carries the full one.
+    """
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(context, "path", None)
+    if path:
+        return path
+    return getattr(scope.get("route"), "path", None)
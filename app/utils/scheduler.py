@@ -0,0 +1,24 @@
+# app/utils/scheduler.py
+import asyncio
+import logging
+from typing import Callable
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger("library_api")
+
+
+async def run_periodically(name: str, interval: float, job: Callable[[], object]) -> None:
+    """Run the sync `job` now and then every `interval` seconds until cancelled.
+
+    A failing run is logged and retried on the next tick.
+    """
+    while True:
+        try:
+            result = await run_in_threadpool(job)
+            logger.info(f"Scheduled job {name} finished: {result}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Scheduled job {name} failed: {e}")
+        await asyncio.sleep(interval)
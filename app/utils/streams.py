@@ -0,0 +1,39 @@
+# app/utils/streams.py
+import io
+from typing import AsyncIterator, Optional
+
+from anyio import from_thread
+
+
+class AsyncStreamReader(io.RawIOBase):
+    """Blocking file-like view of an async byte stream.
+
+    Must be read from a worker thread started by anyio (run_in_threadpool),
+    so request bodies can be parsed incrementally by sync code.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+        self._done = False
+
+    async def _next_chunk(self) -> Optional[bytes]:
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer and not self._done:
+            chunk = from_thread.run(self._next_chunk)
+            if chunk is None:
+                self._done = True
+            else:
+                self._buffer = chunk
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
@@ -0,0 +1,340 @@
+"""End-to-end REST API throughput and latency.
+
+Seeds a catalog (--books, --authors, --categories) and loan history
+(--loans, --users), then drives the real app with --concurrency async
+clients through four scenarios:
+
+    browse         book pages, single books with and without relations,
+                   author and category listings
+    search         substring, fuzzy and full-text title search
+    borrow_return  borrow a copy and return it again
+    stats          popularity rankings, a reader's loans and fines
+
+Each scenario runs over two transports: "inprocess" calls the ASGI app
+directly through httpx (no network, no server), "socket" starts uvicorn
+in a subprocess and talks HTTP over a local TCP port. Throughput and
+p50/p95/p99 per endpoint are printed as JSON.
+
+--save-baseline stores the report; --baseline compares a run against a
+stored one and exits non-zero when a scenario's throughput drops, or an
+endpoint's p95 grows, by more than --tolerance.
+
+    DATABASE_URL=... python -m benchmarks.bench_api --books 100000 --loans 500000
+    DATABASE_URL=... python -m benchmarks.bench_api --save-baseline /tmp/api.json
+    DATABASE_URL=... python -m benchmarks.bench_api --baseline /tmp/api.json --tolerance 0.25
+
+Request logging is turned down to warnings unless LOG_LEVEL is set, so the
+report stays machine-readable.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+
+import httpx
+from sqlalchemy import text
+
+from benchmarks.common import WORDS, percentiles, report, seed_catalog, seed_loans
+
+ROOT = Path(__file__).resolve().parents[1]
+TRANSPORTS = ("inprocess", "socket")
+
+
+class Recorder:
+    """Latency samples and error counts per endpoint label."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, client: httpx.AsyncClient, label: str, url: str, **kwargs) -> httpx.Response:
+        method, _ = label.split(" ", 1)
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.samples[label].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+
+Scenario = Callable[[Recorder, httpx.AsyncClient, Dict[str, Any], random.Random, int], Awaitable[None]]
+
+
+async def browse(rec, client, data, rng, worker):
+    book_id = rng.randint(*data["book_ids"])
+    step = rng.randrange(5)
+    if step == 0:
+        await rec.call(client, "GET /api/books/", "/api/books/", params={"limit": 50, "skip": rng.randrange(1000)})
+    elif step == 1:
+        await rec.call(client, "GET /api/books/{book_id}", f"/api/books/{book_id}")
+    elif step == 2:
+        await rec.call(
+            client, "GET /api/books/{book_id}?include", f"/api/books/{book_id}",
+            params={"include": "authors,categories"}
+        )
+    elif step == 3:
+        await rec.call(client, "GET /api/authors/", "/api/authors/", params={"limit": 50})
+    else:
+        await rec.call(client, "GET /api/categories/", "/api/categories/")
+
+
+async def search(rec, client, data, rng, worker):
+    word = rng.choice(WORDS)
+    step = rng.randrange(3)
+    if step == 0:
+        await rec.call(client, "GET /api/books/?title", "/api/books/", params={"title": word, "limit": 20})
+    elif step == 1:
+        # One dropped letter, as a typo
+        typo = word[:2] + word[3:]
+        await rec.call(
+            client, "GET /api/books/?match=fuzzy", "/api/books/",
+            params={"title": typo, "match": "fuzzy", "limit": 20}
+        )
+    else:
+        await rec.call(client, "GET /api/books/search/", "/api/books/search/", params={"q": word, "limit": 20})
+
+
+async def borrow_return(rec, client, data, rng, worker):
+    # One reader per client keeps every borrower under MAX_BORROWS_PER_USER
+    user_id = data["borrowers"][worker % len(data["borrowers"])]
+    response = await rec.call(client, "POST /api/borrowed_books/", "/api/borrowed_books/", json={
+        "user_id": user_id,
+        "book_id": data["stock_book_id"],
+        "borrowing_time": datetime.now(timezone.utc).isoformat(),
+        "return_status": "not returned",
+    })
+    if response.status_code == 201:
+        await rec.call(
+            client, "PUT /api/borrowed_books/{borrowed_book_id}", f"/api/borrowed_books/{response.json()['id']}",
+            json={"return_status": "returned"}
+        )
+
+
+async def stats(rec, client, data, rng, worker):
+    user_id = rng.choice(data["readers"])
+    step = rng.randrange(5)
+    if step == 0:
+        await rec.call(client, "GET /api/borrowed_books/most-popular-books", "/api/borrowed_books/most-popular-books")
+    elif step == 1:
+        await rec.call(
+            client, "GET /api/borrowed_books/most-popular-authors", "/api/borrowed_books/most-popular-authors"
+        )
+    elif step == 2:
+        await rec.call(
+            client, "GET /api/borrowed_books/most-popular-categories", "/api/borrowed_books/most-popular-categories"
+        )
+    elif step == 3:
+        await rec.call(client, "GET /api/borrowed_books/user/{user_id}", f"/api/borrowed_books/user/{user_id}")
+    else:
+        await rec.call(client, "GET /api/users/{user_id}/fines", f"/api/users/{user_id}/fines")
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "browse": browse,
+    "search": search,
+    "borrow_return": borrow_return,
+    "stats": stats,
+}
+
+
+def prepare_dataset(engine, args) -> Dict[str, Any]:
+    seed_catalog(engine, books=args.books, authors=args.authors, categories=args.categories)
+    seed_loans(engine, args.loans, users=args.users, books=args.books)
+    tag = f"{time.time_ns():x}"
+    with engine.begin() as conn:
+        low, high = conn.execute(text("SELECT min(id), max(id) FROM book")).one()
+        readers = conn.execute(
+            text("SELECT id FROM \"user\" WHERE email LIKE 'bench-reader-%' ORDER BY id LIMIT 1000")
+        ).scalars().all()
+        # A title with enough stock that borrows never run out
+        stock_book_id = conn.execute(
+            text("""
+                INSERT INTO book (title, publication_year, isbn, quantity, available, created_at, updated_at)
+                VALUES ('Bench stock ' || :tag, 2024, 'bench-stock-' || :tag, :copies, :copies, now(), now())
+                RETURNING id
+            """),
+            {"tag": tag, "copies": args.concurrency * 10},
+        ).scalar_one()
+        borrowers = conn.execute(
+            text("""
+                INSERT INTO "user" (first_name, last_name, email, registration_date, is_active)
+                SELECT 'Bench', 'Borrower ' || g, 'bench-borrower-' || :tag || '-' || g || '@example.com', now(), true
+                FROM generate_series(1, :clients) AS g
+                RETURNING id
+            """),
+            {"tag": tag, "clients": args.concurrency},
+        ).scalars().all()
+    return {
+        "book_ids": (low, high),
+        "readers": readers,
+        "stock_book_id": stock_book_id,
+        "borrowers": borrowers,
+    }
+
+
+async def run_scenario(
+        client: httpx.AsyncClient, scenario: Scenario, data: Dict[str, Any], *, iterations: int, concurrency: int,
+        seed: int
+) -> Dict[str, Any]:
+    rec = Recorder()
+    counter = itertools.count()
+
+    async def worker(index: int) -> None:
+        rng = random.Random(seed + index)
+        while next(counter) < iterations:
+            await scenario(rec, client, data, rng, index)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    seconds = time.perf_counter() - start
+    total = sum(len(samples) for samples in rec.samples.values())
+    return {
+        "requests": total,
+        "errors": sum(rec.errors.values()),
+        "seconds": round(seconds, 3),
+        "throughput_rps": round(total / seconds, 1),
+        "endpoints": {
+            label: {**percentiles(samples), "errors": rec.errors.get(label, 0)}
+            for label, samples in sorted(rec.samples.items())
+        },
+    }
+
+
+@asynccontextmanager
+async def inprocess_client(app) -> AsyncIterator[httpx.AsyncClient]:
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+
+
+@asynccontextmanager
+async def socket_client(*, port: int, workers: int, concurrency: int) -> AsyncIterator[httpx.AsyncClient]:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=os.environ.copy()
+    )
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                if server.poll() is not None:
+                    raise SystemExit(f"uvicorn exited with code {server.returncode}")
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    if time.monotonic() > deadline:
+                        raise SystemExit("uvicorn did not start within 60s")
+                    await asyncio.sleep(0.2)
+            yield client
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Scenarios and endpoints that got worse than the baseline by more than `tolerance`."""
+    regressions = []
+    for transport, scenarios in results["transports"].items():
+        for name, current in scenarios.items():
+            previous = baseline.get("transports", {}).get(transport, {}).get(name)
+            if not previous:
+                continue
+            if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+                regressions.append({
+                    "transport": transport, "scenario": name, "metric": "throughput_rps",
+                    "baseline": previous["throughput_rps"], "current": current["throughput_rps"],
+                })
+            for label, endpoint in current["endpoints"].items():
+                before = previous["endpoints"].get(label)
+                if before and endpoint["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                    regressions.append({
+                        "transport": transport, "scenario": name, "endpoint": label, "metric": "p95_ms",
+                        "baseline": before["p95_ms"], "current": endpoint["p95_ms"],
+                    })
+    return regressions
+
+
+async def run(app, data: Dict[str, Any], args) -> Dict[str, Dict[str, Any]]:
+    clients = {
+        "inprocess": lambda: inprocess_client(app),
+        "socket": lambda: socket_client(port=args.port, workers=args.server_workers, concurrency=args.concurrency),
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    for transport in args.transport:
+        async with clients[transport]() as client:
+            results[transport] = {}
+            for name in args.scenario:
+                scenario = SCENARIOS[name]
+                # Warm connections, caches and prepared plans before measuring
+                await run_scenario(
+                    client, scenario, data, iterations=args.warmup, concurrency=args.concurrency, seed=args.seed
+                )
+                results[transport][name] = await run_scenario(
+                    client, scenario, data, iterations=args.requests, concurrency=args.concurrency, seed=args.seed
+                )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--authors", type=int, default=5_000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--loans", type=int, default=500_000)
+    parser.add_argument("--requests", type=int, default=2_000, help="iterations per scenario")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenario", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--transport", nargs="+", choices=TRANSPORTS, default=list(TRANSPORTS))
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--server-workers", type=int, default=1)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    # Settings are read lazily, so this also reaches the uvicorn subprocess
+    os.environ.setdefault("LOG_LEVEL", "warning")
+    os.environ.setdefault("FINES_RECOMPUTE_INTERVAL_SECONDS", "0")
+
+    from app.db.database import get_engine
+    from app.main import app
+
+    data = prepare_dataset(get_engine(), args)
+    results = {
+        "dataset": {
+            "books": args.books, "authors": args.authors, "categories": args.categories,
+            "users": args.users, "loans": args.loans,
+        },
+        "concurrency": args.concurrency,
+        "transports": asyncio.run(run(app, data, args)),
+    }
+    regressions = []
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        results["regressions"] = regressions
+    report("api", results)
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2))
+    if regressions:
+        raise SystemExit(f"{len(regressions)} regression(s) against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
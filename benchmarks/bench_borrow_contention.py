@@ -0,0 +1,123 @@
+"""Many clients borrowing one hot title at once.
+
+Phase 1 races --clients threads for the last --copies copies and checks that
+exactly that many loans succeed. Phase 2 measures sustained loans/second on
+a title with enough stock for everyone.
+
+    DATABASE_URL=... python -m benchmarks.bench_borrow_contention --clients 50
+"""
+import argparse
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+import app.main  # noqa: F401  (registers every model with the mapper)
+from app.models.book import Book
+from app.models.borrowed_book import BorrowedBookCreate
+from app.models.user import User
+from app.services.book_service import book_service
+from app.utils.exceptions import LibraryException
+from benchmarks.common import bench_engine, report
+
+
+def create_fixture(engine, *, copies: int, users: int):
+    tag = uuid.uuid4().hex[:8]
+    with Session(engine) as db:
+        book = Book(
+            title=f"Hot title {tag}", publication_year=2024, isbn=f"hot-{tag}", quantity=copies, available=copies
+        )
+        people = [
+            User(first_name="Bench", last_name=str(i), email=f"bench-{tag}-{i}@example.com") for i in range(users)
+        ]
+        db.add(book)
+        db.add_all(people)
+        db.commit()
+        return book.id, [user.id for user in people]
+
+
+def run_clients(engine, book_id: int, user_ids, attempts_per_client: int):
+    outcomes = {"ok": 0, "rejected": 0, "errors": 0}
+    lock = threading.Lock()
+    start_gate = threading.Barrier(len(user_ids))
+
+    def client(user_id: int):
+        start_gate.wait()
+        for _ in range(attempts_per_client):
+            loan = BorrowedBookCreate(
+                user_id=user_id,
+                book_id=book_id,
+                borrowing_time=datetime.now(timezone.utc),
+                return_status="not returned"
+            )
+            with Session(engine) as db:
+                try:
+                    book_service.borrow(db, obj_in=loan)
+                    result = "ok"
+                except LibraryException:
+                    result = "rejected"
+                except Exception:
+                    result = "errors"
+            with lock:
+                outcomes[result] += 1
+
+    threads = [threading.Thread(target=client, args=(user_id,)) for user_id in user_ids]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes, time.perf_counter() - started
+
+
+def state(engine, book_id: int):
+    with engine.connect() as conn:
+        available = conn.execute(text("SELECT available FROM book WHERE id = :id"), {"id": book_id}).scalar_one()
+        loans = conn.execute(
+            text("SELECT count(*) FROM borrowedbook WHERE book_id = :id AND return_status <> 'returned'"),
+            {"id": book_id}
+        ).scalar_one()
+    return available, loans
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--copies", type=int, default=1)
+    # Stay within MAX_BORROWS_PER_USER, or the limit check rejects the rest
+    parser.add_argument("--loans-per-client", type=int, default=4)
+    args = parser.parse_args()
+
+    # Each client needs its own connection for the race to be real
+    engine = bench_engine(pool_size=args.clients, max_overflow=0)
+
+    book_id, user_ids = create_fixture(engine, copies=args.copies, users=args.clients)
+    race, race_seconds = run_clients(engine, book_id, user_ids, 1)
+    available, loans = state(engine, book_id)
+    race_correct = race["ok"] == args.copies and loans == args.copies and available == 0
+
+    stock = args.clients * args.loans_per_client
+    book_id, user_ids = create_fixture(engine, copies=stock, users=args.clients)
+    load, load_seconds = run_clients(engine, book_id, user_ids, args.loans_per_client)
+    available, loans = state(engine, book_id)
+    load_correct = load["ok"] == loans == stock - available
+
+    report("borrow_contention", {
+        "clients": args.clients,
+        "race": {**race, "copies": args.copies, "correct": race_correct, "seconds": round(race_seconds, 3)},
+        "throughput": {
+            **load,
+            "correct": load_correct,
+            "seconds": round(load_seconds, 3),
+            "loans_per_second": round(load["ok"] / load_seconds, 1),
+        },
+    })
+    if not (race_correct and load_correct):
+        raise SystemExit("inventory invariant violated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Full overdue-fine recompute over a large loan history (target: seconds at 5M loans).
+
+Seeds --loans synthetic loans spread over the last 60 days (70% returned),
+then times a cold recompute into an empty fine table, a rerun on the same
+day (nothing changes) and a run for the next day (every fine changes).
+
+    DATABASE_URL=... python -m benchmarks.bench_fines --loans 5000000
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+import app.main  # noqa: F401  (registers every model with the mapper)
+from app.services.fine_service import fine_service
+from benchmarks.common import bench_engine, report, seed_loans
+
+
+def timed_recompute(engine, today):
+    with Session(engine) as db:
+        result = fine_service.recompute(db, today=today)
+    return {"updated": result.updated, "cleared": result.cleared, "seconds": result.seconds}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loans", type=int, default=5_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--books", type=int, default=20_000)
+    args = parser.parse_args()
+
+    engine = bench_engine()
+    loans = seed_loans(engine, args.loans, users=args.users, books=args.books)
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE fine"))
+        open_loans = conn.execute(
+            text("SELECT count(*) FROM borrowedbook WHERE return_status <> 'returned'")
+        ).scalar_one()
+
+    today = datetime.now(timezone.utc).date()
+    report("fines_recompute", {
+        "loans": loans,
+        "open_loans": open_loans,
+        "cold": timed_recompute(engine, today),
+        "same_day": timed_recompute(engine, today),
+        "next_day": timed_recompute(engine, today + timedelta(days=1)),
+    })
+
+
+if __name__ == "__main__":
+    main()
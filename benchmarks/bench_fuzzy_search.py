@@ -0,0 +1,46 @@
+"""Fuzzy (pg_trgm) title search vs. the substring ilike path.
+
+    DATABASE_URL=... python -m benchmarks.bench_fuzzy_search --books 1000000
+"""
+import argparse
+import random
+
+from sqlmodel import Session
+
+import app.main  # noqa: F401  (registers every model with the mapper)
+from app.crud.books import crud_books
+from app.services.search_service import search_service
+from benchmarks.common import WORDS, bench_engine, measure, percentiles, report, seed_books
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1:] if rng.random() < 0.5 else word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = bench_engine()
+    total = seed_books(engine, args.books)
+    rng = random.Random(args.seed)
+    terms = [f"{rng.choice(WORDS)} {rng.choice(WORDS)}" for _ in range(args.queries)]
+    typos = [" ".join(misspell(word, rng) for word in term.split()) for term in terms]
+
+    with Session(engine) as db:
+        ilike = measure(lambda: crud_books.search_books(db, title=terms.pop(), limit=20), args.queries)
+        fuzzy = measure(lambda: search_service.fuzzy_search(db, query=typos.pop(), limit=20), args.queries)
+
+    report("fuzzy_search", {
+        "books": total,
+        "ilike_substring": percentiles(ilike),
+        "trigram_fuzzy": percentiles(fuzzy),
+    })
+
+
+if __name__ == "__main__":
+    main()
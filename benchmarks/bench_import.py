@@ -0,0 +1,54 @@
+"""Bulk COPY import throughput (target: 50k books/minute).
+
+    DATABASE_URL=... python -m benchmarks.bench_import --books 200000
+"""
+import argparse
+import io
+import time
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+import app.main  # noqa: F401  (registers every model with the mapper)
+from app.services.import_service import import_service
+from benchmarks.common import WORDS, bench_engine, report
+
+
+def generate_csv(count: int, prefix: str) -> io.StringIO:
+    buffer = io.StringIO()
+    buffer.write("title,publication_year,isbn,quantity,author_ids,category_ids\n")
+    for i in range(count):
+        title = f"{WORDS[i % len(WORDS)]} {WORDS[(i * 7) % len(WORDS)]} {i}".title()
+        buffer.write(f"{title},{1900 + i % 125},{prefix}-{i},{1 + i % 5},,\n")
+    buffer.seek(0)
+    return buffer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--books", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int)
+    args = parser.parse_args()
+
+    engine = bench_engine()
+    prefix = f"import-{int(time.time())}"
+    stream = generate_csv(args.books, prefix)
+
+    with Session(engine) as db:
+        start = time.perf_counter()
+        result = import_service.import_books(db, stream, format="csv", batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+        db.exec(text("DELETE FROM book WHERE isbn LIKE :prefix").bindparams(prefix=f"{prefix}-%"))
+        db.commit()
+
+    report("bulk_import", {
+        "books": args.books,
+        "imported": result.imported,
+        "failed": result.failed,
+        "seconds": round(elapsed, 3),
+        "books_per_minute": round(result.imported / elapsed * 60),
+    })
+
+
+if __name__ == "__main__":
+    main()
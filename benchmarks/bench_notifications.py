@@ -0,0 +1,91 @@
+"""Reminder pipeline throughput against a local SMTP sink.
+
+Seeds --loans synthetic loans, times the single enqueue query, then drains
+the queue with the worker pool into an in-process aiosmtpd server and
+reports messages/second and the queue depth before and after. The workers
+use the app engine, so this runs against DATABASE_URL.
+
+    DATABASE_URL=... python -m benchmarks.bench_notifications --loans 200000 --workers 8
+"""
+import argparse
+import asyncio
+import time
+
+from aiosmtpd.controller import Controller
+from sqlalchemy import text
+from sqlmodel import Session
+
+import app.main  # noqa: F401  (registers every model with the mapper)
+from app.config import get_settings
+from app.db.database import get_engine
+from app.services.notification_service import NotificationWorker, enqueue_reminders, notification_service
+from benchmarks.common import report, seed_loans
+
+
+class Sink:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def queue_depth():
+    with Session(get_engine()) as db:
+        return notification_service.queue_depth(db)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loans", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--books", type=int, default=20_000)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--smtp-port", type=int, default=8025)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    settings.SMTP_HOST = "127.0.0.1"
+    settings.SMTP_PORT = args.smtp_port
+    if args.workers:
+        settings.NOTIFY_WORKERS = args.workers
+    if args.batch_size:
+        settings.NOTIFY_BATCH_SIZE = args.batch_size
+
+    engine = get_engine()
+    loans = seed_loans(engine, args.loans, users=args.users, books=args.books)
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE notification"))
+
+    start = time.perf_counter()
+    enqueued = enqueue_reminders()
+    enqueue_seconds = time.perf_counter() - start
+    before = queue_depth()
+
+    sink = Sink()
+    controller = Controller(sink, hostname="127.0.0.1", port=args.smtp_port)
+    controller.start()
+    try:
+        start = time.perf_counter()
+        stats = asyncio.run(NotificationWorker().drain())
+        drain_seconds = time.perf_counter() - start
+    finally:
+        controller.stop()
+
+    report("notifications", {
+        "loans": loans,
+        "enqueued": enqueued,
+        "enqueue_seconds": round(enqueue_seconds, 3),
+        "queue_before": before,
+        "queue_after": queue_depth(),
+        "worker": stats,
+        "received": sink.received,
+        "drain_seconds": round(drain_seconds, 3),
+        "messages_per_second": round(sink.received / drain_seconds, 1) if drain_seconds else 0.0,
+    })
+
+
+if __name__ == "__main__":
+    main()
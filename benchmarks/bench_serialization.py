@@ -0,0 +1,141 @@
+"""Serialization time and bytes on the wire for large book pages.
+
+Builds --rows in-memory Book objects (with one author and one category each
+when --include is given) and times, per pipeline, turning them into the
+response body:
+
+  validate   BookRead.model_validate per row, then FastAPI's response_model
+             validation and dump_json (the previous list path)
+  revalidate column projection, then response_model validation and dump_json
+  orjson     column projection rendered by FastJSONResponse (the list path)
+  json       the same with JSON_ENCODER=json
+
+Then reports the body size identity / gzip / br (br only with the brotli
+package) and the time each encoding takes. Needs no database.
+
+    python -m benchmarks.bench_serialization --rows 1000 10000 --include
+"""
+import argparse
+import gzip
+import os
+import statistics
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+# Settings are read for the encoder choice; nothing connects
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from pydantic import TypeAdapter  # noqa: E402
+
+import app.main  # noqa: E402,F401  (maps every model)
+from app.config import get_settings  # noqa: E402
+from app.crud.books import crud_books  # noqa: E402
+from app.models.author import Author  # noqa: E402
+from app.models.book import Book, BookRead  # noqa: E402
+from app.models.book_expanded import BookReadExpanded  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.utils.responses import FastJSONResponse, brotli  # noqa: E402
+from benchmarks.common import WORDS, measure, report  # noqa: E402
+
+
+def make_books(count: int, include: bool) -> List[Book]:
+    now = datetime(2026, 10, 18, 12, 0, 0)
+    authors = [Author(id=i, first_name="Bench", second_name=f"{WORDS[i % len(WORDS)]} {i}",
+                      created_at=now, updated_at=now) for i in range(1, 51)]
+    categories = [Category(id=i, category_name=f"Bench category {i}", created_at=now, updated_at=now)
+                  for i in range(1, 11)]
+    books = []
+    for i in range(1, count + 1):
+        book = Book(
+            id=i,
+            title=" ".join(WORDS[(i * k) % len(WORDS)] for k in (7, 13, 31)).title() + f" {i}",
+            publication_year=1900 + i % 125,
+            isbn=f"bench-{i}",
+            quantity=1 + i % 5,
+            available=i % 5,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now,
+        )
+        if include:
+            book.authors = [authors[i % len(authors)]]
+            book.categories = [categories[i % len(categories)]]
+        books.append(book)
+    return books
+
+
+def pipelines(books: List[Book], include: List[str]) -> Dict[str, Callable[[], bytes]]:
+    adapter = TypeAdapter(List[BookReadExpanded])
+    settings = get_settings()
+
+    def validated() -> list:
+        rows = []
+        for book in books:
+            data = BookRead.model_validate(book).model_dump()
+            for name in include:
+                read_model = crud_books.includes[name]
+                data[name] = [read_model.model_validate(item).model_dump() for item in getattr(book, name)]
+            rows.append(data)
+        return rows
+
+    def response_model(rows: list) -> bytes:
+        return adapter.dump_json(adapter.validate_python(rows), exclude_unset=True)
+
+    def encoded(encoder: str) -> Callable[[], bytes]:
+        def run() -> bytes:
+            settings.JSON_ENCODER = encoder
+            return FastJSONResponse([crud_books.to_read(book, include) for book in books]).body
+        return run
+
+    return {
+        "validate": lambda: response_model(validated()),
+        "revalidate": lambda: response_model([crud_books.to_read(book, include) for book in books]),
+        "orjson": encoded("orjson"),
+        "json": encoded("json"),
+    }
+
+
+def encodings(level: int, quality: int) -> Dict[str, Callable[[bytes], bytes]]:
+    found = {"identity": lambda body: body, f"gzip-{level}": lambda body: gzip.compress(body, level)}
+    if brotli is not None:
+        found[f"br-{quality}"] = lambda body: brotli.compress(body, quality=quality)
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--include", action="store_true", help="Embed authors and categories")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    include = sorted(crud_books.includes) if args.include else []
+    levels = encodings(settings.COMPRESSION_GZIP_LEVEL, settings.COMPRESSION_BROTLI_QUALITY)
+    encoder = settings.JSON_ENCODER
+    results = {}
+    try:
+        for rows in args.rows:
+            books = make_books(rows, bool(include))
+            serialize = {}
+            body = b""
+            for name, run in pipelines(books, include).items():
+                body = run()
+                samples = measure(run, args.repeat)
+                serialize[name] = {"median_ms": round(statistics.median(samples) * 1000, 2), "bytes": len(body)}
+
+            wire = {}
+            for name, compress in levels.items():
+                samples = measure(lambda: compress(body), args.repeat)
+                wire[name] = {
+                    "bytes": len(compress(body)),
+                    "median_ms": round(statistics.median(samples) * 1000, 2),
+                }
+            results[str(rows)] = {"serialize": serialize, "wire": wire}
+    finally:
+        settings.JSON_ENCODER = encoder
+
+    report("serialization", {"include": include, "repeat": args.repeat, "rows": results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Cold import time of the app, split per module and per top-level package.
+
+Runs `python -X importtime -c "import app.main"` in --runs fresh
+interpreters and reports the median total, the self time summed per
+top-level package and the slowest app.* modules (self time, median over
+runs). Needs no database: nothing connects until the lifespan starts.
+
+    python -m benchmarks.bench_startup --runs 10 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.common import report
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def import_profile(module: str) -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every import in one cold interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", f"import {module}"],
+        cwd=ROOT, env=os.environ.copy(), capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    import_profile(args.module)  # warm the bytecode cache
+    totals: List[float] = []
+    packages: Dict[str, List[int]] = defaultdict(list)
+    modules: Dict[str, List[int]] = defaultdict(list)
+    for _ in range(args.runs):
+        rows = import_profile(args.module)
+        totals.append(next(cumulative for name, _, cumulative in rows if name == args.module))
+        per_package: Dict[str, int] = defaultdict(int)
+        for name, self_us, _ in rows:
+            per_package[name.split(".")[0]] += self_us
+            if name.startswith("app."):
+                modules[name].append(self_us)
+        for package, self_us in per_package.items():
+            packages[package].append(self_us)
+
+    def median_ms(samples: List[int]) -> float:
+        return round(statistics.median(samples) / 1000, 2)
+
+    by_package = sorted(((median_ms(v), k) for k, v in packages.items()), reverse=True)
+    by_module = sorted(((median_ms(v), k) for k, v in modules.items()), reverse=True)
+    report("startup_import", {
+        "module": args.module,
+        "runs": args.runs,
+        "total_ms": {"median": median_ms(totals), "min": round(min(totals) / 1000, 2)},
+        "packages_ms": {name: ms for ms, name in by_package[:args.top]},
+        "app_modules_ms": {name: ms for ms, name in by_module[:args.top]},
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# benchmarks/common.py
+import json
+import os
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+WORDS = [
+    "shadow", "river", "garden", "empire", "silent", "winter", "crimson", "glass",
+    "mountain", "secret", "ocean", "forgotten", "golden", "island", "midnight", "stone",
+    "history", "journey", "kingdom", "letters", "machine", "northern", "orchard", "promise",
+    "quiet", "storm", "thunder", "valley", "wander", "yellow", "harbor", "lantern",
+]
+
+
+def bench_engine(**options) -> Engine:
+    url = os.getenv("BENCH_DATABASE_URL") or os.environ["DATABASE_URL"]
+    return create_engine(url, **options)
+
+
+def seed_books(engine: Engine, count: int) -> int:
+    """Top the book table up to `count` synthetic rows, built server-side."""
+    with engine.begin() as conn:
+        existing = conn.execute(text("SELECT count(*) FROM book")).scalar_one()
+        if existing >= count:
+            return existing
+        conn.execute(
+            text("""
+                INSERT INTO book (title, publication_year, isbn, quantity, available, created_at, updated_at)
+                SELECT initcap(
+                           (:words)[1 + (g * 7) % cardinality(:words)] || ' ' ||
+                           (:words)[1 + (g * 13 / 5) % cardinality(:words)] || ' ' ||
+                           (:words)[1 + (g * 31 / 17) % cardinality(:words)] || ' ' || g
+                       ),
+                       1900 + g % 125, 'bench-' || g, 1 + g % 5, 1 + g % 5, now(), now()
+                FROM generate_series(:start, :stop) AS g
+            """),
+            {"words": WORDS, "start": existing + 1, "stop": count},
+        )
+        conn.execute(text("ANALYZE book"))
+    return count
+
+
+def seed_catalog(engine: Engine, *, books: int, authors: int, categories: int) -> None:
+    """Top up bench authors and categories and link every book to one of each."""
+    seed_books(engine, books)
+    with engine.begin() as conn:
+        conn.execute(
+            text("""
+                INSERT INTO author (first_name, second_name, created_at, updated_at)
+                SELECT 'Bench', (:words)[1 + g % cardinality(:words)] || ' ' || g, now(), now()
+                FROM generate_series(1, :authors) AS g
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM author
+                    WHERE first_name = 'Bench' AND second_name = (:words)[1 + g % cardinality(:words)] || ' ' || g
+                )
+            """),
+            {"words": WORDS, "authors": authors},
+        )
+        conn.execute(
+            text("""
+                INSERT INTO category (category_name, created_at, updated_at)
+                SELECT 'Bench category ' || g, now(), now()
+                FROM generate_series(1, :categories) AS g
+                WHERE NOT EXISTS (SELECT 1 FROM category WHERE category_name = 'Bench category ' || g)
+            """),
+            {"categories": categories},
+        )
+        conn.execute(
+            text("""
+                WITH a AS (SELECT array_agg(id ORDER BY id) AS ids FROM author WHERE first_name = 'Bench')
+                INSERT INTO book_author_link (book_id, author_id)
+                SELECT book.id, a.ids[1 + book.id % cardinality(a.ids)] FROM book, a
+                ON CONFLICT DO NOTHING
+            """)
+        )
+        conn.execute(
+            text("""
+                WITH c AS (
+                    SELECT array_agg(id ORDER BY id) AS ids FROM category WHERE category_name LIKE 'Bench category %'
+                )
+                INSERT INTO book_category_link (book_id, category_id)
+                SELECT book.id, c.ids[1 + book.id % cardinality(c.ids)] FROM book, c
+                ON CONFLICT DO NOTHING
+            """)
+        )
+        for table in ("author", "category", "book_author_link", "book_category_link"):
+            conn.execute(text(f"ANALYZE {table}"))
+
+
+def seed_loans(engine, count: int, *, users: int, books: int) -> int:
+    """Top borrowedbook up to `count` rows, built server-side.
+
+    Loans bypass the borrow engine, so book.available is not adjusted.
+    """
+    seed_books(engine, books)
+    with engine.begin() as conn:
+        existing = conn.execute(text("SELECT count(*) FROM borrowedbook")).scalar_one()
+        if existing >= count:
+            return existing
+        conn.execute(
+            text("""
+                INSERT INTO "user" (first_name, last_name, email, registration_date, is_active)
+                SELECT 'Bench', 'Reader ' || g, 'bench-reader-' || g || '@example.com', now(), true
+                FROM generate_series(1, :users) AS g
+                WHERE NOT EXISTS (SELECT 1 FROM "user" WHERE email = 'bench-reader-' || g || '@example.com')
+            """),
+            {"users": users},
+        )
+        conn.execute(
+            text("""
+                WITH u AS (
+                    SELECT array_agg(id) AS ids FROM "user" WHERE email LIKE 'bench-reader-%'
+                ), b AS (
+                    SELECT array_agg(id) AS ids FROM (SELECT id FROM book ORDER BY id LIMIT :books) x
+                )
+                INSERT INTO borrowedbook (borrowing_time, return_status, created_at, updated_at, user_id, book_id)
+                SELECT timezone('utc', now()) - make_interval(days => g % 60, hours => g % 24),
+                       CASE WHEN g % 10 < 7 THEN 'returned' ELSE 'not returned' END,
+                       now(), now(),
+                       u.ids[1 + g % cardinality(u.ids)],
+                       b.ids[1 + (g * 7) % cardinality(b.ids)]
+                FROM generate_series(:start, :stop) AS g, u, b
+            """),
+            {"books": books, "start": existing + 1, "stop": count},
+        )
+        conn.execute(text("ANALYZE borrowedbook"))
+    return count
+
+
+def measure(fn: Callable[[], object], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "p50_ms": round(pick(0.50), 3),
+        "p95_ms": round(pick(0.95), 3),
+        "p99_ms": round(pick(0.99), 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def report(name: str, results: Dict[str, object]) -> None:
+    print(json.dumps({"benchmark": name, **results}, indent=2))